@@ -1,8 +1,8 @@
-from collections import defaultdict
-import json
 import os
 import base64
 from utils.helpers import get_path_from_avatar_base_type, get_slot_from_relic_type
+from utils.incremental import get_fingerprint, update_records
+from utils.sources import load_bytes, load_json
 
 
 # game version that the output is up to date with
@@ -15,12 +15,33 @@ RELIC_SET = STAR_RAIL_DATA_PATH + "/index_min/en/relic_sets.json"
 CHARACTERS = STAR_RAIL_DATA_PATH + "/index_min/en/characters.json"
 EIDOLONS = STAR_RAIL_DATA_PATH + "/index_min/en/character_ranks.json"
 SKILLS = STAR_RAIL_DATA_PATH + "/index_min/en/character_skills.json"
+MINI_ICONS_PATH = "src/data/mini_icons"
 
+# skill types with eidolon level bonuses, and their highest base level
+SKILL_MAX_LEVELS = {"basic": 6, "skill": 10, "ult": 10, "talent": 10}
 
-def get_game_data(include_icons: bool) -> dict:
+# eidolons of a character, not counting E0
+MAX_EIDOLON = 6
+
+# source files read by this extractor
+SOURCES = [LIGHT_CONE, RELIC_PIECE, RELIC_SET, CHARACTERS, EIDOLONS, SKILLS]
+
+# fields read from the rows of each source file, the rest are dropped while parsing
+FIELDS = {
+    LIGHT_CONE: {"name", "rarity"},
+    RELIC_PIECE: {"name", "set_id", "type"},
+    RELIC_SET: {"name"},
+    CHARACTERS: {"name", "path", "ranks"},
+    EIDOLONS: {"id", "level_up_skills"},
+    SKILLS: {"type"},
+}
+
+
+def get_game_data(include_icons: bool, cache: dict = None) -> dict:
     """Get light cone, relic, and character data from game files.
 
     :param include_icons: Whether to include base64-encoded mini icons in the output.
+    :param cache: Optional records of a previous build, updated in place.
     :return: A dictionary containing light cone, relic, and character data.
     """
     if not os.path.exists(STAR_RAIL_DATA_PATH):
@@ -31,7 +52,7 @@ def get_game_data(include_icons: bool) -> dict:
 
     light_cones = get_light_cones()
     relics = get_relics()
-    characters = get_characters()
+    characters = get_characters(cache)
 
     res = {
         "version": HSR_VERSION,
@@ -62,8 +83,7 @@ def get_light_cones() -> dict:
 
     :return: A dictionary containing light cone data.
     """
-    with open(LIGHT_CONE, "r", encoding="utf-8") as f:
-        light_cones = json.load(f)
+    light_cones = load_json(LIGHT_CONE, FIELDS[LIGHT_CONE])
 
     res = {}
     for light_cone in light_cones.values():
@@ -79,10 +99,8 @@ def get_relics() -> dict:
 
     :return: A dictionary containing relic data.
     """
-    with open(RELIC_PIECE, "r", encoding="utf-8") as f:
-        relic_pieces = json.load(f)
-    with open(RELIC_SET, "r", encoding="utf-8") as f:
-        relic_sets = json.load(f)
+    relic_pieces = load_json(RELIC_PIECE, FIELDS[RELIC_PIECE])
+    relic_sets = load_json(RELIC_SET, FIELDS[RELIC_SET])
 
     res = {}
     for relic in relic_pieces.values():
@@ -94,46 +112,103 @@ def get_relics() -> dict:
     return res
 
 
-def get_characters() -> dict:
+def get_characters(cache: dict = None) -> dict:
     """Get character data from game files.
 
-    :param text_map_en: A dictionary mapping string hashes to English text.
+    :param cache: Optional records of a previous build, updated in place. When
+        given, only characters whose source rows changed are parsed again.
     :return: A dictionary containing character data.
     """
-    with open(CHARACTERS, "r", encoding="utf-8") as f:
-        characters = json.load(f)
-    with open(EIDOLONS, "r", encoding="utf-8") as f:
-        eidolons = json.load(f)
-    with open(SKILLS, "r", encoding="utf-8") as f:
-        skills = json.load(f)
-
-    res = defaultdict(dict)
-    for character in characters.values():
-        name = character["name"]
-        char_id = character["id"]
-        if name == "{NICKNAME}":
-            name = (
-                "Trailblazer"
-                + get_path_from_avatar_base_type(character["path"]).split()[-1]
+    characters = load_json(CHARACTERS, FIELDS[CHARACTERS])
+
+    if cache is None:
+        return dict(_format_character(character) for character in characters.values())
+
+    eidolons = load_json(EIDOLONS, FIELDS[EIDOLONS])
+    skills = load_json(SKILLS, FIELDS[SKILLS])
+
+    def get_entities():
+        for key, character in characters.items():
+            ranks = [eidolons[rank_id] for rank_id in character["ranks"]]
+            skill_ids = sorted(
+                {
+                    skill["id"]
+                    for rank in ranks
+                    for skill in rank["level_up_skills"] or []
+                }
+            )
+            fingerprint = get_fingerprint(
+                character, ranks, [skills[skill_id] for skill_id in skill_ids]
             )
+            yield key, fingerprint, character
 
-        e3 = next(
-            eidolon
-            for eidolon in eidolons.values()
-            if eidolon["id"] == character["ranks"][2]
-        )
-        e5 = next(
-            eidolon
-            for eidolon in eidolons.values()
-            if eidolon["id"] == character["ranks"][4]
-        )
+    return update_records(cache, "characters", get_entities(), _format_character)
 
-        res[name] = {
-            "e3": _parse_skill_levels(skills, e3["level_up_skills"]),
-            "e5": _parse_skill_levels(skills, e5["level_up_skills"]),
-        }
 
-    return res
+def _format_character(character: dict) -> tuple:
+    """Parse the eidolon skill levels of a character.
+
+    :param character: A dictionary containing character data.
+    :return: A tuple containing the character name and the parsed character data.
+    """
+    eidolons = load_json(EIDOLONS, FIELDS[EIDOLONS])
+    skills = load_json(SKILLS, FIELDS[SKILLS])
+
+    name = _get_character_name(character)
+
+    e3 = next(
+        eidolon
+        for eidolon in eidolons.values()
+        if eidolon["id"] == character["ranks"][2]
+    )
+    e5 = next(
+        eidolon
+        for eidolon in eidolons.values()
+        if eidolon["id"] == character["ranks"][4]
+    )
+
+    return name, {
+        "e3": _parse_skill_levels(skills, e3["level_up_skills"]),
+        "e5": _parse_skill_levels(skills, e5["level_up_skills"]),
+    }
+
+
+def get_skill_levels() -> dict:
+    """Get the cumulative eidolon skill level bonuses of every character.
+
+    :return: A dictionary containing, for each character, one row of bonuses
+        per eidolon from E0 to E6, with one column per skill type.
+    """
+    characters = load_json(CHARACTERS, FIELDS[CHARACTERS])
+    eidolons = load_json(EIDOLONS, FIELDS[EIDOLONS])
+    skills = load_json(SKILLS, FIELDS[SKILLS])
+
+    res = {}
+    for character in characters.values():
+        name = _get_character_name(character)
+        if len(character["ranks"]) != MAX_EIDOLON:
+            print(f"WARN: {name} has {len(character['ranks'])} eidolons")
+
+        bonuses = [0] * len(SKILL_MAX_LEVELS)
+        rows = [bonuses]
+        for rank_id in character["ranks"][:MAX_EIDOLON]:
+            levels = _parse_skill_levels(
+                skills, eidolons[rank_id]["level_up_skills"] or []
+            )
+            bonuses = [
+                bonus + levels.get(skill, 0)
+                for bonus, skill in zip(bonuses, SKILL_MAX_LEVELS)
+            ]
+            rows.append(bonuses)
+        rows += [bonuses] * (MAX_EIDOLON + 1 - len(rows))
+        res[name] = rows
+
+    return {
+        "version": HSR_VERSION,
+        "skills": list(SKILL_MAX_LEVELS),
+        "max_levels": list(SKILL_MAX_LEVELS.values()),
+        "characters": res,
+    }
 
 
 def get_mini_icons():
@@ -141,19 +216,33 @@ def get_mini_icons():
 
     :return: A dictionary mapping character names to base64-encoded strings.
     """
-    path = "src/data/mini_icons"
-    image_files = os.listdir(path)
+    image_files = os.listdir(MINI_ICONS_PATH)
     image_dict = {}
 
     for name in image_files:
         if name.endswith(".png"):
-            with open(os.path.join(path, name), "rb") as f:
-                encoded_icon = base64.b64encode(f.read()).decode("utf-8")
-            image_dict[name[:-4]] = encoded_icon
+            icon = load_bytes(os.path.join(MINI_ICONS_PATH, name))
+            image_dict[name[:-4]] = base64.b64encode(icon).decode("utf-8")
 
     return image_dict
 
 
+def _get_character_name(character: dict) -> str:
+    """Get the name of a character, naming the Trailblazer after their path.
+
+    :param character: A dictionary containing character data.
+    :return: The character name.
+    """
+    name = character["name"]
+    if name == "{NICKNAME}":
+        name = (
+            "Trailblazer"
+            + get_path_from_avatar_base_type(character["path"]).split()[-1]
+        )
+
+    return name
+
+
 def _parse_skill_levels(skills: dict, skill_add_level_dict: dict) -> dict:
     """Parse skill levels from game files.
 
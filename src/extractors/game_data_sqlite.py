@@ -0,0 +1,328 @@
+import json
+import os
+import sqlite3
+from extractors.game_data_verbose import FIELDS, RELIC_SETS
+from utils.helpers import render_desc
+from utils.sources import load_json
+
+
+SCHEMA = """
+CREATE TABLE info (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE characters (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    rarity INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    element TEXT NOT NULL
+);
+CREATE TABLE skills (
+    id INTEGER PRIMARY KEY,
+    character_id INTEGER NOT NULL REFERENCES characters (id),
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    max_level INTEGER NOT NULL,
+    desc TEXT NOT NULL,
+    params TEXT NOT NULL
+);
+CREATE TABLE traces (
+    id INTEGER PRIMARY KEY,
+    character_id INTEGER NOT NULL REFERENCES characters (id),
+    key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    desc TEXT NOT NULL
+);
+CREATE TABLE eidolons (
+    id INTEGER PRIMARY KEY,
+    character_id INTEGER NOT NULL REFERENCES characters (id),
+    rank INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    desc TEXT NOT NULL
+);
+CREATE TABLE eidolon_level_up_skills (
+    eidolon_id INTEGER NOT NULL REFERENCES eidolons (id),
+    skill_type TEXT NOT NULL,
+    levels INTEGER NOT NULL
+);
+CREATE TABLE light_cones (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    rarity INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    desc TEXT NOT NULL,
+    ability_name TEXT NOT NULL,
+    ability_desc TEXT NOT NULL,
+    ability_params TEXT NOT NULL
+);
+CREATE TABLE relic_sets (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE relic_set_bonuses (
+    relic_set_id INTEGER NOT NULL REFERENCES relic_sets (id),
+    bonus INTEGER NOT NULL,
+    desc TEXT NOT NULL
+);
+CREATE TABLE relic_pieces (
+    relic_set_id INTEGER NOT NULL REFERENCES relic_sets (id),
+    slot TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE modifiers (
+    source_type TEXT NOT NULL,
+    source_id INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    value REAL NOT NULL
+);
+
+CREATE INDEX characters_rarity_path ON characters (rarity, path);
+CREATE INDEX characters_element ON characters (element);
+CREATE INDEX skills_character ON skills (character_id);
+CREATE INDEX traces_character ON traces (character_id);
+CREATE INDEX eidolons_character ON eidolons (character_id);
+CREATE INDEX light_cones_rarity_path ON light_cones (rarity, path);
+CREATE INDEX relic_set_bonuses_set ON relic_set_bonuses (relic_set_id);
+CREATE INDEX relic_pieces_set ON relic_pieces (relic_set_id);
+CREATE INDEX modifiers_type ON modifiers (type, source_type);
+CREATE INDEX modifiers_source ON modifiers (source_type, source_id);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE descriptions USING fts5 (
+    source_type UNINDEXED,
+    source_id UNINDEXED,
+    field UNINDEXED,
+    text
+);
+"""
+
+
+def write_game_data_sqlite(game_data_verbose: dict, path: str):
+    """Write the verbose game data to an indexed SQLite database.
+
+    Modifiers of light cones, relic sets and traces are stored in a single
+    `modifiers` table. Its `rank`, like the `bonus` of `relic_set_bonuses`, is
+    the 0-based position in the source list: the superimposition minus 1 for
+    light cones, the set bonus (0 for 2 pieces, 1 for 4 pieces) for relic sets,
+    and always 0 for traces, which have a single list. Descriptions are
+    rendered at their maximum level and indexed for full-text search in the
+    `descriptions` table, if SQLite has FTS5.
+
+    :param game_data_verbose: The verbose game data, as returned by
+        `get_game_data_verbose`.
+    :param path: The output path of the database.
+    """
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    con = sqlite3.connect(tmp_path)
+    try:
+        con.executescript(SCHEMA)
+        try:
+            con.executescript(FTS_SCHEMA)
+            has_fts = True
+        except sqlite3.OperationalError:
+            print("WARN: SQLite was built without FTS5, skipping description index")
+            has_fts = False
+
+        descriptions = []
+        modifiers = []
+        con.execute(
+            "INSERT INTO info VALUES ('version', ?)", (game_data_verbose["version"],)
+        )
+        _insert_characters(
+            con, game_data_verbose["characters"], descriptions, modifiers
+        )
+        _insert_light_cones(
+            con, game_data_verbose["light_cones"], descriptions, modifiers
+        )
+        _insert_relic_sets(
+            con, game_data_verbose["relic_sets"], descriptions, modifiers
+        )
+
+        con.executemany("INSERT INTO modifiers VALUES (?, ?, ?, ?, ?)", modifiers)
+        if has_fts:
+            con.executemany(
+                "INSERT INTO descriptions VALUES (?, ?, ?, ?)", descriptions
+            )
+            con.execute("INSERT INTO descriptions (descriptions) VALUES ('optimize')")
+        con.commit()
+        con.execute("VACUUM")
+    finally:
+        con.close()
+
+    os.replace(tmp_path, path)
+
+
+def _insert_characters(
+    con: sqlite3.Connection, characters: dict, descriptions: list, modifiers: list
+):
+    """Insert characters along with their skills, traces and eidolons.
+
+    :param con: The database connection.
+    :param characters: A dictionary containing verbose character data.
+    :param descriptions: A list collecting rows of the description index.
+    :param modifiers: A list collecting rows of the modifiers table.
+    """
+    for character_id, (name, character) in enumerate(characters.items(), 1):
+        con.execute(
+            "INSERT INTO characters VALUES (?, ?, ?, ?, ?)",
+            (
+                character_id,
+                name,
+                character["rarity"],
+                character["path"],
+                character["element"],
+            ),
+        )
+
+        for skill_type, skill in character["skills"].items():
+            cur = con.execute(
+                "INSERT INTO skills VALUES (NULL, ?, ?, ?, ?, ?, ?)",
+                (
+                    character_id,
+                    skill_type,
+                    skill["name"],
+                    skill["max_level"],
+                    skill["desc"],
+                    json.dumps(skill["params"]),
+                ),
+            )
+            descriptions.append(
+                ("skill", cur.lastrowid, "desc", _render_max_level(skill))
+            )
+
+        for key, trace in character["traces"].items():
+            cur = con.execute(
+                "INSERT INTO traces VALUES (NULL, ?, ?, ?, ?)",
+                (character_id, key, trace["name"], trace["desc"]),
+            )
+            descriptions.append(("trace", cur.lastrowid, "desc", trace["desc"]))
+            for modifier in trace.get("modifiers", []):
+                # a trace has a single list of modifiers, at position 0
+                modifiers.append(
+                    ("trace", cur.lastrowid, 0, modifier["type"], modifier["value"])
+                )
+
+        for rank, eidolon in enumerate(character["eidolons"], 1):
+            cur = con.execute(
+                "INSERT INTO eidolons VALUES (NULL, ?, ?, ?, ?)",
+                (character_id, rank, eidolon["name"], eidolon["desc"]),
+            )
+            descriptions.append(("eidolon", cur.lastrowid, "desc", eidolon["desc"]))
+            for skill_type, levels in eidolon.get("level_up_skills", {}).items():
+                con.execute(
+                    "INSERT INTO eidolon_level_up_skills VALUES (?, ?, ?)",
+                    (cur.lastrowid, skill_type, levels),
+                )
+
+
+def _insert_light_cones(
+    con: sqlite3.Connection, light_cones: dict, descriptions: list, modifiers: list
+):
+    """Insert light cones.
+
+    :param con: The database connection.
+    :param light_cones: A dictionary containing verbose light cone data.
+    :param descriptions: A list collecting rows of the description index.
+    :param modifiers: A list collecting rows of the modifiers table.
+    """
+    for light_cone_id, (name, light_cone) in enumerate(light_cones.items(), 1):
+        ability = light_cone["ability"]
+        con.execute(
+            "INSERT INTO light_cones VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                light_cone_id,
+                name,
+                light_cone["rarity"],
+                light_cone["path"],
+                light_cone["desc"],
+                ability["name"],
+                ability["desc"],
+                json.dumps(ability["params"]),
+            ),
+        )
+        descriptions.append(
+            ("light_cone", light_cone_id, "ability", _render_max_level(ability))
+        )
+        descriptions.append(
+            ("light_cone", light_cone_id, "desc", light_cone["desc"])
+        )
+        for rank, modifier_list in enumerate(ability.get("modifiers", [])):
+            for modifier in modifier_list:
+                modifiers.append(
+                    (
+                        "light_cone",
+                        light_cone_id,
+                        rank,
+                        modifier["type"],
+                        modifier["value"],
+                    )
+                )
+
+
+def _insert_relic_sets(
+    con: sqlite3.Connection, relic_sets: dict, descriptions: list, modifiers: list
+):
+    """Insert relic sets along with their pieces and set bonuses.
+
+    :param con: The database connection.
+    :param relic_sets: A dictionary containing verbose relic set data.
+    :param descriptions: A list collecting rows of the description index.
+    :param modifiers: A list collecting rows of the modifiers table.
+    """
+    bonus_positions = _get_bonus_positions()
+    for relic_set_id, (name, relic_set) in enumerate(relic_sets.items(), 1):
+        con.execute("INSERT INTO relic_sets VALUES (?, ?)", (relic_set_id, name))
+        for slot, piece in relic_set["pieces"].items():
+            con.execute(
+                "INSERT INTO relic_pieces VALUES (?, ?, ?)",
+                (relic_set_id, slot, piece["name"]),
+            )
+        bonuses = bonus_positions.get(name, range(len(relic_set["desc"])))
+        for bonus, desc in zip(bonuses, relic_set["desc"]):
+            con.execute(
+                "INSERT INTO relic_set_bonuses VALUES (?, ?, ?)",
+                (relic_set_id, bonus, desc),
+            )
+            descriptions.append(("relic_set", relic_set_id, f"bonus_{bonus}", desc))
+        for bonus, modifier_list in enumerate(relic_set.get("modifiers", [])):
+            for modifier in modifier_list:
+                modifiers.append(
+                    (
+                        "relic_set",
+                        relic_set_id,
+                        bonus,
+                        modifier["type"],
+                        modifier["value"],
+                    )
+                )
+
+
+def _get_bonus_positions() -> dict:
+    """Get the positions of the relic set bonuses kept in the verbose game data,
+    which drops the empty descriptions of the source file.
+
+    :return: A dictionary mapping relic set names to the positions of their
+        non-empty descriptions in the source file.
+    """
+    relic_sets_json = load_json(RELIC_SETS, FIELDS[RELIC_SETS])
+    return {
+        relic_set["name"]: [i for i, desc in enumerate(relic_set["desc"]) if desc]
+        for relic_set in relic_sets_json.values()
+    }
+
+
+def _render_max_level(skill: dict) -> str:
+    """Render a skill description at its maximum level.
+
+    :param skill: A dictionary containing `desc` and `params`.
+    :return: The rendered description.
+    """
+    if not skill["params"] or not skill["params"][-1]:
+        return skill["desc"]
+    return render_desc(skill["desc"], skill["params"][-1])
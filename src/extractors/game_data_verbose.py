@@ -1,5 +1,10 @@
-import json
-from utils.helpers import get_path_from_avatar_base_type, get_slot_from_relic_type
+from utils.helpers import (
+    PROMOTION_MAX_LEVELS,
+    get_path_from_avatar_base_type,
+    get_slot_from_relic_type,
+)
+from utils.incremental import get_fingerprint, update_records
+from utils.sources import get_snapshot, load_json
 import urllib.parse
 import os
 from collections import defaultdict
@@ -18,86 +23,240 @@ CHARACTER_SKILLS = STAR_RAIL_RES_PATH + "/index_new/en/character_skills.json"
 CHARACTER_SKILL_TREES = STAR_RAIL_RES_PATH + "/index_new/en/character_skill_trees.json"
 CHARACTER_RANKS = STAR_RAIL_RES_PATH + "/index_new/en/character_ranks.json"
 CHARACTER_PROMOTIONS = STAR_RAIL_RES_PATH + "/index_new/en/character_promotions.json"
+ITEMS = STAR_RAIL_RES_PATH + "/index_new/en/items.json"
+
+# source files read by this extractor
+SOURCES = [
+    INFO,
+    LIGHT_CONES,
+    LIGHT_CONE_RANKS,
+    LIGHT_CONE_PROMOTIONS,
+    RELICS,
+    RELIC_SETS,
+    CHARACTERS,
+    CHARACTER_SKILLS,
+    CHARACTER_SKILL_TREES,
+    CHARACTER_RANKS,
+    CHARACTER_PROMOTIONS,
+]
+
+# fields read from the rows of each source file, the rest are dropped while parsing
+FIELDS = {
+    LIGHT_CONES: {
+        "id",
+        "name",
+        "rarity",
+        "path",
+        "desc",
+        "preview",
+        "portrait",
+        "icon",
+    },
+    LIGHT_CONE_RANKS: {"skill", "desc", "params", "properties"},
+    LIGHT_CONE_PROMOTIONS: {"values", "materials"},
+    RELICS: {"set_id", "type", "name", "icon"},
+    RELIC_SETS: {"name", "desc", "properties"},
+    CHARACTERS: {
+        "id",
+        "name",
+        "tag",
+        "rarity",
+        "path",
+        "element",
+        "ranks",
+        "skills",
+        "skill_trees",
+        "preview",
+        "portrait",
+    },
+    CHARACTER_SKILLS: {"name", "type", "max_level", "desc", "params", "icon"},
+    CHARACTER_SKILL_TREES: {
+        "id",
+        "name",
+        "anchor",
+        "max_level",
+        "pre_points",
+        "levels",
+        "desc",
+        "params",
+        "icon",
+    },
+    CHARACTER_RANKS: {"name", "desc", "level_up_skills", "icon"},
+    CHARACTER_PROMOTIONS: {"values", "materials"},
+    ITEMS: {"name"},
+}
 
 IMG_BASE_URL = "https://raw.githubusercontent.com/Mar-7th/StarRailRes/master/"
+MINI_ICON_BASE_URL = "https://raw.githubusercontent.com/kel-z/HSR-Data/main/src/"
 
+# decimals kept for cumulative trace bonuses
+TRACE_BONUS_PRECISION = 6
 
-def get_game_data_verbose(include_icons: bool) -> dict:
+# verbose game data built in this process, keyed by whether it includes icons,
+# along with the source signatures and incremental records it was built from
+_MODELS = {}
+
+
+def get_game_data_verbose(include_icons: bool, cache: dict = None) -> dict:
     """Get light cone, relic, and character data from game files.
 
+    The result is reused while the source files are unchanged, so artifacts
+    derived from the same data don't extract it again. Callers must not mutate
+    it.
+
     :param include_icons: Whether to include icons the output.
+    :param cache: Optional records of a previous build, updated in place. When
+        given, only light cones and characters whose source rows changed are
+        formatted again.
     :return: A dictionary containing light cone, relic, and character data.
     """
-    if not os.path.exists(INFO):
-        raise FileNotFoundError(
-            "Star Rail Res submodule not found. "
-            "Please run `git submodule update --init --recursive --remote`."
-        )
-    with open(INFO, "r", encoding="utf-8") as f:
-        INFO_JSON = json.load(f)
-    VERSION = INFO_JSON["version"]
-
-    light_cones = get_light_cones(include_icons)
+    snapshot = get_snapshot(SOURCES)
+    model = _MODELS.get(include_icons)
+    if (
+        model is not None
+        and model[0] == snapshot
+        and (cache is None or model[2] is not None)
+    ):
+        if cache is not None:
+            cache.update(model[2])
+        return model[1]
+
+    VERSION = _get_version()
+
+    light_cones = get_light_cones(include_icons, cache)
     relic_sets = get_relic_sets(include_icons)
-    characters = get_characters(include_icons)
+    characters = get_characters(include_icons, cache)
 
-    return {
+    res = {
         "version": VERSION,
         "light_cones": light_cones,
         "relic_sets": relic_sets,
         "characters": characters,
     }
+    _MODELS[include_icons] = (snapshot, res, None if cache is None else dict(cache))
+
+    return res
+
+
+def iter_game_data_verbose(include_icons: bool):
+    """Stream light cone, relic, and character data from game files.
+
+    Yields the same keys as `get_game_data_verbose`, except that light cones,
+    relic sets and characters are generators of `(name, record)` pairs, so each
+    record is only formatted when it is consumed.
+
+    :param include_icons: Whether to include icons the output.
+    :return: A generator of `(key, value)` pairs.
+    """
+    yield "version", _get_version()
+    yield "light_cones", iter_light_cones(include_icons)
+    yield "relic_sets", iter_relic_sets(include_icons)
+    yield "characters", iter_characters(include_icons)
 
 
-def get_light_cones(include_icons: bool) -> dict:
+def _get_version() -> str:
+    """Get the game version of the game files.
+
+    :raises FileNotFoundError: If the submodule is missing.
+    :return: The game version.
+    """
+    if not os.path.exists(INFO):
+        raise FileNotFoundError(
+            "Star Rail Res submodule not found. "
+            "Please run `git submodule update --init --recursive --remote`."
+        )
+    INFO_JSON = load_json(INFO)
+
+    return INFO_JSON["version"]
+
+
+def get_light_cones(include_icons: bool, cache: dict = None) -> dict:
     """Get light cone data from game files.
 
     :param include_icons: Whether to include icons in the output.
+    :param cache: Optional records of a previous build, updated in place.
     :return: A dictionary containing light cone data.
     """
-    with open(LIGHT_CONES, "r", encoding="utf-8") as f:
-        LIGHT_CONE_JSON = json.load(f)
-    with open(LIGHT_CONE_PROMOTIONS, "r", encoding="utf-8") as f:
-        LIGHT_CONE_PROMOTIONS_JSON = json.load(f)
-    with open(LIGHT_CONE_RANKS, "r", encoding="utf-8") as f:
-        LIGHT_CONE_RANKS_JSON = json.load(f)
-
-    light_cones = {}
-    for key in LIGHT_CONE_JSON:
-        light_cone = LIGHT_CONE_JSON[key]
-        superimposition_desc, superimposition_params = _format_desc_and_params(
-            LIGHT_CONE_RANKS_JSON[light_cone["id"]]["desc"],
-            LIGHT_CONE_RANKS_JSON[light_cone["id"]]["params"],
-        )
-        light_cones[light_cone["name"]] = {
-            "rarity": light_cone["rarity"],
-            "path": get_path_from_avatar_base_type(light_cone["path"]),
-            "desc": light_cone["desc"],
-            "ascension": LIGHT_CONE_PROMOTIONS_JSON[light_cone["id"]]["values"],
-            "ability": {
-                "name": LIGHT_CONE_RANKS_JSON[light_cone["id"]]["skill"],
-                "desc": superimposition_desc,
-                "params": superimposition_params,
-            },
-        }
-        modifiers = LIGHT_CONE_RANKS_JSON[light_cone["id"]]["properties"]
-        if any(modifiers):
-            light_cones[light_cone["name"]]["ability"]["modifiers"] = [
-                [_format_modifier(modifier) for modifier in modifier_list]
-                for modifier_list in modifiers
-            ]
-        if include_icons:
-            light_cones[light_cone["name"]]["icon"] = (
-                IMG_BASE_URL + light_cone["preview"]
-            )
-            light_cones[light_cone["name"]]["image"] = (
-                IMG_BASE_URL + light_cone["portrait"]
-            )
-            light_cones[light_cone["name"]]["mini_icon"] = (
-                IMG_BASE_URL + light_cone["icon"]
+    if cache is None:
+        return dict(iter_light_cones(include_icons))
+
+    LIGHT_CONE_JSON = load_json(LIGHT_CONES, FIELDS[LIGHT_CONES])
+
+    LIGHT_CONE_PROMOTIONS_JSON = load_json(
+        LIGHT_CONE_PROMOTIONS, FIELDS[LIGHT_CONE_PROMOTIONS]
+    )
+    LIGHT_CONE_RANKS_JSON = load_json(LIGHT_CONE_RANKS, FIELDS[LIGHT_CONE_RANKS])
+
+    return update_records(
+        cache,
+        "light_cones",
+        (
+            (
+                key,
+                get_fingerprint(
+                    light_cone,
+                    LIGHT_CONE_PROMOTIONS_JSON[light_cone["id"]],
+                    LIGHT_CONE_RANKS_JSON[light_cone["id"]],
+                ),
+                light_cone,
             )
+            for key, light_cone in LIGHT_CONE_JSON.items()
+        ),
+        lambda light_cone: _format_light_cone(light_cone, include_icons),
+    )
+
+
+def iter_light_cones(include_icons: bool):
+    """Stream formatted light cones from game files.
+
+    :param include_icons: Whether to include icons in the output.
+    :return: A generator of `(name, light_cone)` pairs.
+    """
+    LIGHT_CONE_JSON = load_json(LIGHT_CONES, FIELDS[LIGHT_CONES])
+
+    for light_cone in LIGHT_CONE_JSON.values():
+        yield _format_light_cone(light_cone, include_icons)
+
+
+def _format_light_cone(light_cone: dict, include_icons: bool) -> tuple:
+    """Format a light cone.
+
+    :param light_cone: A dictionary containing light cone data.
+    :param include_icons: Whether to include icons in the output.
+    :return: A tuple containing the light cone name and the formatted light cone.
+    """
+    LIGHT_CONE_PROMOTIONS_JSON = load_json(
+        LIGHT_CONE_PROMOTIONS, FIELDS[LIGHT_CONE_PROMOTIONS]
+    )
+    LIGHT_CONE_RANKS_JSON = load_json(LIGHT_CONE_RANKS, FIELDS[LIGHT_CONE_RANKS])
+
+    superimposition_desc, superimposition_params = _format_desc_and_params(
+        LIGHT_CONE_RANKS_JSON[light_cone["id"]]["desc"],
+        LIGHT_CONE_RANKS_JSON[light_cone["id"]]["params"],
+    )
+    res = {
+        "rarity": light_cone["rarity"],
+        "path": get_path_from_avatar_base_type(light_cone["path"]),
+        "desc": light_cone["desc"],
+        "ascension": LIGHT_CONE_PROMOTIONS_JSON[light_cone["id"]]["values"],
+        "ability": {
+            "name": LIGHT_CONE_RANKS_JSON[light_cone["id"]]["skill"],
+            "desc": superimposition_desc,
+            "params": superimposition_params,
+        },
+    }
+    modifiers = LIGHT_CONE_RANKS_JSON[light_cone["id"]]["properties"]
+    if any(modifiers):
+        res["ability"]["modifiers"] = [
+            [_format_modifier(modifier) for modifier in modifier_list]
+            for modifier_list in modifiers
+        ]
+    if include_icons:
+        res["icon"] = IMG_BASE_URL + light_cone["preview"]
+        res["image"] = IMG_BASE_URL + light_cone["portrait"]
+        res["mini_icon"] = IMG_BASE_URL + light_cone["icon"]
 
-    return light_cones
+    return light_cone["name"], res
 
 
 def get_relic_sets(include_icons: bool) -> dict:
@@ -106,10 +265,17 @@ def get_relic_sets(include_icons: bool) -> dict:
     :param include_icons: Whether to include icons in the output.
     :return: A dictionary containing relic set data.
     """
-    with open(RELICS, "r", encoding="utf-8") as f:
-        RELIC_JSON = json.load(f)
-    with open(RELIC_SETS, "r", encoding="utf-8") as f:
-        RELIC_SETS_JSON = json.load(f)
+    return dict(iter_relic_sets(include_icons))
+
+
+def iter_relic_sets(include_icons: bool):
+    """Stream formatted relic sets from game files.
+
+    :param include_icons: Whether to include icons in the output.
+    :return: A generator of `(name, relic_set)` pairs.
+    """
+    RELIC_JSON = load_json(RELICS, FIELDS[RELICS])
+    RELIC_SETS_JSON = load_json(RELIC_SETS, FIELDS[RELIC_SETS])
 
     relics = {}
     for key in RELIC_JSON:
@@ -127,73 +293,127 @@ def get_relic_sets(include_icons: bool) -> dict:
                 "icon"
             ] = (IMG_BASE_URL + relic["icon"])
 
-    relic_sets = {}
     for set_id in RELIC_SETS_JSON:
-        key = RELIC_SETS_JSON[set_id]["name"]
-        relic_sets[key] = relics[set_id]
-        relic_sets[key]["desc"] = [
-            desc for desc in RELIC_SETS_JSON[set_id]["desc"] if desc
-        ]
+        relic_set = relics[set_id]
+        relic_set["desc"] = [desc for desc in RELIC_SETS_JSON[set_id]["desc"] if desc]
         modifiers = RELIC_SETS_JSON[set_id]["properties"]
         if any(modifiers):
-            relic_sets[key]["modifiers"] = [
+            relic_set["modifiers"] = [
                 [_format_modifier(modifier) for modifier in modifier_list]
                 for modifier_list in modifiers
             ]
 
-    return relic_sets
+        yield RELIC_SETS_JSON[set_id]["name"], relic_set
 
 
-def get_characters(include_icons: bool) -> dict:
+def get_characters(include_icons: bool, cache: dict = None) -> dict:
     """Get character data from game files.
 
     :param include_icons: Whether to include icons in the output.
+    :param cache: Optional records of a previous build, updated in place.
     :return: A dictionary containing character data.
     """
-    with open(CHARACTERS, "r", encoding="utf-8") as f:
-        CHARACTER_JSON = json.load(f)
-    with open(CHARACTER_PROMOTIONS, "r", encoding="utf-8") as f:
-        CHARACTER_PROMOTIONS_JSON = json.load(f)
-
-    characters = {}
-    for key in CHARACTER_JSON:
-        character = CHARACTER_JSON[key]
-        name = _format_name(character)
-        path = get_path_from_avatar_base_type(character["path"])
-        ascension = CHARACTER_PROMOTIONS_JSON[character["id"]]["values"]
-        eidolons = _get_eidolons(character, include_icons)
-
-        skills = {}
-        _add_skills(skills, character, include_icons)
-
-        traces = {}
-        _add_technique_trace(traces, character, include_icons)
-        _add_ability_traces(traces, character, include_icons)
-        _add_passive_traces(traces, character, include_icons)
-
-        characters[name] = {
-            "rarity": character["rarity"],
-            "path": path,
-            "element": "Lightning"
-            if character["element"] == "Thunder"
-            else character["element"],
-            "ascension": ascension,
-            "eidolons": eidolons,
-            "skills": skills,
-            "traces": traces,
-        }
+    if cache is None:
+        return dict(iter_characters(include_icons))
 
-        if include_icons:
-            characters[name]["icon"] = IMG_BASE_URL + character["preview"]
-            characters[name]["splash"] = IMG_BASE_URL + character["portrait"]
-            characters[name]["mini_icon"] = (
-                "https://raw.githubusercontent.com/kel-z/HSR-Data/main/src/"
-                + urllib.parse.quote(
-                    f"data/mini_icons/{''.join([c for c in name if c.isalnum() or c == '#'])}.png"
-                )
-            )
+    CHARACTER_JSON = load_json(CHARACTERS, FIELDS[CHARACTERS])
+
+    return update_records(
+        cache,
+        "characters",
+        (
+            (key, _get_character_fingerprint(character), character)
+            for key, character in CHARACTER_JSON.items()
+        ),
+        lambda character: _format_character(character, include_icons),
+    )
+
+
+def iter_characters(include_icons: bool):
+    """Stream formatted characters from game files.
+
+    :param include_icons: Whether to include icons in the output.
+    :return: A generator of `(name, character)` pairs.
+    """
+    CHARACTER_JSON = load_json(CHARACTERS, FIELDS[CHARACTERS])
 
-    return characters
+    for character in CHARACTER_JSON.values():
+        yield _format_character(character, include_icons)
+
+
+def _format_character(character: dict, include_icons: bool) -> tuple:
+    """Format a character.
+
+    :param character: A dictionary containing character data.
+    :param include_icons: Whether to include icons in the output.
+    :return: A tuple containing the character name and the formatted character.
+    """
+    CHARACTER_PROMOTIONS_JSON = load_json(
+        CHARACTER_PROMOTIONS, FIELDS[CHARACTER_PROMOTIONS]
+    )
+
+    name = _format_name(character)
+    path = get_path_from_avatar_base_type(character["path"])
+    ascension = CHARACTER_PROMOTIONS_JSON[character["id"]]["values"]
+    eidolons = _get_eidolons(character, include_icons)
+
+    skills = {}
+    _add_skills(skills, character, include_icons)
+
+    traces = {}
+    _add_technique_trace(traces, character, include_icons)
+    _add_ability_traces(traces, character, include_icons)
+    _add_passive_traces(traces, character, include_icons)
+
+    res = {
+        "rarity": character["rarity"],
+        "path": path,
+        "element": "Lightning"
+        if character["element"] == "Thunder"
+        else character["element"],
+        "ascension": ascension,
+        "eidolons": eidolons,
+        "skills": skills,
+        "traces": traces,
+    }
+
+    if include_icons:
+        res["icon"] = IMG_BASE_URL + character["preview"]
+        res["splash"] = IMG_BASE_URL + character["portrait"]
+        res["mini_icon"] = MINI_ICON_BASE_URL + urllib.parse.quote(
+            f"data/mini_icons/{''.join([c for c in name if c.isalnum() or c == '#'])}.png"
+        )
+
+    return name, res
+
+
+def _get_character_fingerprint(character: dict) -> str:
+    """Get a fingerprint of a character and every source row joined into it.
+
+    :param character: A dictionary containing character data.
+    :return: The fingerprint.
+    """
+    CHARACTER_PROMOTIONS_JSON = load_json(
+        CHARACTER_PROMOTIONS, FIELDS[CHARACTER_PROMOTIONS]
+    )
+    CHARACTER_SKILLS_JSON = load_json(CHARACTER_SKILLS, FIELDS[CHARACTER_SKILLS])
+    CHARACTER_SKILL_TREES_JSON = load_json(
+        CHARACTER_SKILL_TREES, FIELDS[CHARACTER_SKILL_TREES]
+    )
+    CHARACTER_RANKS_JSON = load_json(CHARACTER_RANKS, FIELDS[CHARACTER_RANKS])
+
+    ranks = [CHARACTER_RANKS_JSON[rank_id] for rank_id in character["ranks"]]
+    skill_ids = set(character["skills"])
+    for rank in ranks:
+        skill_ids.update(skill["id"] for skill in rank["level_up_skills"] or [])
+
+    return get_fingerprint(
+        character,
+        CHARACTER_PROMOTIONS_JSON[character["id"]],
+        ranks,
+        [CHARACTER_SKILLS_JSON[skill_id] for skill_id in sorted(skill_ids)],
+        [CHARACTER_SKILL_TREES_JSON[tree_id] for tree_id in character["skill_trees"]],
+    )
 
 
 def _format_name(character: dict) -> str:
@@ -238,8 +458,7 @@ def _format_modifier(modifier: dict) -> dict:
         "SPRatioBase": "energy",
         "AllDamageTypeAddedRatio": "all_dmg",
     }
-    modifier["type"] = type_map[modifier["type"]]
-    return modifier
+    return {**modifier, "type": type_map[modifier["type"]]}
 
 
 def _add_skills(traces: dict, character: dict, include_icons: bool) -> dict:
@@ -249,8 +468,7 @@ def _add_skills(traces: dict, character: dict, include_icons: bool) -> dict:
     :param character: A dictionary containing character data.
     :param include_icons: Whether to include icons in the output.
     """
-    with open(CHARACTER_SKILLS, "r", encoding="utf-8") as f:
-        CHARACTER_SKILLS_JSON = json.load(f)
+    CHARACTER_SKILLS_JSON = load_json(CHARACTER_SKILLS, FIELDS[CHARACTER_SKILLS])
 
     for skill_id in character["skills"][:4]:
         skill = CHARACTER_SKILLS_JSON[skill_id]
@@ -275,8 +493,7 @@ def _add_technique_trace(traces: dict, character: dict, include_icons: bool) ->
     :param character: A dictionary containing character data.
     :param include_icons: Whether to include icons in the output.
     """
-    with open(CHARACTER_SKILLS, "r", encoding="utf-8") as f:
-        CHARACTER_SKILLS_JSON = json.load(f)
+    CHARACTER_SKILLS_JSON = load_json(CHARACTER_SKILLS, FIELDS[CHARACTER_SKILLS])
 
     skill_id = character["skills"][5]
     skill = CHARACTER_SKILLS_JSON[skill_id]
@@ -306,8 +523,9 @@ def _add_ability_traces(traces: dict, character: dict, include_icons: bool) -> d
     :param character: A dictionary containing character data.
     :param include_icons: Whether to include icons in the output.
     """
-    with open(CHARACTER_SKILL_TREES, "r", encoding="utf-8") as f:
-        CHARACTER_SKILL_TREES_JSON = json.load(f)
+    CHARACTER_SKILL_TREES_JSON = load_json(
+        CHARACTER_SKILL_TREES, FIELDS[CHARACTER_SKILL_TREES]
+    )
 
     for i, skill_id in enumerate(character["skill_trees"][5:8]):
         skill = CHARACTER_SKILL_TREES_JSON[skill_id]
@@ -337,8 +555,9 @@ def _add_passive_traces(traces: dict, character: dict, include_icons: bool) -> d
     :param character: A dictionary containing character data.
     :param include_icons: Whether to include icons in the output.
     """
-    with open(CHARACTER_SKILL_TREES, "r", encoding="utf-8") as f:
-        CHARACTER_SKILL_TREES_JSON = json.load(f)
+    CHARACTER_SKILL_TREES_JSON = load_json(
+        CHARACTER_SKILL_TREES, FIELDS[CHARACTER_SKILL_TREES]
+    )
 
     for i, skill_id in enumerate(character["skill_trees"][8:]):
         skill = CHARACTER_SKILL_TREES_JSON[skill_id]
@@ -354,6 +573,196 @@ def _add_passive_traces(traces: dict, character: dict, include_icons: bool) -> d
             traces[f"stat_{i+1}"]["icon"] = IMG_BASE_URL + skill["icon"]
 
 
+def get_trace_trees() -> dict:
+    """Get the trace tree of every character from game files.
+
+    Each tree maps node anchors to nodes, with the anchors of the nodes that
+    must be unlocked first as `pre_points` and the stat bonuses of the node as
+    `modifiers`. Nodes with modifiers are numbered in `bonus_nodes` order, and
+    `bonuses[mask]` holds the cumulative value of every stat in `stats` with
+    the bonus nodes in `mask` unlocked, or null if their prerequisites don't
+    allow that combination.
+
+    :return: A dictionary containing the game version and the trace trees.
+    """
+    CHARACTER_JSON = load_json(CHARACTERS, FIELDS[CHARACTERS])
+
+    return {
+        "version": _get_version(),
+        "characters": {
+            _format_name(character): _get_trace_tree(character)
+            for character in CHARACTER_JSON.values()
+        },
+    }
+
+
+def _get_trace_tree(character: dict) -> dict:
+    """Get the trace tree of a character.
+
+    :param character: A dictionary containing character data.
+    :return: A dictionary containing the nodes and cumulative bonuses.
+    """
+    CHARACTER_SKILL_TREES_JSON = load_json(
+        CHARACTER_SKILL_TREES, FIELDS[CHARACTER_SKILL_TREES]
+    )
+
+    skill_trees = [
+        CHARACTER_SKILL_TREES_JSON[skill_id] for skill_id in character["skill_trees"]
+    ]
+    anchors = {skill["id"]: skill["anchor"] for skill in skill_trees}
+
+    nodes = {}
+    for skill in skill_trees:
+        level = skill["levels"][0]
+        nodes[skill["anchor"]] = {
+            "name": skill["name"],
+            "max_level": skill["max_level"],
+            "pre_points": [anchors[point] for point in skill["pre_points"]],
+            "promotion": level["promotion"],
+            "level": level["level"],
+            "modifiers": [
+                _format_modifier(modifier) for modifier in level["properties"]
+            ],
+        }
+
+    bonus_nodes = [anchor for anchor, node in nodes.items() if node["modifiers"]]
+    stats = []
+    for anchor in bonus_nodes:
+        for modifier in nodes[anchor]["modifiers"]:
+            if modifier["type"] not in stats:
+                stats.append(modifier["type"])
+
+    return {
+        "nodes": nodes,
+        "bonus_nodes": bonus_nodes,
+        "stats": stats,
+        "bonuses": _get_trace_bonuses(nodes, bonus_nodes, stats),
+    }
+
+
+def _get_trace_bonuses(nodes: dict, bonus_nodes: list, stats: list) -> list:
+    """Get the cumulative stat bonuses of every combination of bonus nodes.
+
+    :param nodes: A dictionary mapping anchors to nodes.
+    :param bonus_nodes: The anchors of the nodes with modifiers, in bit order.
+    :param stats: The stats to sum.
+    :return: A list indexed by bitmask of lists of stat values, with None for
+        combinations that can't be unlocked.
+    """
+    bits = {anchor: 1 << i for i, anchor in enumerate(bonus_nodes)}
+
+    # bonus nodes that must be unlocked before each bonus node, including those
+    # reached through nodes without modifiers
+    required = {}
+
+    def get_required(anchor: str) -> int:
+        if anchor not in required:
+            required[anchor] = 0
+            for point in nodes[anchor]["pre_points"]:
+                required[anchor] |= bits.get(point, 0) | get_required(point)
+        return required[anchor]
+
+    values = []
+    for anchor in bonus_nodes:
+        row = [0] * len(stats)
+        for modifier in nodes[anchor]["modifiers"]:
+            row[stats.index(modifier["type"])] += modifier["value"]
+        values.append(row)
+
+    sums = [[0] * len(stats)]
+    for mask in range(1, 1 << len(bonus_nodes)):
+        i = (mask & -mask).bit_length() - 1
+        rest = sums[mask & (mask - 1)]
+        sums.append([a + b for a, b in zip(rest, values[i])])
+
+    res = []
+    for mask, row in enumerate(sums):
+        if all(
+            get_required(anchor) & mask == get_required(anchor)
+            for anchor in bonus_nodes
+            if mask & bits[anchor]
+        ):
+            res.append([round(value, TRACE_BONUS_PRECISION) for value in row])
+        else:
+            res.append(None)
+
+    return res
+
+
+def get_material_costs() -> dict:
+    """Get the cumulative promotion material costs of every character and light
+    cone from game files.
+
+    For each entity, `costs[p]` holds the total number of each of its `items`
+    needed to ascend from promotion 0 to promotion `p`, so the cost between
+    two promotions is a single row subtraction.
+
+    :return: A dictionary containing the game version, the max level of each
+        promotion, item names by id, and the character and light cone costs.
+    """
+    CHARACTER_JSON = load_json(CHARACTERS, FIELDS[CHARACTERS])
+    CHARACTER_PROMOTIONS_JSON = load_json(
+        CHARACTER_PROMOTIONS, FIELDS[CHARACTER_PROMOTIONS]
+    )
+    LIGHT_CONE_JSON = load_json(LIGHT_CONES, FIELDS[LIGHT_CONES])
+    LIGHT_CONE_PROMOTIONS_JSON = load_json(
+        LIGHT_CONE_PROMOTIONS, FIELDS[LIGHT_CONE_PROMOTIONS]
+    )
+    ITEMS_JSON = load_json(ITEMS, FIELDS[ITEMS])
+
+    characters = {
+        _format_name(character): _get_material_costs(
+            CHARACTER_PROMOTIONS_JSON[character["id"]]["materials"]
+        )
+        for character in CHARACTER_JSON.values()
+    }
+    light_cones = {
+        light_cone["name"]: _get_material_costs(
+            LIGHT_CONE_PROMOTIONS_JSON[light_cone["id"]]["materials"]
+        )
+        for light_cone in LIGHT_CONE_JSON.values()
+    }
+
+    items = {}
+    for costs in [*characters.values(), *light_cones.values()]:
+        for item_id in costs["items"]:
+            if item_id not in ITEMS_JSON:
+                print(f"WARN: Missing item {item_id}")
+            items[item_id] = ITEMS_JSON.get(item_id, {}).get("name", item_id)
+
+    return {
+        "version": _get_version(),
+        "max_levels": PROMOTION_MAX_LEVELS,
+        "items": dict(sorted(items.items(), key=lambda item: int(item[0]))),
+        "characters": characters,
+        "light_cones": light_cones,
+    }
+
+
+def _get_material_costs(materials: list) -> dict:
+    """Prefix-sum the promotion materials of an entity.
+
+    :param materials: A list of `{id, num}` lists, where the list at index `p`
+        holds the materials needed to ascend from promotion `p` to `p + 1`.
+    :return: A dictionary with the `items` ids and the cumulative `costs` of
+        each promotion, one column per item.
+    """
+    items = []
+    for promotion in materials:
+        for material in promotion:
+            if material["id"] not in items:
+                items.append(material["id"])
+
+    costs = [[0] * len(items)]
+    for promotion in materials:
+        row = list(costs[-1])
+        for material in promotion:
+            row[items.index(material["id"])] += material["num"]
+        costs.append(row)
+
+    return {"items": items, "costs": costs}
+
+
 def _get_eidolons(character: dict, include_icons: bool) -> dict:
     """Get the eidolons of a character.
 
@@ -361,10 +770,8 @@ def _get_eidolons(character: dict, include_icons: bool) -> dict:
     :param include_icons: Whether to include icons in the output.
     :return: A dictionary containing the eidolons of a character.
     """
-    with open(CHARACTER_RANKS, "r", encoding="utf-8") as f:
-        CHARACTER_RANKS_JSON = json.load(f)
-    with open(CHARACTER_SKILLS, "r", encoding="utf-8") as f:
-        CHARACTER_SKILLS_JSON = json.load(f)
+    CHARACTER_RANKS_JSON = load_json(CHARACTER_RANKS, FIELDS[CHARACTER_RANKS])
+    CHARACTER_SKILLS_JSON = load_json(CHARACTER_SKILLS, FIELDS[CHARACTER_SKILLS])
 
     ranks = []
     for rank_id in character["ranks"]:
@@ -0,0 +1,188 @@
+from math import comb, floor
+from extractors.relic_stat_vals import (
+    FIELDS as RELIC_STAT_VALS_FIELDS,
+    SOURCES as RELIC_STAT_VALS_SOURCES,
+    get_relic_stat_vals,
+)
+from extractors.relic_roll_vals import (
+    RARITIES,
+    calculate_substat_value,
+    normalize_substat_value,
+)
+
+
+# source files read by this extractor, through `get_relic_stat_vals`
+SOURCES = RELIC_STAT_VALS_SOURCES
+
+# fields read from the rows of each source file, the rest are dropped while parsing
+FIELDS = RELIC_STAT_VALS_FIELDS
+
+# number of equally likely roll tiers (low, mid, high), worth 80%, 90% and 100%
+# of a full roll
+ROLL_TIERS = 3
+LOW_ROLL = 8
+
+# number of substats an upgrade picks from
+SUBSTATS_PER_RELIC = 4
+
+
+def get_relic_roll_dists(substat_data: dict = None) -> dict:
+    """
+    Get the exact probability distributions of substat values.
+
+    Probabilities are stored as integer counts over a common denominator, with
+    aligned `values` and `counts` arrays sorted by value. For each rarity there
+    are three tables:
+
+    - `rolls`: the value of a substat rolled `n` times, with a denominator of 3^n.
+    - `upgrades`: the value of a substat after `n` upgrades of the relic, each
+      landing on the substat with a 1 in 4 chance.
+    - `roll_counts`: the number of extra rolls a substat gets from `n` upgrades.
+
+    :param substat_data: The `sub` relic stat values, defaults to reading them
+        from the game files.
+    :return: A dictionary containing the distributions of each rarity.
+    """
+    if substat_data is None:
+        substat_data = get_relic_stat_vals()["sub"]
+
+    res = {}
+    for r in RARITIES:
+        rarity = r["rarity"]
+        max_rolls = r["max_upgrades"] + 1
+        roll_counts = {
+            n: _get_roll_count_counts(n) for n in range(r["max_upgrades"] + 1)
+        }
+
+        rolls, upgrades = {}, {}
+        for substat, value in substat_data[rarity].items():
+            by_rolls = {
+                n: _get_value_counts(substat, value, n)
+                for n in range(1, max_rolls + 1)
+            }
+            rolls[substat] = {
+                n: _format_dist(counts, ROLL_TIERS**n)
+                for n, counts in by_rolls.items()
+            }
+            upgrades[substat] = {
+                n: _format_dist(
+                    _mix(counts, by_rolls, n),
+                    SUBSTATS_PER_RELIC**n * ROLL_TIERS ** (n + 1),
+                )
+                for n, counts in roll_counts.items()
+            }
+
+        res[rarity] = {
+            "max_upgrades": r["max_upgrades"],
+            "rolls": rolls,
+            "upgrades": upgrades,
+            "roll_counts": {
+                n: {"counts": counts, "denominator": SUBSTATS_PER_RELIC**n}
+                for n, counts in roll_counts.items()
+            },
+        }
+
+    return res
+
+
+def convolve(a: list, b: list) -> list:
+    """
+    Convolve two integer count arrays.
+
+    :param a: Counts indexed by offset.
+    :param b: Counts indexed by offset.
+    :return: Counts of the summed offsets.
+    """
+    res = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                res[i + j] += x * y
+    return res
+
+
+def _get_tier_counts(n: int) -> list:
+    """
+    Count the ways `n` rolls add up to each sum of roll tiers.
+
+    :param n: Number of rolls.
+    :return: Counts indexed by the sum of tiers, from 0 (all low) to 2n (all high).
+    """
+    res = [1]
+    for _ in range(n):
+        res = convolve(res, [1] * ROLL_TIERS)
+    return res
+
+
+def _get_value_counts(substat: str, value: int | dict, n: int) -> dict:
+    """
+    Count the ways `n` rolls produce each displayed substat value.
+
+    :param substat: Substat name.
+    :param value: Base value of the substat (i.e. what 100% would be).
+    :param n: Number of rolls.
+    :return: Dictionary mapping displayed values to counts.
+    """
+    res = {}
+    for tiers, count in enumerate(_get_tier_counts(n)):
+        if substat == "SPD":
+            # every combination with the same sum of tiers has the same value
+            high, mid = divmod(tiers, 2)
+            key = floor(
+                value["high"] * high
+                + value["mid"] * mid
+                + value["low"] * (n - high - mid)
+            )
+        else:
+            key = calculate_substat_value(
+                value, LOW_ROLL * n + tiers, False, substat.endswith("_")
+            )[0]
+        key = normalize_substat_value(key)
+        res[key] = res.get(key, 0) + count
+
+    return res
+
+
+def _get_roll_count_counts(n: int) -> list:
+    """
+    Count the ways `n` upgrades give a substat each number of extra rolls.
+
+    :param n: Number of upgrades.
+    :return: Counts indexed by the number of extra rolls, over 4^n.
+    """
+    return [comb(n, k) * (SUBSTATS_PER_RELIC - 1) ** (n - k) for k in range(n + 1)]
+
+
+def _mix(roll_counts: list, by_rolls: dict, n: int) -> dict:
+    """
+    Mix the value counts of each roll count, weighted by the roll count counts.
+
+    :param roll_counts: Counts of extra rolls after `n` upgrades.
+    :param by_rolls: Dictionary mapping roll counts to value counts.
+    :param n: Number of upgrades.
+    :return: Dictionary mapping displayed values to counts over 4^n * 3^(n+1).
+    """
+    res = {}
+    for extra, weight in enumerate(roll_counts):
+        # scale each roll count to the common 3^(n+1) denominator
+        scale = weight * ROLL_TIERS ** (n - extra)
+        for key, count in by_rolls[extra + 1].items():
+            res[key] = res.get(key, 0) + count * scale
+    return res
+
+
+def _format_dist(counts: dict, denominator: int) -> dict:
+    """
+    Format value counts as aligned arrays sorted by value.
+
+    :param counts: Dictionary mapping values to counts.
+    :param denominator: Total of the counts.
+    :return: Dictionary with `values`, `counts` and `denominator`.
+    """
+    values = sorted(counts)
+    return {
+        "values": values,
+        "counts": [counts[v] for v in values],
+        "denominator": denominator,
+    }
+
@@ -1,12 +1,25 @@
 from math import ceil, floor
-import os
-import json
 from itertools import combinations_with_replacement
-from relic_stat_vals import get_relic_stat_vals
+from extractors.relic_stat_vals import (
+    FIELDS as RELIC_STAT_VALS_FIELDS,
+    SOURCES as RELIC_STAT_VALS_SOURCES,
+    get_relic_stat_vals,
+)
 
 
-# output folder
-OUTPUT_PATH = "output"
+# source files read by this extractor, through `get_relic_stat_vals`
+SOURCES = RELIC_STAT_VALS_SOURCES
+
+# fields read from the rows of each source file, the rest are dropped while parsing
+FIELDS = RELIC_STAT_VALS_FIELDS
+
+# max number of upgrades (every 3 levels) of each relic rarity
+RARITIES = [
+    {"rarity": 2, "max_upgrades": 0},
+    {"rarity": 3, "max_upgrades": 1},
+    {"rarity": 4, "max_upgrades": 3},
+    {"rarity": 5, "max_upgrades": 5},
+]
 
 
 def generate_sums(nums: list, n: int) -> list:
@@ -70,22 +83,30 @@ def calculate_substat_value(
         return [int(value * p / 10)]
 
 
+def normalize_substat_value(value: int | float) -> int | float:
+    """
+    Normalize a calculated substat value to how it's displayed in game.
+
+    :param value: Calculated substat value.
+    :return: The value, with 0 shown as 1 and whole numbers as integers.
+    """
+    if value == 0:
+        return 1
+    elif str(value).endswith(".0"):
+        return int(value)
+    return value
+
+
 def generate_rarity_data() -> dict:
     """
     Generate data for each rarity.
 
     :return: Dictionary with substat data for each rarity
     """
-    rarities = [
-        {"rarity": 2, "max_upgrades": 0},
-        {"rarity": 3, "max_upgrades": 1},
-        {"rarity": 4, "max_upgrades": 3},
-        {"rarity": 5, "max_upgrades": 5},
-    ]
     res = {}
     substat_data = get_relic_stat_vals()["sub"]
 
-    for r in rarities:
+    for r in RARITIES:
         rarity = r["rarity"]
         possible_vals = generate_sums([8, 9, 10], (r["max_upgrades"] + 1) * 10)
         curr_rarity = {}
@@ -97,10 +118,7 @@ def generate_rarity_data() -> dict:
                 keys = calculate_substat_value(value, p, is_speed, is_percentage)
 
                 for key in keys:
-                    if key == 0:
-                        key = 1
-                    elif str(key).endswith(".0"):
-                        key = int(key)
+                    key = normalize_substat_value(key)
 
                     # check for overlapping roll values
                     if key not in curr_substat:
@@ -117,16 +135,3 @@ def generate_rarity_data() -> dict:
 
     return res
 
-
-def main():
-    """Generate relic stats vals from game files and write it to output folder."""
-
-    relic_roll_vals = generate_rarity_data()
-    with open(os.path.join(OUTPUT_PATH, "relic_roll_vals.json"), "w") as f:
-        json.dump(relic_roll_vals, f, indent=4)
-    with open(os.path.join(OUTPUT_PATH, "min", "relic_roll_vals.json"), "w") as f:
-        json.dump(relic_roll_vals, f, separators=(",", ":"), indent=None)
-
-
-if __name__ == "__main__":
-    main()
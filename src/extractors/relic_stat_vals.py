@@ -1,16 +1,22 @@
-import json
 import os
 from collections import defaultdict
+from utils.sources import load_json
 
 
-# output folder
-OUTPUT_PATH = "output"
-
 # file paths as of https://github.com/Mar-7th/StarRailRes/commit/8d8f306 (Nov 14, 2023)
 STAR_RAIL_RES_PATH = "src/data/repos/StarRailRes"
 RELIC_MAIN_AFFIXES = STAR_RAIL_RES_PATH + "/index_new/en/relic_main_affixes.json"
 RELIC_SUB_AFFIXES = STAR_RAIL_RES_PATH + "/index_new/en/relic_sub_affixes.json"
 
+# source files read by this extractor
+SOURCES = [RELIC_MAIN_AFFIXES, RELIC_SUB_AFFIXES]
+
+# fields read from the rows of each source file, the rest are dropped while parsing
+FIELDS = {
+    RELIC_MAIN_AFFIXES: {"affixes"},
+    RELIC_SUB_AFFIXES: {"affixes"},
+}
+
 PROPERTY_TO_MAIN = {
     "HPDelta": "HP",
     "AttackDelta": "ATK",
@@ -69,8 +75,7 @@ def _get_main_affixes():
 
     :return: A dictionary containing relic main affixes values.
     """
-    with open(RELIC_MAIN_AFFIXES, "r", encoding="utf-8") as f:
-        RELIC_MAIN_AFFIXES_JSON = json.load(f)
+    RELIC_MAIN_AFFIXES_JSON = load_json(RELIC_MAIN_AFFIXES, FIELDS[RELIC_MAIN_AFFIXES])
 
     slots = ["Head", "Hands", "Body", "Feet", "Planar Sphere", "Link Rope"]
     rarities = [2, 3, 4, 5]
@@ -95,8 +100,7 @@ def _get_sub_affixes():
 
     :return: A dictionary containing relic sub affixes values.
     """
-    with open(RELIC_SUB_AFFIXES, "r", encoding="utf-8") as f:
-        RELIC_SUB_AFFIXES_JSON = json.load(f)
+    RELIC_SUB_AFFIXES_JSON = load_json(RELIC_SUB_AFFIXES, FIELDS[RELIC_SUB_AFFIXES])
 
     rarities = [2, 3, 4, 5]
     res = {}
@@ -120,20 +124,3 @@ def _get_sub_affixes():
 
     return res
 
-
-def main():
-    """Generate relic stats vals from game files and write it to output folder."""
-    if not os.path.exists(OUTPUT_PATH):
-        os.makedirs(OUTPUT_PATH)
-    if not os.path.exists(os.path.join(OUTPUT_PATH, "min")):
-        os.makedirs(os.path.join(OUTPUT_PATH, "min"))
-
-    relic_stat_vals = get_relic_stat_vals()
-    with open(os.path.join(OUTPUT_PATH, "relic_stat_vals.json"), "w") as f:
-        json.dump(relic_stat_vals, f, indent=4)
-    with open(os.path.join(OUTPUT_PATH, "min", "relic_stat_vals.json"), "w") as f:
-        json.dump(relic_stat_vals, f, separators=(",", ":"), indent=None)
-
-
-if __name__ == "__main__":
-    main()
@@ -0,0 +1,36 @@
+from utils.desc_lookup import iter_desc_templates
+from utils.helpers import render_desc
+
+
+def get_rendered_descs(game_data_verbose: dict) -> dict:
+    """Get the rendered description of every skill, eidolon and light cone
+    ability at every level.
+
+    Consecutive levels that render identically are stored once: `levels` holds
+    the first level of each distinct description in `descs`.
+
+    :param game_data_verbose: The verbose game data, as returned by
+        `get_game_data_verbose`.
+    :return: A dictionary containing the rendered descriptions of characters
+        and light cones, keyed by entity name and skill key.
+    """
+    res = {
+        "version": game_data_verbose["version"],
+        "characters": {},
+        "light_cones": {},
+    }
+    for kind, name, skill, desc, params in iter_desc_templates(game_data_verbose):
+        levels = []
+        descs = []
+        for level, row in enumerate(params, 1):
+            rendered = render_desc(desc, row)
+            if not descs or rendered != descs[-1]:
+                levels.append(level)
+                descs.append(rendered)
+        res[kind].setdefault(name, {})[skill] = {
+            "max_level": len(params),
+            "levels": levels,
+            "descs": descs,
+        }
+
+    return res
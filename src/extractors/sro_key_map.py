@@ -1,9 +1,3 @@
-import os
-import json
-
-# output folder
-OUTPUT_PATH = "output"
-
 TRAILBLAZER_MAPPINGS = {
     "TrailblazerDestruction": "TrailblazerPhysical",
     "TrailblazerPreservation": "TrailblazerFire",
@@ -72,28 +66,3 @@ def get_sro_mappings(game_data: dict, swap: bool = False):
 
     return sro_key_map
 
-
-def main():
-    """Generate SRO character key mappings from game files and write it to output folder."""
-    if not os.path.exists(os.path.join(OUTPUT_PATH, "game_data.json")):
-        print("Game data not found. Run game_data.py first.")
-        return
-
-    with open(os.path.join(OUTPUT_PATH, "game_data.json"), "r") as f:
-        game_data = json.load(f)
-
-    sro_key_map = get_sro_mappings(game_data)
-    with open(os.path.join(OUTPUT_PATH, "sro_key_map.json"), "w") as f:
-        json.dump(sro_key_map, f, indent=4)
-    with open(os.path.join(OUTPUT_PATH, "min", "sro_key_map.json"), "w") as f:
-        json.dump(sro_key_map, f, separators=(",", ":"), indent=None)
-
-    sro_to_hsrs = get_sro_mappings(game_data, swap=True)
-    with open(os.path.join(OUTPUT_PATH, "sro_to_hsrs.json"), "w") as f:
-        json.dump(sro_to_hsrs, f, indent=4)
-    with open(os.path.join(OUTPUT_PATH, "min", "sro_to_hsrs.json"), "w") as f:
-        json.dump(sro_to_hsrs, f, separators=(",", ":"), indent=None)
-
-
-if __name__ == "__main__":
-    main()
@@ -0,0 +1,74 @@
+from utils.helpers import PROMOTION_MAX_LEVELS
+
+
+CHARACTER_STATS = ["hp", "atk", "def", "spd"]
+LIGHT_CONE_STATS = ["hp", "atk", "def"]
+
+# decimals kept for stat values
+PRECISION = 6
+
+
+def get_stat_curves(game_data_verbose: dict) -> dict:
+    """Get the base stats of every character and light cone at every level.
+
+    Each entity is stored as a flat list of values, one row per breakpoint and
+    one column per stat. A breakpoint is a `(level, promotion)` pair, so max
+    levels appear twice: before and after ascending.
+
+    :param game_data_verbose: The verbose game data, as returned by
+        `get_game_data_verbose`.
+    :return: A dictionary containing the breakpoints and stat curves.
+    """
+    breakpoints = get_breakpoints()
+
+    return {
+        "version": game_data_verbose["version"],
+        "breakpoints": breakpoints,
+        "characters": {
+            "stats": CHARACTER_STATS,
+            "values": {
+                name: _get_curve(character["ascension"], CHARACTER_STATS, breakpoints)
+                for name, character in game_data_verbose["characters"].items()
+            },
+        },
+        "light_cones": {
+            "stats": LIGHT_CONE_STATS,
+            "values": {
+                name: _get_curve(light_cone["ascension"], LIGHT_CONE_STATS, breakpoints)
+                for name, light_cone in game_data_verbose["light_cones"].items()
+            },
+        },
+    }
+
+
+def get_breakpoints() -> list:
+    """Get every `(level, promotion)` pair from level 1 to the max level.
+
+    :return: A list of `[level, promotion]` pairs, ordered by promotion then level.
+    """
+    res = []
+    min_level = 1
+    for promotion, max_level in enumerate(PROMOTION_MAX_LEVELS):
+        res += [[level, promotion] for level in range(min_level, max_level + 1)]
+        min_level = max_level
+
+    return res
+
+
+def _get_curve(ascension: list, stats: list, breakpoints: list) -> list:
+    """Evaluate the promotion values of an entity at every breakpoint.
+
+    :param ascension: A list of `{stat: {base, step}}` dictionaries, one per promotion.
+    :param stats: The stats to evaluate.
+    :param breakpoints: A list of `[level, promotion]` pairs.
+    :return: A flat list of stat values.
+    """
+    return [
+        round(
+            ascension[promotion][stat]["base"]
+            + ascension[promotion][stat]["step"] * (level - 1),
+            PRECISION,
+        )
+        for level, promotion in breakpoints
+        for stat in stats
+    ]
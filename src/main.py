@@ -1,58 +1,496 @@
-import json
+import argparse
+import hashlib
 import os
-from extractors.game_data_verbose import get_game_data_verbose
-from extractors.game_data import get_game_data
-from extractors.sro_key_map import get_sro_mappings
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+from utils.incremental import load_cache, save_cache
+from utils.json_backend import dumps
+from utils.json_stream import write_json_stream
+from utils.publish import (
+    KEEP_BUILDS,
+    CanonicalSpool,
+    activate_build,
+    prune_builds,
+    prune_hashed,
+    publish_hashed,
+    publish_hashed_file,
+    publish_hashed_stream,
+    stage_build,
+    update_manifest,
+)
+from utils.sources import prefetch, set_low_memory
+from utils.watch import watch
 
 
 # output folder
 OUTPUT_PATH = "output"
 
+# records of the previous build into each output folder, used by incremental builds
+CACHE_DIR = ".cache/incremental"
+
+# store of the verbose game data of every recorded game version, in the output folder
+HISTORY_FILE = "history.sqlite"
+
+# artifacts written by the build. Extractor modules are only imported when one
+# of their artifacts is built; `build` (and `stream`, `inputs`) receive the
+# artifact's `module`, whose `SOURCES` are its inputs by default.
+# artifacts with a `write` function are written to `file` instead of as JSON.
+# artifacts with a `stream` function can be written record by record.
+# `optional` artifacts are only built when selected with `--only`.
+# the data of the `history` artifact is what `build --history` records.
+ARTIFACTS = {
+    "game_data": {
+        "module": "extractors.game_data",
+        "build": lambda m, cache: m.get_game_data(include_icons=False, cache=cache),
+    },
+    "game_data_with_icons": {
+        "module": "extractors.game_data",
+        "inputs": lambda m: m.SOURCES + [m.MINI_ICONS_PATH],
+        "build": lambda m, cache: m.get_game_data(include_icons=True, cache=cache),
+    },
+    "game_data_verbose": {
+        "module": "extractors.game_data_verbose",
+        "history": True,
+        "build": lambda m, cache: m.get_game_data_verbose(
+            include_icons=False, cache=cache
+        ),
+        "stream": lambda m: m.iter_game_data_verbose(include_icons=False),
+    },
+    "game_data_verbose_with_icons": {
+        "module": "extractors.game_data_verbose",
+        "build": lambda m, cache: m.get_game_data_verbose(
+            include_icons=True, cache=cache
+        ),
+        "stream": lambda m: m.iter_game_data_verbose(include_icons=True),
+    },
+    "game_data_verbose_with_icons_encoded": {
+        "module": "extractors.game_data_verbose",
+        "build": lambda m, cache: import_module(
+            "utils.string_tables"
+        ).encode_string_tables(
+            m.get_game_data_verbose(include_icons=True, cache=cache),
+            [m.IMG_BASE_URL, m.MINI_ICON_BASE_URL],
+        ),
+    },
+    "game_data_verbose_compact": {
+        "module": "extractors.game_data_verbose",
+        "build": lambda m, cache: import_module(
+            "utils.compact_params"
+        ).compact_game_data_params(
+            m.get_game_data_verbose(include_icons=False, cache=cache)
+        ),
+    },
+    "game_data_sqlite": {
+        "module": "extractors.game_data_verbose",
+        "build": lambda m, cache: m.get_game_data_verbose(
+            include_icons=False, cache=cache
+        ),
+        "file": "game_data.sqlite",
+        "write": lambda data, path: import_module(
+            "extractors.game_data_sqlite"
+        ).write_game_data_sqlite(data, path),
+    },
+    "stat_curves": {
+        "module": "extractors.game_data_verbose",
+        "build": lambda m, cache: import_module(
+            "extractors.stat_curves"
+        ).get_stat_curves(m.get_game_data_verbose(include_icons=False, cache=cache)),
+    },
+    "trace_trees": {
+        "module": "extractors.game_data_verbose",
+        "inputs": lambda m: [m.INFO, m.CHARACTERS, m.CHARACTER_SKILL_TREES],
+        "build": lambda m, cache: m.get_trace_trees(),
+    },
+    "material_costs": {
+        "module": "extractors.game_data_verbose",
+        "inputs": lambda m: [
+            m.INFO,
+            m.CHARACTERS,
+            m.CHARACTER_PROMOTIONS,
+            m.LIGHT_CONES,
+            m.LIGHT_CONE_PROMOTIONS,
+            m.ITEMS,
+        ],
+        "build": lambda m, cache: m.get_material_costs(),
+    },
+    "skill_levels": {
+        "module": "extractors.game_data",
+        "inputs": lambda m: [m.CHARACTERS, m.EIDOLONS, m.SKILLS],
+        "build": lambda m, cache: m.get_skill_levels(),
+    },
+    "rendered_descs": {
+        "module": "extractors.game_data_verbose",
+        "build": lambda m, cache: import_module(
+            "extractors.rendered_descs"
+        ).get_rendered_descs(m.get_game_data_verbose(include_icons=False, cache=cache)),
+        "optional": True,
+    },
+    "sro_key_map": {
+        "module": "extractors.game_data",
+        "build": lambda m, cache: import_module(
+            "extractors.sro_key_map"
+        ).get_sro_mappings(m.get_game_data(include_icons=False)),
+    },
+    "sro_to_hsrs": {
+        "module": "extractors.game_data",
+        "build": lambda m, cache: import_module(
+            "extractors.sro_key_map"
+        ).get_sro_mappings(m.get_game_data(include_icons=False), swap=True),
+    },
+    "relic_stat_vals": {
+        "module": "extractors.relic_stat_vals",
+        "build": lambda m, cache: m.get_relic_stat_vals(),
+    },
+    "relic_roll_vals": {
+        "module": "extractors.relic_roll_vals",
+        "build": lambda m, cache: m.generate_rarity_data(),
+    },
+    "relic_roll_dists": {
+        "module": "extractors.relic_roll_dists",
+        "build": lambda m, cache: m.get_relic_roll_dists(),
+    },
+}
+
 
 def main():
     """Generate game data from game files and write it to output folder."""
-    if not os.path.exists(OUTPUT_PATH):
-        os.makedirs(OUTPUT_PATH)
-    if not os.path.exists(os.path.join(OUTPUT_PATH, "min")):
-        os.makedirs(os.path.join(OUTPUT_PATH, "min"))
-
-    game_data = get_game_data(include_icons=False)
-    with open(os.path.join(OUTPUT_PATH, "game_data.json"), "w") as f:
-        json.dump(game_data, f, indent=4)
-    with open(os.path.join(OUTPUT_PATH, "min", "game_data.json"), "w") as f:
-        json.dump(game_data, f, separators=(",", ":"), indent=None)
-
-    game_data_with_icons = get_game_data(include_icons=True)
-    with open(os.path.join(OUTPUT_PATH, "game_data_with_icons.json"), "w") as f:
-        json.dump(game_data_with_icons, f, indent=4)
-    with open(os.path.join(OUTPUT_PATH, "min", "game_data_with_icons.json"), "w") as f:
-        json.dump(game_data_with_icons, f, separators=(",", ":"), indent=None)
-
-    game_data_verbose = get_game_data_verbose(include_icons=False)
-    with open(os.path.join(OUTPUT_PATH, "game_data_verbose.json"), "w") as f:
-        json.dump(game_data_verbose, f, indent=4)
-    with open(os.path.join(OUTPUT_PATH, "min", "game_data_verbose.json"), "w") as f:
-        json.dump(game_data_verbose, f, separators=(",", ":"), indent=None)
-
-    game_data_verbose_with_icons = get_game_data_verbose(include_icons=True)
-    with open(os.path.join(OUTPUT_PATH, "game_data_verbose_with_icons.json"), "w") as f:
-        json.dump(game_data_verbose_with_icons, f, indent=4)
-    with open(
-        os.path.join(OUTPUT_PATH, "min", "game_data_verbose_with_icons.json"), "w"
-    ) as f:
-        json.dump(game_data_verbose_with_icons, f, separators=(",", ":"), indent=None)
-
-    sro_key_map = get_sro_mappings(game_data)
-    with open(os.path.join(OUTPUT_PATH, "sro_key_map.json"), "w") as f:
-        json.dump(sro_key_map, f, indent=4)
-    with open(os.path.join(OUTPUT_PATH, "min", "sro_key_map.json"), "w") as f:
-        json.dump(sro_key_map, f, separators=(",", ":"), indent=None)
-
-    sro_to_hsrs = get_sro_mappings(game_data, swap=True)
-    with open(os.path.join(OUTPUT_PATH, "sro_to_hsrs.json"), "w") as f:
-        json.dump(sro_to_hsrs, f, indent=4)
-    with open(os.path.join(OUTPUT_PATH, "min", "sro_to_hsrs.json"), "w") as f:
-        json.dump(sro_to_hsrs, f, separators=(",", ":"), indent=None)
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    subparsers = parser.add_subparsers(
+        dest="command", help="defaults to building every artifact"
+    )
+
+    build_options = argparse.ArgumentParser(add_help=False)
+    selection = build_options.add_mutually_exclusive_group()
+    selection.add_argument(
+        "--only",
+        nargs="+",
+        choices=list(ARTIFACTS),
+        metavar="ARTIFACT",
+        help="only build these artifacts, optional ones included",
+    )
+    selection.add_argument(
+        "--exclude",
+        nargs="+",
+        choices=list(ARTIFACTS),
+        metavar="ARTIFACT",
+        help="build every artifact except these",
+    )
+    build_options.add_argument(
+        "--output-dir",
+        default=OUTPUT_PATH,
+        help=f"folder to write the artifacts to, defaults to {OUTPUT_PATH}",
+    )
+    build_options.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of artifacts to build in parallel processes",
+    )
+    build_options.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only re-extract entities whose source rows changed since the "
+        f"previous build into the output folder, using the records stored in "
+        f"{CACHE_DIR}",
+    )
+    build_options.add_argument(
+        "--stream",
+        action="store_true",
+        help="write the verbose artifacts one record at a time instead of "
+        "building them in memory. Ignored for incremental builds",
+    )
+    build_options.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="parse source files one row at a time, dropping unused fields as "
+        "they are parsed. Lowers peak memory but parses more slowly",
+    )
+    build_options.add_argument(
+        "--atomic",
+        action="store_true",
+        help="write each build to a new versioned folder, validate it, then "
+        "switch the `current` symlink in the output folder to it",
+    )
+    build_options.add_argument(
+        "--keep",
+        type=int,
+        default=KEEP_BUILDS,
+        help="number of versioned builds to keep with --atomic, defaults to "
+        f"{KEEP_BUILDS}",
+    )
+
+    build_parser = subparsers.add_parser(
+        "build", parents=[build_options], help="build artifacts"
+    )
+    build_parser.add_argument(
+        "--history",
+        action="store_true",
+        help="record the verbose game data of this game version in "
+        f"{HISTORY_FILE} in the output folder",
+    )
+
+    watch_parser = subparsers.add_parser(
+        "watch",
+        parents=[build_options],
+        help="build artifacts, then rebuild them whenever their inputs change",
+    )
+    watch_parser.add_argument(
+        "--interval", type=float, default=0.5, help="polling interval in seconds"
+    )
+    watch_parser.add_argument(
+        "--debounce",
+        type=float,
+        default=1.0,
+        help="seconds without changes to wait for before rebuilding",
+    )
+
+    subparsers.add_parser("list", help="list the artifacts and their inputs")
+
+    args = parser.parse_args()
+    if args.command is None:
+        args = parser.parse_args(["build"])
+
+    if args.command == "list":
+        for name in ARTIFACTS:
+            optional = " (optional)" if ARTIFACTS[name].get("optional") else ""
+            print(f"{name}{optional}: {', '.join(get_inputs(name))}")
+        return
+
+    names = [
+        name
+        for name in ARTIFACTS
+        if (name in args.only if args.only else not ARTIFACTS[name].get("optional"))
+        and (not args.exclude or name not in args.exclude)
+    ]
+
+    cache = None
+    if args.incremental:
+        cache = load_cache(get_cache_path(args.output_dir), args.output_dir)
+
+    build(
+        names,
+        args.output_dir,
+        cache,
+        args.stream,
+        args.jobs,
+        args.atomic,
+        args.keep,
+        args.low_memory,
+        (
+            os.path.join(args.output_dir, HISTORY_FILE)
+            if args.command == "build" and args.history
+            else None
+        ),
+    )
+    if args.command == "watch":
+        watch(
+            {name: get_inputs(name) for name in names},
+            lambda changed: build(
+                changed,
+                args.output_dir,
+                cache,
+                args.stream,
+                args.jobs,
+                args.atomic,
+                args.keep,
+                args.low_memory,
+            ),
+            interval=args.interval,
+            debounce=args.debounce,
+        )
+
+
+def get_inputs(name: str) -> list:
+    """Get the source files an artifact is built from.
+
+    :param name: The artifact name.
+    :return: A list of file and folder paths.
+    """
+    artifact = ARTIFACTS[name]
+    module = import_module(artifact["module"])
+    if "inputs" in artifact:
+        return artifact["inputs"](module)
+    return module.SOURCES
+
+
+def get_cache_path(output_path: str) -> str:
+    """Get the path of the incremental build records of an output folder.
+
+    :param output_path: The output folder.
+    :return: The cache file path.
+    """
+    key = hashlib.sha1(os.path.abspath(output_path).encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key[:16]}.json")
+
+
+def build(
+    names: list,
+    output_path: str = OUTPUT_PATH,
+    cache: dict = None,
+    stream: bool = False,
+    jobs: int = 1,
+    atomic: bool = False,
+    keep: int = KEEP_BUILDS,
+    low_memory: bool = False,
+    history_path: str = None,
+):
+    """Build the given artifacts and write them to the output folder.
+
+    Every artifact is also published under a content-hash file name and
+    recorded in the output folder's manifest.
+
+    Atomic builds are written to a staging copy of the active build instead,
+    which only replaces it once every file is written and validated, so readers
+    of the `current` symlink never see a partial build.
+
+    :param names: A list of artifact names.
+    :param output_path: The output folder, defaults to `OUTPUT_PATH`.
+    :param cache: Optional records of the previous build, updated in place and
+        saved to the cache file of the output folder after the build.
+    :param stream: Whether to stream artifacts that support it, so only one
+        record is held in memory at a time. Ignored when `cache` is given.
+    :param jobs: The number of artifacts to build in parallel processes,
+        defaults to 1.
+    :param atomic: Whether to write a new versioned build, defaults to False.
+    :param keep: The number of versioned builds to keep, including the active
+        one, defaults to `KEEP_BUILDS`.
+    :param low_memory: Whether to parse source files one row at a time,
+        defaults to False.
+    :param history_path: Optional path of a history store to record the data of
+        the `history` artifact in. It is recorded from the data built for the
+        artifact, or built just for the store if the artifact isn't selected.
+    :raises ValueError: If an atomic build is invalid. The active build is left
+        untouched.
+    """
+    build_path = stage_build(output_path) if atomic else output_path
+    if not os.path.exists(build_path):
+        os.makedirs(build_path)
+    if not os.path.exists(os.path.join(build_path, "min")):
+        os.makedirs(os.path.join(build_path, "min"))
+
+    fields = {}
+    for name in names:
+        fields.update(import_module(ARTIFACTS[name]["module"]).FIELDS)
+    set_low_memory(low_memory)
+    prefetch([path for name in names for path in get_inputs(name)], fields=fields)
+
+    tasks = [
+        (
+            name,
+            build_path,
+            None if cache is None else cache.setdefault(name, {}),
+            stream,
+            history_path if ARTIFACTS[name].get("history") else None,
+        )
+        for name in names
+    ]
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=set_low_memory, initargs=(low_memory,)
+        ) as executor:
+            results = list(executor.map(_build_artifact, *zip(*tasks)))
+    else:
+        results = [_build_artifact(*task) for task in tasks]
+
+    if history_path and not any(ARTIFACTS[name].get("history") for name in names):
+        artifact = next(a for a in ARTIFACTS.values() if a.get("history"))
+        _record_history(
+            history_path, artifact["build"](import_module(artifact["module"]), None)
+        )
+
+    manifest_entries = {}
+    for name, (entry, artifact_cache) in zip(names, results):
+        manifest_entries[name] = entry
+        if cache is not None:
+            cache[name] = artifact_cache
+    prune_hashed(build_path, update_manifest(build_path, manifest_entries))
+
+    if atomic:
+        activate_build(output_path, build_path)
+        prune_builds(output_path, keep)
+
+    if cache is not None:
+        save_cache(get_cache_path(output_path), output_path, cache)
+
+
+def _build_artifact(
+    name: str,
+    output_path: str,
+    artifact_cache: dict,
+    stream: bool,
+    history_path: str = None,
+) -> tuple:
+    """Build a single artifact and write it to the output folder.
+
+    :param name: The artifact name.
+    :param output_path: The output folder.
+    :param artifact_cache: Optional records of the artifact's previous build.
+    :param stream: Whether to stream the artifact if it supports it.
+    :param history_path: Optional path of a history store to record the
+        artifact's data in. Streamed artifacts are built again to be recorded.
+    :return: A tuple of the manifest entry and the updated records.
+    """
+    artifact = ARTIFACTS[name]
+    module = import_module(artifact["module"])
+    if stream and artifact_cache is None and "stream" in artifact:
+        with CanonicalSpool() as spool:
+            items = spool.wrap(artifact["stream"](module))
+            _write_json_stream(output_path, name, items)
+            entry = publish_hashed_stream(output_path, name, spool)
+        if history_path:
+            _record_history(history_path, artifact["build"](module, None))
+        return entry, artifact_cache
+
+    data = artifact["build"](module, artifact_cache)
+    if history_path:
+        _record_history(history_path, data)
+    if "write" in artifact:
+        path = os.path.join(output_path, artifact["file"])
+        artifact["write"](data, path)
+        return publish_hashed_file(output_path, name, path), artifact_cache
+
+    _write_json(output_path, name, data)
+    return publish_hashed(output_path, name, data), artifact_cache
+
+
+def _record_history(path: str, data: dict):
+    """Record verbose game data in a history store.
+
+    :param path: The path of the history store.
+    :param data: The verbose game data.
+    """
+    history = import_module("utils.history")
+    with history.VersionHistory(path) as version_history:
+        try:
+            version_history.record(data)
+        except ValueError as e:
+            print(f"WARN: {e}")
+
+
+def _write_json(output_path: str, name: str, data: dict):
+    """Write an artifact to the output folder, both indented and minified.
+
+    :param output_path: The output folder.
+    :param name: The artifact name.
+    :param data: The artifact data.
+    """
+    with open(os.path.join(output_path, f"{name}.json"), "w") as f:
+        f.write(dumps(data, indent=4))
+    with open(os.path.join(output_path, "min", f"{name}.json"), "w") as f:
+        f.write(dumps(data))
+
+
+def _write_json_stream(output_path: str, name: str, items):
+    """Stream an artifact to the output folder, both indented and minified.
+
+    :param output_path: The output folder.
+    :param name: The artifact name.
+    :param items: A generator of the artifact's `(key, value)` pairs.
+    """
+    path = os.path.join(output_path, "min", f"{name}.json")
+    with open(os.path.join(output_path, f"{name}.json"), "w") as pretty_file:
+        with open(path, "w") as min_file:
+            write_json_stream(items, pretty_file, min_file)
 
 
 if __name__ == "__main__":
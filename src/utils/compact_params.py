@@ -0,0 +1,157 @@
+import copy
+import json
+import re
+
+
+# params that can be stored as numbers
+NUMBER = re.compile(r"-?\d+(\.\d+)?")
+
+
+def encode_params(params: list) -> list:
+    """Encode per-level description params as typed columns.
+
+    The params become a list of the number of levels followed by one column
+    per description placeholder. A column holds the values of its placeholder
+    across levels as a positional list, starting with the number of decimals
+    to format them with (null to format them as short as possible):
+    `[decimals, const]` for a constant, `[decimals, base, step]` for an
+    arithmetic progression, or `[decimals, values]` with a list of values.
+    Columns that can't be reproduced exactly from numbers, or that are smaller
+    that way, are kept as the list of their formatted strings.
+
+    :param params: A list of rows of formatted params, one row per level.
+    :return: The encoded params.
+    """
+    return [len(params)] + [_encode_column(list(column)) for column in zip(*params)]
+
+
+def decode_params(encoded: list) -> list:
+    """Decode params encoded with `encode_params`.
+
+    :param encoded: The encoded params.
+    :return: A list of rows of formatted params, one row per level.
+    """
+    levels, *columns = encoded
+    columns = [_decode_column(column, levels) for column in columns]
+    if not columns:
+        return [[] for _ in range(levels)]
+    return [list(row) for row in zip(*columns)]
+
+
+def compact_game_data_params(game_data_verbose: dict) -> dict:
+    """Encode the skill and light cone params of the verbose game data.
+
+    :param game_data_verbose: The verbose game data, as returned by
+        `get_game_data_verbose`.
+    :return: A copy of the game data with encoded params.
+    """
+    return _map_params(game_data_verbose, encode_params)
+
+
+def expand_game_data_params(game_data_verbose: dict) -> dict:
+    """Decode the params of verbose game data compacted with
+    `compact_game_data_params`.
+
+    :param game_data_verbose: The compacted verbose game data.
+    :return: A copy of the game data in the original shape.
+    """
+    return _map_params(game_data_verbose, decode_params)
+
+
+def _map_params(game_data_verbose: dict, func) -> dict:
+    """Apply a function to every params field of the verbose game data.
+
+    :param game_data_verbose: The verbose game data.
+    :param func: A callable taking and returning params.
+    :return: A copy of the game data with the mapped params.
+    """
+    res = copy.deepcopy(game_data_verbose)
+    for light_cone in res["light_cones"].values():
+        light_cone["ability"]["params"] = func(light_cone["ability"]["params"])
+    for character in res["characters"].values():
+        for skill in character["skills"].values():
+            skill["params"] = func(skill["params"])
+
+    return res
+
+
+def _encode_column(column: list) -> list:
+    """Encode the values of one placeholder across levels, in the smallest of
+    the forms that reproduce them exactly.
+
+    :param column: A list of formatted values.
+    :return: The encoded column.
+    """
+    decimals = _get_decimals(column)
+    if decimals is False:
+        return column
+
+    values = [float(s) if "." in s else int(s) for s in column]
+    if all(value == values[0] for value in values):
+        encoded = [decimals, values[0]]
+    else:
+        encoded = [decimals, values]
+        step = values[1] - values[0]
+        if decimals is not None:
+            step = round(step, decimals)
+        progression = [values[0] + step * i for i in range(len(values))]
+        if [_format_number(value, decimals) for value in progression] == column:
+            encoded = [decimals, values[0], step]
+
+    return min(encoded, column, key=lambda value: len(json.dumps(value)))
+
+
+def _decode_column(column: list, levels: int) -> list:
+    """Decode the values of one placeholder across levels.
+
+    :param column: The encoded column.
+    :param levels: The number of levels.
+    :return: A list of formatted values.
+    """
+    if isinstance(column[0], str):
+        return column
+
+    decimals, *rest = column
+    if len(rest) == 2:
+        base, step = rest
+        values = [base + step * i for i in range(levels)]
+    elif isinstance(rest[0], list):
+        values = rest[0]
+    else:
+        values = rest * levels
+
+    return [_format_number(value, decimals) for value in values]
+
+
+def _get_decimals(column: list):
+    """Get how the values of a column are formatted.
+
+    :param column: A list of formatted values.
+    :return: The fixed number of decimals, None if the values are formatted as
+        short as possible, or False if they aren't plain numbers.
+    """
+    if not all(NUMBER.fullmatch(s) for s in column):
+        return False
+
+    values = [float(s) for s in column]
+    decimals = len(column[0].partition(".")[2])
+    if all(f"{value:.{decimals}f}" == s for value, s in zip(values, column)):
+        return decimals
+    if all(
+        _format_number(float(s) if "." in s else int(s), None) == s for s in column
+    ):
+        return None
+    return False
+
+
+def _format_number(value: float, decimals: int) -> str:
+    """Format a param value.
+
+    :param value: The value.
+    :param decimals: The fixed number of decimals, or None to format the value
+        as short as possible.
+    :return: The formatted value.
+    """
+    if decimals is None:
+        return str(int(value)) if value == int(value) else str(value)
+    return f"{value:.{decimals}f}"
@@ -0,0 +1,135 @@
+import json
+from bisect import bisect_right
+from functools import lru_cache
+from utils.helpers import render_desc
+
+
+# number of rendered descriptions kept by `render_desc_cached`
+RENDER_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def render_desc_cached(desc: str, params: tuple) -> str:
+    """Render a description template, reusing recent results.
+
+    :param desc: The description, containing `{i}` placeholders.
+    :param params: The params of a single level, as a tuple.
+    :return: The rendered description.
+    """
+    return render_desc(desc, params)
+
+
+def iter_desc_templates(game_data_verbose: dict):
+    """Iterate over every levelled description of the verbose game data.
+
+    Character skills have one level per row of params, light cone abilities
+    one level per superimposition, and eidolons (`e1` to `e6`) a single level.
+
+    :param game_data_verbose: The verbose game data, as returned by
+        `get_game_data_verbose`.
+    :return: A generator of `(kind, name, skill, desc, params)` tuples, where
+        `params` holds one row of params per level.
+    """
+    for name, character in game_data_verbose["characters"].items():
+        for skill, value in character["skills"].items():
+            yield "characters", name, skill, value["desc"], value["params"] or [[]]
+        for i, eidolon in enumerate(character["eidolons"]):
+            yield "characters", name, f"e{i + 1}", eidolon["desc"], [[]]
+
+    for name, light_cone in game_data_verbose["light_cones"].items():
+        ability = light_cone["ability"]
+        yield "light_cones", name, "ability", ability["desc"], ability["params"] or [[]]
+
+
+class RenderedDescs:
+    """Lookup of pre-rendered descriptions by entity, skill and level.
+
+    Built from the `rendered_descs.json` artifact.
+    """
+
+    def __init__(self, rendered_descs: dict):
+        """Index the rendered descriptions.
+
+        :param rendered_descs: The rendered descriptions, as returned by
+            `get_rendered_descs`.
+        """
+        self.version = rendered_descs["version"]
+        self._descs = {}
+        for kind in ("characters", "light_cones"):
+            for name, skills in rendered_descs[kind].items():
+                for skill, value in skills.items():
+                    self._descs[(kind, name, skill)] = value
+
+    @classmethod
+    def load(cls, path: str) -> "RenderedDescs":
+        """Load the rendered descriptions from a `rendered_descs.json` file.
+
+        :param path: The file path.
+        :return: The rendered descriptions.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def get_desc(self, kind: str, name: str, skill: str, level: int) -> str:
+        """Get the rendered description of a skill at a level.
+
+        :param kind: Either `characters` or `light_cones`.
+        :param name: The entity name.
+        :param skill: The skill key, e.g. `ult`, `e1` or `ability`.
+        :param level: The skill level, or superimposition, starting at 1.
+        :raises KeyError: If the entity or skill doesn't exist.
+        :raises ValueError: If the level is invalid.
+        :return: The rendered description.
+        """
+        value = self._descs[(kind, name, skill)]
+        if not 1 <= level <= value["max_level"]:
+            raise ValueError(f"Invalid level: {level}")
+        return value["descs"][bisect_right(value["levels"], level) - 1]
+
+
+class DescRenderer:
+    """On-demand renderer of descriptions by entity, skill and level.
+
+    Reads the verbose game data directly, for when the `rendered_descs`
+    artifact isn't built. Renders go through `render_desc_cached`.
+    """
+
+    def __init__(self, game_data_verbose: dict):
+        """Index the description templates.
+
+        :param game_data_verbose: The verbose game data, as returned by
+            `get_game_data_verbose`.
+        """
+        self.version = game_data_verbose["version"]
+        self._templates = {
+            (kind, name, skill): (desc, params)
+            for kind, name, skill, desc, params in iter_desc_templates(
+                game_data_verbose
+            )
+        }
+
+    @classmethod
+    def load(cls, path: str) -> "DescRenderer":
+        """Load the templates from a `game_data_verbose.json` file.
+
+        :param path: The file path.
+        :return: The renderer.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def get_desc(self, kind: str, name: str, skill: str, level: int) -> str:
+        """Render the description of a skill at a level.
+
+        :param kind: Either `characters` or `light_cones`.
+        :param name: The entity name.
+        :param skill: The skill key, e.g. `ult`, `e1` or `ability`.
+        :param level: The skill level, or superimposition, starting at 1.
+        :raises KeyError: If the entity or skill doesn't exist.
+        :raises ValueError: If the level is invalid.
+        :return: The rendered description.
+        """
+        desc, params = self._templates[(kind, name, skill)]
+        if not 1 <= level <= len(params):
+            raise ValueError(f"Invalid level: {level}")
+        return render_desc_cached(desc, tuple(params[level - 1]))
@@ -1,3 +1,13 @@
+import re
+
+
+# placeholders left in descriptions by `_format_desc_and_params`
+DESC_PLACEHOLDER = re.compile(r"\{(\d+)\}")
+
+# max level of each promotion (ascension) phase
+PROMOTION_MAX_LEVELS = [20, 30, 40, 50, 60, 70, 80]
+
+
 def get_slot_from_relic_type(relic_type: str) -> str:
     """Get the relic slot from the relic type.
 
@@ -46,3 +56,96 @@ def get_path_from_avatar_base_type(base_type: str) -> str:
             return "Abundance"
         case _:
             raise ValueError(f"Invalid base type: {base_type}")
+
+
+def render_desc(desc: str, params: list) -> str:
+    """Render a description template against one row of its params.
+
+    :param desc: The description, containing `{i}` placeholders.
+    :param params: The params of a single level.
+    :return: The rendered description.
+    """
+    return DESC_PLACEHOLDER.sub(lambda m: params[int(m.group(1))], desc)
+
+
+def get_modifier_type_from_main_stat(main_stat: str, slot: str) -> str:
+    """Get the modifier type of an HSR-Scanner relic main stat.
+
+    :param main_stat: The main stat name.
+    :param slot: The relic slot.
+    :raises ValueError: If the main stat is invalid.
+    :return: The modifier type.
+    """
+    match main_stat:
+        case "HP":
+            return "hp" if slot == "Head" else "hp_"
+        case "ATK":
+            return "atk" if slot == "Hands" else "atk_"
+        case "DEF":
+            return "def_"
+        case "SPD":
+            return "spd"
+        case "CRIT Rate":
+            return "crit_rate"
+        case "CRIT DMG":
+            return "crit_dmg"
+        case "Outgoing Healing Boost":
+            return "heal"
+        case "Effect Hit Rate":
+            return "effect_hit"
+        case "Break Effect":
+            return "break"
+        case "Energy Regeneration Rate":
+            return "energy"
+        case "Physical DMG Boost":
+            return "physical"
+        case "Fire DMG Boost":
+            return "fire"
+        case "Ice DMG Boost":
+            return "ice"
+        case "Lightning DMG Boost":
+            return "lightning"
+        case "Wind DMG Boost":
+            return "wind"
+        case "Quantum DMG Boost":
+            return "quantum"
+        case "Imaginary DMG Boost":
+            return "imaginary"
+        case _:
+            raise ValueError(f"Invalid main stat: {main_stat}")
+
+
+def get_modifier_type_from_substat(substat: str) -> str:
+    """Get the modifier type of an HSR-Scanner relic substat.
+
+    :param substat: The substat key.
+    :raises ValueError: If the substat is invalid.
+    :return: The modifier type.
+    """
+    match substat:
+        case "HP":
+            return "hp"
+        case "ATK":
+            return "atk"
+        case "DEF":
+            return "def"
+        case "HP_":
+            return "hp_"
+        case "ATK_":
+            return "atk_"
+        case "DEF_":
+            return "def_"
+        case "SPD":
+            return "spd"
+        case "CRIT Rate_":
+            return "crit_rate"
+        case "CRIT DMG_":
+            return "crit_dmg"
+        case "Effect Hit Rate_":
+            return "effect_hit"
+        case "Effect RES_":
+            return "effect_res"
+        case "Break Effect_":
+            return "break"
+        case _:
+            raise ValueError(f"Invalid substat: {substat}")
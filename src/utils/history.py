@@ -0,0 +1,252 @@
+import hashlib
+import json
+import re
+import sqlite3
+from utils.publish import canonical_dumps
+
+
+# sections of the verbose game data whose entities are recorded
+SECTIONS = ["light_cones", "relic_sets", "characters"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY,
+    version TEXT NOT NULL UNIQUE,
+    sort_key TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    hash TEXT PRIMARY KEY,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    section TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (section, name)
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    version_id INTEGER NOT NULL REFERENCES versions (id),
+    entity_id INTEGER NOT NULL REFERENCES entities (id),
+    hash TEXT NOT NULL REFERENCES records (hash),
+    PRIMARY KEY (version_id, entity_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS versions_sort_key ON versions (sort_key);
+CREATE INDEX IF NOT EXISTS snapshots_entity ON snapshots (entity_id, version_id);
+"""
+
+
+class VersionHistory:
+    """SQLite store of the verbose game data of every recorded game version.
+
+    Each version keeps a snapshot mapping every entity to the hash of its
+    record, and records are stored once per distinct content, so an entity
+    that didn't change between versions costs a single row.
+    """
+
+    def __init__(self, path: str):
+        """Open or create a history store.
+
+        :param path: The path of the database.
+        """
+        self.con = sqlite3.connect(path)
+        self.con.executescript(SCHEMA)
+
+    def __enter__(self) -> "VersionHistory":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the database."""
+        self.con.close()
+
+    def record(self, game_data_verbose: dict) -> int:
+        """Record the entities of a game version.
+
+        The store is append-only: recording a version again is a no-op if its
+        entities didn't change, and an error otherwise.
+
+        :param game_data_verbose: The verbose game data, as returned by
+            `get_game_data_verbose`.
+        :raises ValueError: If the version was already recorded with different
+            entities.
+        :return: The number of records that weren't stored yet.
+        """
+        version = game_data_verbose["version"]
+        snapshot = {}
+        contents = {}
+        for section in SECTIONS:
+            for name, record in game_data_verbose[section].items():
+                content = canonical_dumps(record)
+                digest = hashlib.sha256(content).hexdigest()
+                snapshot[(section, name)] = digest
+                contents[digest] = content.decode("utf-8")
+
+        with self.con:
+            row = self.con.execute(
+                "SELECT id FROM versions WHERE version = ?", (version,)
+            ).fetchone()
+            if row is not None:
+                if self._get_snapshot(row[0]) != snapshot:
+                    raise ValueError(
+                        f"Version {version} is already recorded with different data"
+                    )
+                return 0
+
+            version_id = self.con.execute(
+                "INSERT INTO versions (version, sort_key) VALUES (?, ?)",
+                (version, _get_sort_key(version)),
+            ).lastrowid
+
+            new_records = 0
+            for digest, content in contents.items():
+                new_records += self.con.execute(
+                    "INSERT OR IGNORE INTO records VALUES (?, ?)", (digest, content)
+                ).rowcount
+            for (section, name), digest in snapshot.items():
+                self.con.execute(
+                    "INSERT OR IGNORE INTO entities (section, name) VALUES (?, ?)",
+                    (section, name),
+                )
+                self.con.execute(
+                    "INSERT INTO snapshots SELECT ?, id, ? FROM entities "
+                    "WHERE section = ? AND name = ?",
+                    (version_id, digest, section, name),
+                )
+
+        return new_records
+
+    def get_versions(self) -> list:
+        """Get the recorded game versions.
+
+        :return: A list of versions, oldest first.
+        """
+        rows = self.con.execute("SELECT version FROM versions ORDER BY sort_key")
+        return [version for (version,) in rows]
+
+    def get_entity(self, section: str, name: str, version: str) -> dict:
+        """Get the record of an entity as of a game version.
+
+        :param section: The section, e.g. `characters`.
+        :param name: The entity name.
+        :param version: The game version. If it wasn't recorded, the latest
+            recorded version before it is used.
+        :return: The record, or None if the entity didn't exist.
+        """
+        version_id = self._resolve_version(version)
+        if version_id is None:
+            return None
+
+        row = self.con.execute(
+            "SELECT records.record FROM snapshots "
+            "JOIN entities ON entities.id = snapshots.entity_id "
+            "JOIN records ON records.hash = snapshots.hash "
+            "WHERE snapshots.version_id = ? AND entities.section = ? "
+            "AND entities.name = ?",
+            (version_id, section, name),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_entity_history(self, section: str, name: str) -> list:
+        """Get every distinct record of an entity.
+
+        :param section: The section, e.g. `characters`.
+        :param name: The entity name.
+        :return: A list of `(version, record)` tuples, oldest first, with one
+            tuple per version in which the record changed.
+        """
+        rows = self.con.execute(
+            "SELECT versions.version, snapshots.hash, records.record FROM snapshots "
+            "JOIN entities ON entities.id = snapshots.entity_id "
+            "JOIN versions ON versions.id = snapshots.version_id "
+            "JOIN records ON records.hash = snapshots.hash "
+            "WHERE entities.section = ? AND entities.name = ? "
+            "ORDER BY versions.sort_key",
+            (section, name),
+        )
+
+        res = []
+        prev_hash = None
+        for version, digest, record in rows:
+            if digest != prev_hash:
+                res.append((version, json.loads(record)))
+            prev_hash = digest
+
+        return res
+
+    def get_changed_entities(self, from_version: str, to_version: str) -> list:
+        """Get the entities that changed between two game versions.
+
+        :param from_version: The earlier game version.
+        :param to_version: The later game version.
+        :raises KeyError: If no version was recorded up to either version.
+        :return: A list of `{section, name, change}` dictionaries, where `change`
+            is `added`, `removed` or `modified`.
+        """
+        from_id = self._resolve_version(from_version)
+        to_id = self._resolve_version(to_version)
+        if from_id is None or to_id is None:
+            raise KeyError(from_version if from_id is None else to_version)
+
+        rows = self.con.execute(
+            "SELECT entities.section, entities.name, a.hash, b.hash "
+            "FROM entities "
+            "LEFT JOIN snapshots a ON a.entity_id = entities.id AND a.version_id = ? "
+            "LEFT JOIN snapshots b ON b.entity_id = entities.id AND b.version_id = ? "
+            "WHERE a.hash IS NOT b.hash "
+            "ORDER BY entities.section, entities.name",
+            (from_id, to_id),
+        )
+
+        res = []
+        for section, name, before, after in rows:
+            if before is None:
+                change = "added"
+            elif after is None:
+                change = "removed"
+            else:
+                change = "modified"
+            res.append({"section": section, "name": name, "change": change})
+
+        return res
+
+    def _get_snapshot(self, version_id: int) -> dict:
+        """Get the record hashes of a recorded version.
+
+        :param version_id: The version id.
+        :return: A dictionary mapping `(section, name)` tuples to record hashes.
+        """
+        rows = self.con.execute(
+            "SELECT entities.section, entities.name, snapshots.hash FROM snapshots "
+            "JOIN entities ON entities.id = snapshots.entity_id "
+            "WHERE snapshots.version_id = ?",
+            (version_id,),
+        )
+        return {(section, name): digest for section, name, digest in rows}
+
+    def _resolve_version(self, version: str) -> int:
+        """Get the latest recorded version up to a game version.
+
+        :param version: The game version.
+        :return: The version id, or None if no earlier version was recorded.
+        """
+        row = self.con.execute(
+            "SELECT id FROM versions WHERE sort_key <= ? "
+            "ORDER BY sort_key DESC LIMIT 1",
+            (_get_sort_key(version),),
+        ).fetchone()
+        return row[0] if row else None
+
+
+def _get_sort_key(version: str) -> str:
+    """Get a key that sorts game versions numerically, e.g. 2.10 after 2.9.
+
+    :param version: The game version.
+    :return: The sort key.
+    """
+    return ".".join(
+        part.zfill(8) if part.isdigit() else part
+        for part in re.split(r"[.\-]", version)
+    )
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+
+
+# format of the cached records. Bump it whenever an extractor changes the records
+# it produces, so incremental builds don't reuse records in the old format
+CACHE_FORMAT_VERSION = 1
+
+
+def load_cache(path: str, output_path: str) -> dict:
+    """Load the records of a previous build.
+
+    Records saved in another cache format, or for another output folder, are
+    dropped.
+
+    :param path: The cache file path.
+    :param output_path: The output folder the build writes to.
+    :return: A dictionary mapping artifact names to records, empty if there is
+        no usable cache.
+    """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "r", encoding="utf-8") as f:
+        cache = json.load(f)
+    if cache.get("format_version") != CACHE_FORMAT_VERSION:
+        print(f"WARN: Ignoring incremental cache {path} in an outdated format")
+        return {}
+    if cache.get("output_path") != os.path.abspath(output_path):
+        print(f"WARN: Ignoring incremental cache {path} of another output folder")
+        return {}
+
+    return cache["artifacts"]
+
+
+def save_cache(path: str, output_path: str, cache: dict):
+    """Save the records of a build.
+
+    :param path: The cache file path.
+    :param output_path: The output folder the build wrote to.
+    :param cache: A dictionary mapping artifact names to records.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "format_version": CACHE_FORMAT_VERSION,
+                "output_path": os.path.abspath(output_path),
+                "artifacts": cache,
+            },
+            f,
+            separators=(",", ":"),
+        )
+
+
+def get_fingerprint(*rows) -> str:
+    """Get a fingerprint of source rows.
+
+    :param rows: The source rows an entity is built from.
+    :return: A hex digest that changes whenever any of the rows change.
+    """
+    encoded = json.dumps(rows, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def update_records(cache: dict, section: str, entities, format_entity) -> dict:
+    """Format entities, reusing records from a previous build when their
+    fingerprint didn't change.
+
+    The cache is updated in place, so it can be persisted and passed to the
+    next build. Entities that no longer exist are dropped from it.
+
+    :param cache: A dictionary holding the records of the previous build.
+    :param section: The cache section the entities are stored in.
+    :param entities: An iterable of `(entity_id, fingerprint, entity)` tuples.
+    :param format_entity: A callable taking an entity and returning a
+        `(name, record)` tuple.
+    :return: A dictionary mapping names to records, in source order.
+    """
+    prev = cache.get(section, {})
+    curr = {}
+    res = {}
+    for entity_id, fingerprint, entity in entities:
+        entry = prev.get(entity_id)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            name, record = format_entity(entity)
+            entry = {"fingerprint": fingerprint, "name": name, "record": record}
+        curr[entity_id] = entry
+        res[entry["name"]] = entry["record"]
+
+    cache[section] = curr
+    return res
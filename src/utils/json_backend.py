@@ -0,0 +1,39 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# name of the parser in use, for logging
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(data: bytes):
+    """Parse JSON, using orjson when it is installed.
+
+    Both parsers produce identical Python objects for the game files.
+
+    :param data: The UTF-8 encoded JSON.
+    :return: The parsed data.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(data, indent: int = None) -> str:
+    """Serialize data to JSON in the same format as `json.dump`.
+
+    The stdlib encoder is always used so the output stays byte-for-byte
+    identical, but the data is encoded in one shot, which lets minified output
+    go through the C encoder instead of the chunked pure Python one.
+
+    :param data: The data to serialize.
+    :param indent: The indentation level, or None for minified output.
+    :return: The JSON string.
+    """
+    if indent is None:
+        return json.dumps(data, separators=(",", ":"))
+    return json.dumps(data, indent=indent)
@@ -0,0 +1,56 @@
+from collections.abc import Iterator
+from utils.json_backend import dumps
+
+
+def write_json_stream(data, pretty_file, min_file, indent: int = 4):
+    """Write data to an indented and a minified JSON file in a single pass.
+
+    Iterators of `(key, value)` pairs are written as JSON objects one pair at a
+    time, so they can be generators that produce each value only when it is
+    written. Any other value is serialized whole. The output is identical to
+    `dumps(data, indent=indent)` and `dumps(data)` of the equivalent dictionary.
+
+    :param data: The data to write, or an iterator of `(key, value)` pairs.
+        Keys must be strings.
+    :param pretty_file: A text file to write the indented JSON to.
+    :param min_file: A text file to write the minified JSON to.
+    :param indent: The indentation level of the indented JSON, defaults to 4.
+    """
+
+    def write(pretty: str, minified: str):
+        pretty_file.write(pretty)
+        min_file.write(minified)
+
+    _write_value(data, 0, indent, write)
+
+
+def _write_value(value, level: int, indent: int, write):
+    """Write a value at a nesting level.
+
+    :param value: The value, or an iterator of `(key, value)` pairs.
+    :param level: The nesting level of the value.
+    :param indent: The indentation level of the indented JSON.
+    :param write: A callable taking the indented and minified chunks to write.
+    """
+    if not isinstance(value, Iterator):
+        # `dumps` indents nested lines relative to the value itself, and
+        # newlines inside strings are always escaped
+        pretty = dumps(value, indent=indent)
+        if level:
+            pretty = pretty.replace("\n", "\n" + " " * (indent * level))
+        write(pretty, dumps(value))
+        return
+
+    empty = True
+    padding = "\n" + " " * (indent * (level + 1))
+    for key, item in value:
+        separator = "{" if empty else ","
+        key = dumps(key)
+        write(f"{separator}{padding}{key}: ", f"{separator}{key}:")
+        _write_value(item, level + 1, indent, write)
+        empty = False
+
+    if empty:
+        write("{}", "{}")
+    else:
+        write("\n" + " " * (indent * level) + "}", "}")
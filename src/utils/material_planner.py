@@ -0,0 +1,127 @@
+import json
+
+
+class MaterialCosts:
+    """Batch planner of character and light cone promotion material costs.
+
+    Built from the `material_costs.json` artifact.
+    """
+
+    def __init__(self, material_costs: dict):
+        """Index the cumulative costs by entity, with columns mapped to one item
+        list shared by every entity.
+
+        :param material_costs: The material costs, as returned by
+            `get_material_costs`.
+        """
+        self.version = material_costs["version"]
+        self.max_levels = material_costs["max_levels"]
+        self.items = list(material_costs["items"])
+        self.item_names = list(material_costs["items"].values())
+        columns = {item_id: i for i, item_id in enumerate(self.items)}
+        self._costs = {}
+        for kind in ("characters", "light_cones"):
+            for name, costs in material_costs[kind].items():
+                self._costs[(kind, name)] = (
+                    [columns[item_id] for item_id in costs["items"]],
+                    costs["costs"],
+                )
+
+    @classmethod
+    def load(cls, path: str) -> "MaterialCosts":
+        """Load the material costs from a `material_costs.json` file.
+
+        :param path: The file path.
+        :return: The material costs.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def get_cost(
+        self,
+        kind: str,
+        name: str,
+        from_level: int,
+        to_level: int,
+        from_promotion: int = None,
+        to_promotion: int = None,
+    ) -> dict:
+        """Get the promotion materials needed to raise a single entity.
+
+        :param kind: Either `characters` or `light_cones`.
+        :param name: The entity name.
+        :param from_level: The current level.
+        :param to_level: The target level.
+        :param from_promotion: The current promotion, defaults to the lowest
+            promotion that reaches `from_level` (i.e. not yet ascended).
+        :param to_promotion: The target promotion, defaults to the lowest
+            promotion that reaches `to_level`.
+        :raises KeyError: If the entity doesn't exist.
+        :raises ValueError: If a level or promotion is invalid, or the target is
+            below the current state.
+        :return: A dictionary mapping item names to amounts.
+        """
+        return self.plan(
+            [
+                {
+                    "kind": kind,
+                    "name": name,
+                    "from_level": from_level,
+                    "to_level": to_level,
+                    "from_promotion": from_promotion,
+                    "to_promotion": to_promotion,
+                }
+            ]
+        )
+
+    def plan(self, roster: list) -> dict:
+        """Get the total promotion materials needed to raise a roster.
+
+        :param roster: A list of dictionaries with the `kind`, `name`,
+            `from_level` and `to_level` of each entity, and optionally their
+            `from_promotion` and `to_promotion`, as in `get_cost`.
+        :raises KeyError: If an entity doesn't exist.
+        :raises ValueError: If a level or promotion is invalid, or a target is
+            below the current state.
+        :return: A dictionary mapping item names to total amounts, without
+            items that aren't needed.
+        """
+        totals = [0] * len(self.items)
+        for entry in roster:
+            columns, costs = self._costs[(entry["kind"], entry["name"])]
+            start = self._get_promotion(
+                entry["from_level"], entry.get("from_promotion")
+            )
+            end = self._get_promotion(entry["to_level"], entry.get("to_promotion"))
+            if (end, entry["to_level"]) < (start, entry["from_level"]):
+                raise ValueError(
+                    f"Target of {entry['name']} is below its current level"
+                )
+            for column, a, b in zip(columns, costs[end], costs[start]):
+                totals[column] += a - b
+
+        return {
+            name: total for name, total in zip(self.item_names, totals) if total
+        }
+
+    def _get_promotion(self, level: int, promotion: int) -> int:
+        """Check or default the promotion of a level.
+
+        :param level: The level.
+        :param promotion: The promotion, or None for the lowest one.
+        :raises ValueError: If the level or promotion is invalid.
+        :return: The promotion.
+        """
+        if not 1 <= level <= self.max_levels[-1]:
+            raise ValueError(f"Invalid level: {level}")
+        if promotion is None:
+            return next(
+                p for p, max_level in enumerate(self.max_levels) if level <= max_level
+            )
+
+        if not 0 <= promotion < len(self.max_levels):
+            raise ValueError(f"Invalid promotion: {promotion}")
+        min_level = self.max_levels[promotion - 1] if promotion > 0 else 1
+        if not min_level <= level <= self.max_levels[promotion]:
+            raise ValueError(f"Invalid promotion {promotion} for level {level}")
+        return promotion
@@ -0,0 +1,422 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Iterator
+
+
+# folder inside the output folder holding content-addressed artifacts
+HASHED_DIR = "hashed"
+MANIFEST = "manifest.json"
+
+# folder inside the output folder holding versioned builds, and the symlink
+# pointing to the active one
+BUILDS_DIR = "builds"
+CURRENT_LINK = "current"
+
+# number of builds kept by default, including the active one
+KEEP_BUILDS = 3
+
+# build folders are named after zero-padded nanosecond timestamps, so they sort
+# by creation order
+BUILD_ID_LENGTH = 20
+
+# length of the content hash used in file names
+HASH_LENGTH = 16
+
+
+def canonical_dumps(data) -> bytes:
+    """Serialize data to canonical JSON.
+
+    Keys are sorted, separators are compact, non-ASCII characters are kept as
+    UTF-8, and floats with an integral value are written as integers, so equal
+    data always produces identical bytes regardless of source ordering.
+
+    :param data: The data to serialize.
+    :return: The UTF-8 encoded JSON.
+    """
+    return json.dumps(
+        _normalize_numbers(data),
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        allow_nan=False,
+    ).encode("utf-8")
+
+
+def publish_hashed(output_path: str, name: str, data) -> dict:
+    """Write an artifact under a content-hash file name.
+
+    Files that already exist are left untouched, since their content can't
+    have changed.
+
+    :param output_path: The output folder.
+    :param name: The logical artifact name.
+    :param data: The artifact data.
+    :return: The manifest entry of the artifact.
+    """
+    return _publish_bytes(output_path, name, canonical_dumps(data), ".json")
+
+
+def publish_hashed_file(output_path: str, name: str, path: str) -> dict:
+    """Copy a non-JSON artifact file under a content-hash file name.
+
+    :param output_path: The output folder.
+    :param name: The logical artifact name.
+    :param path: The path of the artifact file.
+    :return: The manifest entry of the artifact.
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    return _publish_bytes(output_path, name, content, os.path.splitext(path)[1])
+
+
+def publish_hashed_stream(output_path: str, name: str, spool: "CanonicalSpool") -> dict:
+    """Write a streamed artifact under a content-hash file name.
+
+    The canonical JSON is assembled from the spool and hashed chunk by chunk,
+    so it is never held in memory whole. It is identical to what
+    `publish_hashed` writes for the equivalent data.
+
+    :param output_path: The output folder.
+    :param name: The logical artifact name.
+    :param spool: The spool the artifact was streamed through.
+    :return: The manifest entry of the artifact.
+    """
+    os.makedirs(os.path.join(output_path, HASHED_DIR), exist_ok=True)
+    tmp_path = os.path.join(output_path, HASHED_DIR, f"{name}.tmp")
+    digest = hashlib.sha256()
+    size = 0
+    with open(tmp_path, "wb") as f:
+        for chunk in spool.iter_chunks():
+            digest.update(chunk)
+            f.write(chunk)
+            size += len(chunk)
+
+    digest = digest.hexdigest()
+    file_name = f"{HASHED_DIR}/{name}.{digest[:HASH_LENGTH]}.json"
+    path = os.path.join(output_path, file_name)
+    if os.path.exists(path):
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, path)
+
+    return {"file": file_name, "size": size, "sha256": digest}
+
+
+class CanonicalSpool:
+    """Spool of the canonical JSON of streamed data.
+
+    Values are serialized with `canonical_dumps` as they stream past and
+    appended to a temporary file. Only their keys and offsets are kept in
+    memory, so the canonical form can be assembled in sorted key order once the
+    stream is consumed.
+    """
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()
+        self._root = None
+
+    def __enter__(self) -> "CanonicalSpool":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Delete the temporary file."""
+        self._file.close()
+
+    def wrap(self, data):
+        """Wrap data so its values are spooled while it is consumed.
+
+        :param data: The data, or an iterator of `(key, value)` pairs whose
+            values can be iterators too, as accepted by `write_json_stream`.
+        :return: Data of the same structure, to consume instead.
+        """
+        self._root, data = self._wrap(data)
+        return data
+
+    def iter_chunks(self):
+        """Iterate over the canonical JSON of the consumed data.
+
+        :return: A generator of byte chunks.
+        """
+        return self._iter_chunks(self._root)
+
+    def _wrap(self, value) -> tuple:
+        """Spool a value, or wrap an iterator of pairs to spool its values.
+
+        :param value: The value, or an iterator of `(key, value)` pairs.
+        :return: A tuple of the spooled node and the value to consume. Nodes are
+            `(offset, size)` tuples for values, and dictionaries mapping keys
+            to nodes for iterators, filled in as they are consumed.
+        """
+        if not isinstance(value, Iterator):
+            content = canonical_dumps(value)
+            node = (self._file.tell(), len(content))
+            self._file.write(content)
+            return node, value
+
+        node = {}
+
+        def items():
+            for key, item in value:
+                node[key], item = self._wrap(item)
+                yield key, item
+
+        return node, items()
+
+    def _iter_chunks(self, node):
+        """Iterate over the canonical JSON of a spooled node.
+
+        :param node: The node.
+        :return: A generator of byte chunks.
+        """
+        if isinstance(node, tuple):
+            offset, size = node
+            self._file.seek(offset)
+            yield self._file.read(size)
+            return
+
+        yield b"{"
+        for i, key in enumerate(sorted(node)):
+            if i:
+                yield b","
+            yield json.dumps(key, ensure_ascii=False).encode("utf-8") + b":"
+            yield from self._iter_chunks(node[key])
+        yield b"}"
+
+
+def update_manifest(output_path: str, entries: dict) -> dict:
+    """Merge manifest entries into the manifest of the output folder.
+
+    :param output_path: The output folder.
+    :param entries: A dictionary mapping logical artifact names to manifest entries.
+    :return: The updated manifest.
+    """
+    path = os.path.join(output_path, MANIFEST)
+    manifest = {"files": {}}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    manifest["files"].update(entries)
+    manifest["files"] = dict(sorted(manifest["files"].items()))
+    _write_atomic(path, json.dumps(manifest, indent=4).encode("utf-8"))
+
+    return manifest
+
+
+def stage_build(output_path: str) -> str:
+    """Create a staging folder for a new versioned build.
+
+    The staging folder starts as a copy of the active build, so builds of a
+    subset of the artifacts still produce a complete output. Content-addressed
+    files are hard-linked instead of copied, since they are never rewritten.
+
+    :param output_path: The output folder.
+    :return: The path of the staging folder.
+    """
+    builds_path = os.path.join(output_path, BUILDS_DIR)
+    build_id = time.time_ns()
+    if os.path.isdir(builds_path):
+        # ids keep increasing even if the clock goes back, so a new build
+        # never reuses the name of a pruned one or sorts before an older one
+        names = [name.lstrip(".") for name in os.listdir(builds_path)]
+        build_id = max(
+            [build_id] + [int(name) + 1 for name in names if name.isdigit()]
+        )
+    staging_path = os.path.join(builds_path, f".{build_id:0{BUILD_ID_LENGTH}d}")
+
+    current = os.path.join(output_path, CURRENT_LINK)
+    if os.path.isdir(current):
+        shutil.copytree(current, staging_path, copy_function=_copy_build_file)
+    else:
+        os.makedirs(staging_path)
+
+    return staging_path
+
+
+def validate_build(build_path: str):
+    """Check that a build is complete and matches its manifest.
+
+    :param build_path: The build folder.
+    :raises ValueError: If the manifest is missing, a JSON file doesn't parse,
+        or a content-addressed file doesn't match its manifest entry.
+    """
+    try:
+        with open(os.path.join(build_path, MANIFEST), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Invalid manifest in {build_path}: {e}")
+
+    for name, entry in manifest["files"].items():
+        path = os.path.join(build_path, entry["file"])
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+        except OSError as e:
+            raise ValueError(f"Missing file of {name}: {e}")
+        if len(content) != entry["size"]:
+            raise ValueError(f"Size mismatch in {entry['file']}")
+        if hashlib.sha256(content).hexdigest() != entry["sha256"]:
+            raise ValueError(f"Hash mismatch in {entry['file']}")
+
+    for folder in (build_path, os.path.join(build_path, "min")):
+        if not os.path.isdir(folder):
+            continue
+        for file_name in os.listdir(folder):
+            if file_name.endswith(".json"):
+                try:
+                    with open(os.path.join(folder, file_name), "rb") as f:
+                        json.loads(f.read())
+                except ValueError as e:
+                    raise ValueError(f"Invalid JSON in {file_name}: {e}")
+
+
+def activate_build(output_path: str, staging_path: str) -> str:
+    """Validate a staged build and atomically make it the active build.
+
+    The staging folder is renamed to its final name, then the `current`
+    symlink is swapped to it with a single rename, so readers see either the
+    previous build or the new one in full.
+
+    :param output_path: The output folder.
+    :param staging_path: The staging folder, as returned by `stage_build`.
+    :raises ValueError: If the build is invalid. The staging folder is kept for
+        inspection and the active build is left untouched.
+    :return: The path of the activated build.
+    """
+    validate_build(staging_path)
+
+    builds_path = os.path.dirname(staging_path)
+    build_name = os.path.basename(staging_path).lstrip(".")
+    build_path = os.path.join(builds_path, build_name)
+    os.rename(staging_path, build_path)
+
+    link_path = os.path.join(output_path, CURRENT_LINK)
+    tmp_link_path = f"{link_path}.tmp"
+    if os.path.lexists(tmp_link_path):
+        os.remove(tmp_link_path)
+    os.symlink(os.path.join(BUILDS_DIR, build_name), tmp_link_path)
+    os.replace(tmp_link_path, link_path)
+
+    return build_path
+
+
+def prune_builds(output_path: str, keep: int = KEEP_BUILDS) -> list:
+    """Delete old builds, keeping the most recent ones and the active one.
+
+    Leftover staging folders of failed builds are deleted too, so concurrent
+    builds into the same output folder aren't supported.
+
+    :param output_path: The output folder.
+    :param keep: The number of builds to keep, including the active one.
+    :return: A list of the deleted build names.
+    """
+    builds_path = os.path.join(output_path, BUILDS_DIR)
+    if not os.path.isdir(builds_path):
+        return []
+
+    current = os.path.realpath(os.path.join(output_path, CURRENT_LINK))
+    names = sorted(os.listdir(builds_path), reverse=True)
+    builds = [name for name in names if not name.startswith(".")]
+    deleted = [name for name in names if name.startswith(".")]
+    deleted += [
+        name
+        for name in builds[max(keep, 1) :]
+        if os.path.realpath(os.path.join(builds_path, name)) != current
+    ]
+    for name in deleted:
+        shutil.rmtree(os.path.join(builds_path, name))
+
+    return deleted
+
+
+def prune_hashed(output_path: str, manifest: dict) -> list:
+    """Delete the content-addressed files that the manifest no longer refers to.
+
+    :param output_path: The output folder.
+    :param manifest: The manifest of the output folder, as returned by
+        `update_manifest`.
+    :return: A list of the deleted file names.
+    """
+    hashed_path = os.path.join(output_path, HASHED_DIR)
+    if not os.path.isdir(hashed_path):
+        return []
+
+    referenced = {entry["file"] for entry in manifest["files"].values()}
+    deleted = sorted(
+        name
+        for name in os.listdir(hashed_path)
+        if f"{HASHED_DIR}/{name}" not in referenced
+    )
+    for name in deleted:
+        os.remove(os.path.join(hashed_path, name))
+
+    return deleted
+
+
+def _copy_build_file(src: str, dst: str):
+    """Copy a file of the active build into a staging folder.
+
+    :param src: The source path.
+    :param dst: The destination path.
+    """
+    if os.path.basename(os.path.dirname(src)) == HASHED_DIR:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+
+def _publish_bytes(output_path: str, name: str, content: bytes, ext: str) -> dict:
+    """Write content under a content-hash file name, unless it already exists.
+
+    :param output_path: The output folder.
+    :param name: The logical artifact name.
+    :param content: The file content.
+    :param ext: The file extension, including the dot.
+    :return: The manifest entry of the artifact.
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    file_name = f"{HASHED_DIR}/{name}.{digest[:HASH_LENGTH]}{ext}"
+    path = os.path.join(output_path, file_name)
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write_atomic(path, content)
+
+    return {"file": file_name, "size": len(content), "sha256": digest}
+
+
+def _normalize_numbers(data):
+    """Recursively write integral floats as integers.
+
+    :param data: The data to normalize.
+    :return: The normalized data.
+    """
+    if isinstance(data, float):
+        return int(data) if data.is_integer() else data
+    if isinstance(data, dict):
+        return {key: _normalize_numbers(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_normalize_numbers(value) for value in data]
+    return data
+
+
+def _write_atomic(path: str, content: bytes):
+    """Write a file so readers never observe it half-written.
+
+    :param path: The file path.
+    :param content: The file content.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
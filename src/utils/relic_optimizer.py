@@ -0,0 +1,389 @@
+import time
+from multiprocessing import Pool
+from utils.helpers import get_slot_from_relic_type
+from utils.stat_engine import (
+    ADDITIVE_STATS,
+    SCALED_STATS,
+    SET_BONUS_PIECES,
+    STAT_INDEX,
+    finalize,
+    get_relic_vector,
+)
+
+
+# relic slots in search order
+SLOTS = [
+    get_slot_from_relic_type(relic_type)
+    for relic_type in ["HEAD", "HAND", "BODY", "FOOT", "NECK", "OBJECT"]
+]
+PLANAR_SLOTS = ["Planar Sphere", "Link Rope"]
+
+# number of search nodes between deadline checks
+DEADLINE_CHECK_INTERVAL = 4096
+
+
+def optimize_loadout(
+    engine,
+    relics: list,
+    relic_stat_vals: dict,
+    character: str,
+    level: int = 80,
+    promotion: int = None,
+    light_cone: str = None,
+    superimposition: int = 1,
+    weights: dict = None,
+    min_stats: dict = None,
+    required_sets: dict = None,
+    processes: int = 1,
+    time_budget: float = None,
+) -> dict:
+    """Find the six-piece relic loadout that maximizes a weighted sum of final stats.
+
+    Relics dominated by another relic of the same slot and set are dropped
+    before a branch-and-bound search, which prunes branches whose optimistic
+    score can't beat the best loadout or whose optimistic stats can't meet
+    the constraints.
+
+    :param engine: A `StatEngine`.
+    :param relics: A list of relics in the HSR-Scanner export format.
+    :param relic_stat_vals: The relic stat values.
+    :param character: The character name.
+    :param level: The character (and light cone) level, defaults to 80.
+    :param promotion: The promotion, defaults to the lowest one for the level.
+    :param light_cone: The equipped light cone, defaults to None.
+    :param superimposition: The light cone superimposition, defaults to 1.
+    :param weights: A dictionary mapping final stat names to non-negative
+        weights, defaults to maximizing ATK.
+    :param min_stats: A dictionary mapping final stat names to minimum values.
+    :param required_sets: A dictionary mapping relic set names to the minimum
+        number of equipped pieces.
+    :param processes: The number of worker processes, defaults to 1.
+    :param time_budget: Optional time budget in seconds. When it runs out, the
+        best loadout found so far is returned.
+    :raises ValueError: If a weight is negative.
+    :return: A dictionary with the chosen relic `uids` per slot, the `score`,
+        the final `stats`, and whether the search was `complete`. `uids` is
+        None if no loadout meets the constraints.
+    """
+    weights = weights or {"atk": 1.0}
+    min_stats = min_stats or {}
+    required_sets = required_sets or {}
+    if any(weight < 0 for weight in weights.values()):
+        raise ValueError("Weights must be non-negative")
+
+    base = engine.compile_character(character, level, promotion)
+    if light_cone:
+        lc = engine.compile_light_cone(light_cone, level, promotion, superimposition)
+        base = [a + b for a, b in zip(base, lc)]
+
+    problem = _get_problem(
+        engine, relics, relic_stat_vals, base, weights, min_stats, required_sets
+    )
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+
+    first = problem["slots"][0]
+    if processes > 1 and len(first) > 1:
+        chunks = [list(range(i, len(first), processes)) for i in range(processes)]
+        with Pool(processes) as pool:
+            results = pool.starmap(
+                _search, [(problem, chunk, deadline) for chunk in chunks if chunk]
+            )
+    else:
+        results = [_search(problem, list(range(len(first))), deadline)]
+
+    best_score, best_choice = float("-inf"), None
+    for score, choice, _ in results:
+        if choice is not None and score > best_score:
+            best_score, best_choice = score, choice
+    complete = all(result[2] for result in results)
+
+    if best_choice is None:
+        return {"uids": None, "score": None, "stats": None, "complete": complete}
+
+    chosen = [problem["relics"][i][j] for i, j in enumerate(best_choice)]
+    full_vector = engine.compile_relics(chosen, relic_stat_vals)
+    stats = finalize([[a + b] for a, b in zip(base, full_vector)])
+    return {
+        "uids": {
+            slot: relic.get("_uid")
+            for slot, relic in zip(problem["slot_names"], chosen)
+        },
+        "score": best_score,
+        "stats": {stat: values[0] for stat, values in stats.items()},
+        "complete": complete,
+    }
+
+
+def _get_problem(
+    engine,
+    relics: list,
+    relic_stat_vals: dict,
+    base: list,
+    weights: dict,
+    min_stats: dict,
+    required_sets: dict,
+) -> dict:
+    """Compress the inventory into the picklable search problem.
+
+    Relics and set bonuses never change base stats, so the score is linear in
+    them and each one is reduced to its score gain. Only the stat vector
+    components needed to check `min_stats` are kept, and dominated relics are
+    removed.
+
+    :return: A dictionary describing the search problem.
+    """
+    base_score = 0.0
+    coefficients = [0.0] * len(base)
+    for stat, weight in weights.items():
+        scaled = next((s for s in SCALED_STATS if s[0] == stat), None)
+        if scaled:
+            b, p, f = (STAT_INDEX[s] for s in scaled[1:])
+            base_score += weight * (base[b] * (1 + base[p]) + base[f])
+            coefficients[p] += weight * base[b]
+            coefficients[f] += weight
+        else:
+            base_score += weight * base[STAT_INDEX[stat]]
+            coefficients[STAT_INDEX[stat]] += weight
+
+    components = []
+    for stat, base_stat, percent, flat in SCALED_STATS:
+        if stat in min_stats:
+            components += [base_stat, percent, flat]
+    components += [stat for stat in ADDITIVE_STATS if stat in min_stats]
+    indices = [STAT_INDEX[stat] for stat in components]
+    position = {stat: i for i, stat in enumerate(components)}
+
+    # (minimum, base, percent, flat) of each constrained stat, with -1 for
+    # components additive stats don't have
+    terms = []
+    for stat, minimum in sorted(min_stats.items()):
+        scaled = next((s for s in SCALED_STATS if s[0] == stat), None)
+        if scaled:
+            term = [position[scaled[1]], position[scaled[2]], position[scaled[3]]]
+        else:
+            term = [-1, -1, position[stat]]
+        terms.append((minimum, *term))
+
+    def compress(vector: list) -> tuple:
+        gain = sum(c * v for c, v in zip(coefficients, vector) if c)
+        return gain, tuple(vector[i] for i in indices)
+
+    set_names = sorted(engine.game_data["relic_sets"])
+    set_ids = {name: i for i, name in enumerate(set_names)}
+    set_bonuses = [
+        [compress(bonus) for bonus in engine.compile_set_bonuses(name)]
+        for name in set_names
+    ]
+
+    by_slot = {slot: [] for slot in SLOTS}
+    for relic in relics:
+        gain, vector = compress(get_relic_vector(relic, relic_stat_vals))
+        by_slot[relic["slot"]].append((relic, set_ids[relic["set"]], gain, vector))
+
+    slots, slot_relics, slot_names = [], [], []
+    for slot in SLOTS:
+        candidates = _remove_dominated(by_slot[slot])
+        if not candidates:
+            raise ValueError(f"No relics available for slot {slot}")
+        # try the strongest relics first so good bounds are found early
+        candidates.sort(key=lambda c: c[2], reverse=True)
+        slots.append([candidate[1:] for candidate in candidates])
+        slot_relics.append([candidate[0] for candidate in candidates])
+        slot_names.append(slot)
+
+    # cavern and planar set bonuses are bounded separately until every slot of
+    # the group is chosen. Four cavern pieces hold either one 4-piece set or
+    # two 2-piece sets, two planar pieces hold one 2-piece set.
+    planar_sets = {
+        set_ids[name]
+        for name in set_names
+        if any(
+            slot in PLANAR_SLOTS
+            for slot in engine.game_data["relic_sets"][name]["pieces"]
+        )
+    }
+    set_groups = []
+    for is_planar in (False, True):
+        ids = {i for i in range(len(set_names)) if (i in planar_sets) == is_planar}
+        bonuses = [set_bonuses[i] for i in ids]
+        two_pieces = sorted((b[0][0] for b in bonuses if b), reverse=True)
+        gain_bound = sum(two_pieces[: 1 if is_planar else 2])
+        if not is_planar:
+            gain_bound = max(
+                [gain_bound] + [b[0][0] + b[1][0] for b in bonuses if len(b) > 1]
+            )
+        vector_bound = [0.0] * len(indices)
+        for bonus_index in range(len(SET_BONUS_PIECES)):
+            for k in range(len(indices)):
+                vector_bound[k] += max(
+                    [b[bonus_index][1][k] for b in bonuses if len(b) > bonus_index]
+                    + [0.0]
+                ) * (2 if bonus_index == 0 and not is_planar else 1)
+        end = 1 + max(
+            i for i, slot in enumerate(SLOTS) if (slot in PLANAR_SLOTS) == is_planar
+        )
+        set_groups.append((end, ids, max(gain_bound, 0.0), tuple(vector_bound)))
+
+    return {
+        "base_score": base_score,
+        "base": tuple(base[i] for i in indices),
+        "terms": terms,
+        "slots": slots,
+        "relics": slot_relics,
+        "slot_names": slot_names,
+        "set_bonuses": set_bonuses,
+        "set_groups": set_groups,
+        "required_sets": {
+            set_ids[name]: count for name, count in required_sets.items()
+        },
+    }
+
+
+def _remove_dominated(candidates: list) -> list:
+    """Remove relics that are no better than another relic of the same set.
+
+    :param candidates: A list of `(relic, set_id, gain, vector)` tuples of one slot.
+    :return: The non-dominated candidates.
+    """
+    res = []
+    for i, (_, set_id, gain, vector) in enumerate(candidates):
+        dominated = False
+        for j, (_, other_set_id, other_gain, other) in enumerate(candidates):
+            if i == j or set_id != other_set_id or other_gain < gain:
+                continue
+            if all(o >= v for o, v in zip(other, vector)) and (
+                other_gain > gain or other != vector or j < i
+            ):
+                dominated = True
+                break
+        if not dominated:
+            res.append(candidates[i])
+
+    return res
+
+
+def _is_feasible(terms: list, vector: tuple) -> bool:
+    """Check whether a compressed stat vector meets every minimum.
+
+    :param terms: The constrained stat terms of the problem.
+    :param vector: A compressed stat vector.
+    :return: True if every minimum is met.
+    """
+    for minimum, base, percent, flat in terms:
+        if base >= 0:
+            value = vector[base] * (1 + vector[percent]) + vector[flat]
+        else:
+            value = vector[flat]
+        if value < minimum:
+            return False
+
+    return True
+
+
+def _search(problem: dict, first_candidates: list, deadline: float) -> tuple:
+    """Run branch and bound over a subset of the first slot's candidates.
+
+    :param problem: The search problem, as returned by `_get_problem`.
+    :param first_candidates: Indices of the first slot's candidates to search.
+    :param deadline: Optional `time.monotonic` deadline.
+    :return: A tuple of the best score, the chosen candidate index per slot
+        (or None), and whether the search completed before the deadline.
+    """
+    slots = problem["slots"]
+    terms = problem["terms"]
+    set_bonuses = problem["set_bonuses"]
+    set_groups = problem["set_groups"]
+    required_sets = problem["required_sets"]
+    n_slots = len(slots)
+    width = len(problem["base"])
+
+    # maxima of the remaining slots, for the optimistic bound
+    remaining_gain = [0.0] * (n_slots + 1)
+    remaining_max = [tuple(0.0 for _ in range(width))] * (n_slots + 1)
+    for i in range(n_slots - 1, -1, -1):
+        remaining_gain[i] = remaining_gain[i + 1] + slots[i][0][1]
+        remaining_max[i] = tuple(
+            a + max(vector[k] for _, _, vector in slots[i])
+            for k, a in enumerate(remaining_max[i + 1])
+        )
+    # slots that can still hold each required set
+    remaining_slots = {
+        set_id: [
+            sum(
+                1
+                for slot in slots[i:]
+                if any(candidate[0] == set_id for candidate in slot)
+            )
+            for i in range(n_slots + 1)
+        ]
+        for set_id in required_sets
+    }
+
+    best = [float("-inf"), None]
+    choice = [0] * n_slots
+    counts = {}
+    state = {"nodes": 0, "complete": True}
+
+    def visit(depth: int, gain: float, vector: tuple):
+        state["nodes"] += 1
+        if (
+            deadline is not None
+            and state["nodes"] % DEADLINE_CHECK_INTERVAL == 0
+            and time.monotonic() > deadline
+        ):
+            state["complete"] = False
+        if not state["complete"]:
+            return
+
+        for set_id, count in required_sets.items():
+            if counts.get(set_id, 0) + remaining_slots[set_id][depth] < count:
+                return
+
+        # exact bonuses of set groups whose slots are all chosen, optimistic
+        # bounds for the others
+        total_gain, total = gain, vector
+        for end, ids, gain_bound, vector_bound in set_groups:
+            if depth < end:
+                total_gain += gain_bound
+                if width:
+                    total = tuple(a + b for a, b in zip(total, vector_bound))
+                continue
+            for set_id, count in counts.items():
+                if set_id not in ids:
+                    continue
+                for pieces, bonus in zip(SET_BONUS_PIECES, set_bonuses[set_id]):
+                    if count >= pieces:
+                        total_gain += bonus[0]
+                        if width:
+                            total = tuple(a + b for a, b in zip(total, bonus[1]))
+
+        if depth == n_slots:
+            if total_gain > best[0] and _is_feasible(terms, total):
+                best[0] = total_gain
+                best[1] = list(choice)
+            return
+
+        if width and not _is_feasible(
+            terms, tuple(a + b for a, b in zip(total, remaining_max[depth]))
+        ):
+            return
+
+        # candidates are sorted by gain, so the first one that can't beat the
+        # best loadout ends the loop
+        bound = total_gain + remaining_gain[depth + 1]
+        candidates = range(len(slots[depth])) if depth else first_candidates
+        for i in candidates:
+            set_id, relic_gain, relic_vector = slots[depth][i]
+            if bound + relic_gain <= best[0]:
+                break
+            choice[depth] = i
+            counts[set_id] = counts.get(set_id, 0) + 1
+            visit(
+                depth + 1,
+                gain + relic_gain,
+                tuple(a + b for a, b in zip(vector, relic_vector)),
+            )
+            counts[set_id] -= 1
+
+    visit(0, 0.0, problem["base"])
+    return problem["base_score"] + best[0], best[1], state["complete"]
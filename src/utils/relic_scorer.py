@@ -0,0 +1,291 @@
+import json
+from array import array
+from math import ceil
+
+
+SLOTS = ["Head", "Hands", "Body", "Feet", "Planar Sphere", "Link Rope"]
+
+SUBSTATS = [
+    "HP",
+    "ATK",
+    "DEF",
+    "HP_",
+    "ATK_",
+    "DEF_",
+    "SPD",
+    "CRIT Rate_",
+    "CRIT DMG_",
+    "Effect Hit Rate_",
+    "Effect RES_",
+    "Break Effect_",
+]
+
+MAIN_STATS = [
+    "HP",
+    "ATK",
+    "DEF",
+    "CRIT Rate",
+    "CRIT DMG",
+    "Outgoing Healing Boost",
+    "SPD",
+    "Effect Hit Rate",
+    "Physical DMG Boost",
+    "Fire DMG Boost",
+    "Ice DMG Boost",
+    "Lightning DMG Boost",
+    "Wind DMG Boost",
+    "Quantum DMG Boost",
+    "Imaginary DMG Boost",
+    "Break Effect",
+    "Energy Regeneration Rate",
+]
+
+# relics never have more than four substats
+MAX_SUBSTATS = 4
+
+# displayed values are truncated, so allow a small margin before counting an extra roll
+ROLL_TOLERANCE = 0.02
+
+DEFAULT_BATCH_SIZE = 8192
+
+
+def load_inventory(path: str) -> dict:
+    """Load the relics of an HSR-Scanner export into columnar arrays.
+
+    Substat columns are padded with -1 keys and 0 values for relics with fewer
+    than four substats.
+
+    :param path: The path to the HSR-Scanner JSON export.
+    :return: A dictionary mapping column names to arrays.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        scan = json.load(f)
+
+    return get_inventory_columns(scan["relics"])
+
+
+def get_inventory_columns(relics: list) -> dict:
+    """Convert a list of HSR-Scanner relics into columnar arrays.
+
+    :param relics: A list of relics in the HSR-Scanner export format.
+    :raises ValueError: If a relic has an unknown slot, main stat, or substat.
+    :return: A dictionary mapping column names to arrays.
+    """
+    slot_index = {slot: i for i, slot in enumerate(SLOTS)}
+    main_index = {stat: i for i, stat in enumerate(MAIN_STATS)}
+    sub_index = {stat: i for i, stat in enumerate(SUBSTATS)}
+
+    columns = {
+        "uid": [],
+        "rarity": array("b"),
+        "level": array("b"),
+        "slot": array("b"),
+        "main": array("b"),
+    }
+    for i in range(MAX_SUBSTATS):
+        columns[f"sub_{i}"] = array("b")
+        columns[f"sub_{i}_value"] = array("d")
+
+    for i, relic in enumerate(relics):
+        try:
+            columns["slot"].append(slot_index[relic["slot"]])
+            columns["main"].append(main_index[relic["mainstat"]])
+            subs = [
+                (sub_index[sub["key"]], sub["value"]) for sub in relic["substats"]
+            ]
+        except KeyError as e:
+            raise ValueError(f"Invalid relic at index {i}: unknown stat {e}")
+
+        columns["uid"].append(relic.get("_uid", str(i)))
+        columns["rarity"].append(relic["rarity"])
+        columns["level"].append(relic["level"])
+        subs += [(-1, 0.0)] * (MAX_SUBSTATS - len(subs))
+        for j, (key, value) in enumerate(subs):
+            columns[f"sub_{j}"].append(key)
+            columns[f"sub_{j}_value"].append(value)
+
+    return columns
+
+
+def get_score_tables(relic_stat_vals: dict) -> dict:
+    """Flatten relic stat values into lookup tables indexed by column codes.
+
+    Values are expressed in the units HSR-Scanner displays, i.e. percentages
+    for percentage stats.
+
+    :param relic_stat_vals: The relic stat values, as returned by
+        `get_relic_stat_vals` or loaded from `relic_stat_vals.json`.
+    :return: A dictionary of lookup tables.
+    """
+    main_base = [0.0] * (6 * len(SLOTS) * len(MAIN_STATS))
+    main_step = [0.0] * len(main_base)
+    sub_high = [0.0] * (6 * len(SUBSTATS))
+
+    for rarity, slots in relic_stat_vals["main"].items():
+        for slot, stats in slots.items():
+            for stat, value in stats.items():
+                scale = 1 if _is_flat_main_stat(slot, stat) else 100
+                i = _main_table_index(
+                    int(rarity), SLOTS.index(slot), MAIN_STATS.index(stat)
+                )
+                main_base[i] = value["base"] * scale
+                main_step[i] = value["step"] * scale
+
+    for rarity, stats in relic_stat_vals["sub"].items():
+        for stat, value in stats.items():
+            if stat == "SPD":
+                value = value["high"]
+            elif stat.endswith("_"):
+                value *= 100
+            sub_high[int(rarity) * len(SUBSTATS) + SUBSTATS.index(stat)] = value
+
+    return {"main_base": main_base, "main_step": main_step, "sub_high": sub_high}
+
+
+def score_relics(
+    columns: dict,
+    relic_stat_vals: dict,
+    weights: dict = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    tables: dict = None,
+):
+    """Score an inventory in batches.
+
+    For every relic, the substat roll values are the substat values divided by
+    the value of a single high roll, so a perfect roll counts as 1.0 and a low
+    roll as the substat's low to high roll ratio. That ratio is 0.8 for most
+    substats, but SPD rolls have their own values, e.g. about 0.77 for 5 star
+    relics (2 out of 2.6) and 0.83 for 2 star relics (1 out of 1.2).
+
+    :param columns: The inventory columns, as returned by `load_inventory`.
+    :param relic_stat_vals: The relic stat values.
+    :param weights: Optional substat weights used for `score`, defaults to 1 for
+        every substat.
+    :param batch_size: The number of relics per yielded batch.
+    :param tables: Optional lookup tables, as returned by `get_score_tables`, to
+        use instead of building them from `relic_stat_vals`.
+    :return: A generator of dictionaries mapping result column names to lists.
+    """
+    if tables is None:
+        tables = get_score_tables(relic_stat_vals)
+    main_base = tables["main_base"]
+    main_step = tables["main_step"]
+    sub_high = tables["sub_high"]
+    n_subs = len(SUBSTATS)
+    sub_weights = [1.0] * n_subs
+    if weights:
+        sub_weights = [weights.get(stat, 0.0) for stat in SUBSTATS]
+    # index -1 is used for padded substats
+    sub_weights.append(0.0)
+
+    total = len(columns["rarity"])
+    for start in range(0, total, batch_size):
+        end = min(start + batch_size, total)
+        rarity = columns["rarity"][start:end]
+        level = columns["level"][start:end]
+
+        main_index = [
+            _main_table_index(r, s, m)
+            for r, s, m in zip(
+                rarity, columns["slot"][start:end], columns["main"][start:end]
+            )
+        ]
+        main_value = [
+            main_base[i] + main_step[i] * lv for i, lv in zip(main_index, level)
+        ]
+
+        rolls = [0] * (end - start)
+        roll_value = [0.0] * (end - start)
+        score = [0.0] * (end - start)
+        for j in range(MAX_SUBSTATS):
+            keys = columns[f"sub_{j}"][start:end]
+            values = columns[f"sub_{j}_value"][start:end]
+            units = [
+                v / sub_high[r * n_subs + k] if k >= 0 else 0.0
+                for r, k, v in zip(rarity, keys, values)
+            ]
+            rolls = [
+                n + max(1, ceil(u - ROLL_TOLERANCE)) if u else n
+                for n, u in zip(rolls, units)
+            ]
+            roll_value = [t + u for t, u in zip(roll_value, units)]
+            score = [t + u * sub_weights[k] for t, u, k in zip(score, units, keys)]
+
+        yield {
+            "uid": columns["uid"][start:end],
+            "main_value": main_value,
+            "rolls": rolls,
+            "roll_value": roll_value,
+            "efficiency": [v / n if n else 0.0 for v, n in zip(roll_value, rolls)],
+            "score": score,
+        }
+
+
+def get_stat_totals(
+    columns: dict, relic_stat_vals: dict, tables: dict = None
+) -> dict:
+    """Get the main stat and substat totals of the whole inventory.
+
+    :param columns: The inventory columns, as returned by `load_inventory`.
+    :param relic_stat_vals: The relic stat values.
+    :param tables: Optional lookup tables, as returned by `get_score_tables`, to
+        use instead of building them from `relic_stat_vals`.
+    :return: A dictionary with `main` and `sub` totals keyed by stat name.
+    """
+    if tables is None:
+        tables = get_score_tables(relic_stat_vals)
+    main_totals = [0.0] * len(MAIN_STATS)
+    sub_totals = [0.0] * len(SUBSTATS)
+
+    for r, s, m, lv in zip(
+        columns["rarity"], columns["slot"], columns["main"], columns["level"]
+    ):
+        i = _main_table_index(r, s, m)
+        main_totals[m] += tables["main_base"][i] + tables["main_step"][i] * lv
+    for j in range(MAX_SUBSTATS):
+        for k, v in zip(columns[f"sub_{j}"], columns[f"sub_{j}_value"]):
+            if k >= 0:
+                sub_totals[k] += v
+
+    return {
+        "main": {stat: total for stat, total in zip(MAIN_STATS, main_totals) if total},
+        "sub": {stat: total for stat, total in zip(SUBSTATS, sub_totals) if total},
+    }
+
+
+def write_scores(path: str, columns: dict, relic_stat_vals: dict, **kwargs):
+    """Stream relic scores to a JSON Lines file, one relic per line.
+
+    :param path: The output path.
+    :param columns: The inventory columns, as returned by `load_inventory`.
+    :param relic_stat_vals: The relic stat values.
+    :param kwargs: Additional keyword arguments passed to `score_relics`.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for batch in score_relics(columns, relic_stat_vals, **kwargs):
+            keys = list(batch)
+            f.writelines(
+                json.dumps(dict(zip(keys, row)), separators=(",", ":")) + "\n"
+                for row in zip(*batch.values())
+            )
+
+
+def _main_table_index(rarity: int, slot: int, main: int) -> int:
+    """Get the index of a main stat in the flattened main stat tables.
+
+    :param rarity: The relic rarity.
+    :param slot: The slot index.
+    :param main: The main stat index.
+    :return: The table index.
+    """
+    return (rarity * len(SLOTS) + slot) * len(MAIN_STATS) + main
+
+
+def _is_flat_main_stat(slot: str, stat: str) -> bool:
+    """Check whether a main stat is displayed as a flat value.
+
+    :param slot: The relic slot.
+    :param stat: The main stat name.
+    :return: Whether the main stat is flat.
+    """
+    return (slot, stat) in (("Head", "HP"), ("Hands", "ATK")) or stat == "SPD"
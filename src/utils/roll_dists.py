@@ -0,0 +1,155 @@
+import json
+from bisect import bisect_left
+
+
+class RelicRollDists:
+    """Lookup of the exact substat value distributions of relics.
+
+    Built from the `relic_roll_dists.json` artifact.
+    """
+
+    def __init__(self, relic_roll_dists: dict):
+        """Index the distributions by rarity, substat and roll or upgrade count.
+
+        :param relic_roll_dists: The distributions, as returned by
+            `get_relic_roll_dists`.
+        """
+        self._dists = {}
+        self._roll_counts = {}
+        for rarity, tables in relic_roll_dists.items():
+            rarity = int(rarity)
+            for kind in ("rolls", "upgrades"):
+                for substat, dists in tables[kind].items():
+                    for n, dist in dists.items():
+                        # suffix sums, so tail probabilities are a single lookup
+                        suffix = [0] * (len(dist["counts"]) + 1)
+                        for i in range(len(dist["counts"]) - 1, -1, -1):
+                            suffix[i] = suffix[i + 1] + dist["counts"][i]
+                        self._dists[(rarity, substat, kind, int(n))] = (
+                            dist["values"],
+                            suffix,
+                            dist["denominator"],
+                        )
+            for n, roll_counts in tables["roll_counts"].items():
+                self._roll_counts[(rarity, int(n))] = roll_counts
+
+    @classmethod
+    def load(cls, path: str) -> "RelicRollDists":
+        """Load the distributions from a `relic_roll_dists.json` file.
+
+        :param path: The file path.
+        :return: The distributions.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def get_distribution(
+        self, rarity: int, substat: str, rolls: int = None, upgrades: int = None
+    ) -> dict:
+        """Get the probability of every value of a substat.
+
+        Exactly one of `rolls` and `upgrades` must be given.
+
+        :param rarity: The relic rarity.
+        :param substat: The substat name, e.g. `CRIT Rate_`.
+        :param rolls: The number of times the substat was rolled.
+        :param upgrades: The number of upgrades of the relic.
+        :raises ValueError: If neither or both of `rolls` and `upgrades` are given.
+        :raises KeyError: If the distribution doesn't exist.
+        :return: A dictionary mapping values to probabilities.
+        """
+        values, suffix, denominator = self._get_dist(rarity, substat, rolls, upgrades)
+        return {
+            value: (suffix[i] - suffix[i + 1]) / denominator
+            for i, value in enumerate(values)
+        }
+
+    def get_probability(
+        self,
+        rarity: int,
+        substat: str,
+        value: float,
+        rolls: int = None,
+        upgrades: int = None,
+    ) -> float:
+        """Get the probability of a substat having exactly a value.
+
+        :param rarity: The relic rarity.
+        :param substat: The substat name, e.g. `CRIT Rate_`.
+        :param value: The substat value, as displayed in game.
+        :param rolls: The number of times the substat was rolled.
+        :param upgrades: The number of upgrades of the relic.
+        :raises ValueError: If neither or both of `rolls` and `upgrades` are given.
+        :raises KeyError: If the distribution doesn't exist.
+        :return: The probability.
+        """
+        values, suffix, denominator = self._get_dist(rarity, substat, rolls, upgrades)
+        i = bisect_left(values, value)
+        if i == len(values) or values[i] != value:
+            return 0.0
+        return (suffix[i] - suffix[i + 1]) / denominator
+
+    def get_tail_probability(
+        self,
+        rarity: int,
+        substat: str,
+        value: float,
+        rolls: int = None,
+        upgrades: int = None,
+    ) -> float:
+        """Get the probability of a substat reaching at least a value.
+
+        :param rarity: The relic rarity.
+        :param substat: The substat name, e.g. `CRIT Rate_`.
+        :param value: The substat value, as displayed in game.
+        :param rolls: The number of times the substat was rolled.
+        :param upgrades: The number of upgrades of the relic.
+        :raises ValueError: If neither or both of `rolls` and `upgrades` are given.
+        :raises KeyError: If the distribution doesn't exist.
+        :return: The probability.
+        """
+        values, suffix, denominator = self._get_dist(rarity, substat, rolls, upgrades)
+        return suffix[bisect_left(values, value)] / denominator
+
+    def get_roll_count_probabilities(
+        self, rarity: int, substat: str, value: float, upgrades: int
+    ) -> dict:
+        """Get how likely each number of rolls is, given a substat's value.
+
+        :param rarity: The relic rarity.
+        :param substat: The substat name, e.g. `CRIT Rate_`.
+        :param value: The substat value, as displayed in game.
+        :param upgrades: The number of upgrades of the relic.
+        :raises KeyError: If the distribution doesn't exist.
+        :return: A dictionary mapping roll counts to probabilities. Empty if the
+            value is impossible.
+        """
+        roll_counts = self._roll_counts[(rarity, upgrades)]
+        weights = {
+            extra + 1: count
+            / roll_counts["denominator"]
+            * self.get_probability(rarity, substat, value, rolls=extra + 1)
+            for extra, count in enumerate(roll_counts["counts"])
+        }
+        total = sum(weights.values())
+        if not total:
+            return {}
+        return {rolls: weight / total for rolls, weight in weights.items() if weight}
+
+    def _get_dist(
+        self, rarity: int, substat: str, rolls: int, upgrades: int
+    ) -> tuple:
+        """Get a distribution by roll count or upgrade count.
+
+        :param rarity: The relic rarity.
+        :param substat: The substat name.
+        :param rolls: The number of rolls, or None.
+        :param upgrades: The number of upgrades, or None.
+        :raises ValueError: If neither or both of `rolls` and `upgrades` are given.
+        :return: A tuple of the values, suffix sums of the counts and denominator.
+        """
+        if (rolls is None) == (upgrades is None):
+            raise ValueError("Exactly one of rolls and upgrades must be given")
+        if rolls is not None:
+            return self._dists[(rarity, substat, "rolls", rolls)]
+        return self._dists[(rarity, substat, "upgrades", upgrades)]
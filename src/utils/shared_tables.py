@@ -0,0 +1,363 @@
+import json
+import multiprocessing
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from multiprocessing import resource_tracker, shared_memory
+from utils.relic_scorer import SUBSTATS, get_score_tables
+
+
+MAGIC = b"HSRT"
+FORMAT_VERSION = 1
+
+# magic, format version, number of tables
+HEADER = struct.Struct("<4sHH")
+# table name, kind (an array typecode, or `r` for records), offset, size
+ENTRY = struct.Struct("<32sc7xQQ")
+
+RECORDS = b"r"
+
+# tables start at multiples of 8 bytes, so typed views are aligned
+ALIGNMENT = 8
+
+# names of the blocks published by this process, which stay registered with
+# the resource tracker when attached
+_PUBLISHED = set()
+
+# relic_roll_vals groups are indexed by `rarity * len(SUBSTATS) + substat`
+MAX_RARITY = 5
+
+
+def build_shared_tables(
+    game_data: dict, relic_stat_vals: dict, relic_roll_vals: dict
+) -> bytes:
+    """Pack the lookup tables of the scanner artifacts into one flat buffer.
+
+    The buffer starts with a directory of tables. Relic score tables and
+    relic roll values are stored as typed arrays that can be read in place.
+    Every dictionary in the game data becomes a records table of sorted keys
+    and per-entry minified JSON, and the remaining top-level values are stored
+    in the `info` records table.
+
+    :param game_data: The game data, as returned by `get_game_data`.
+    :param relic_stat_vals: The relic stat values, as returned by
+        `get_relic_stat_vals`.
+    :param relic_roll_vals: The relic roll values, as returned by
+        `generate_rarity_data`.
+    :return: The packed tables.
+    """
+    tables = {}
+    for name, values in get_score_tables(relic_stat_vals).items():
+        tables[name] = (b"d", array("d", values).tobytes())
+    for name, (typecode, values) in _get_roll_tables(relic_roll_vals).items():
+        tables[name] = (typecode.encode(), array(typecode, values).tobytes())
+
+    info = {}
+    for key, value in game_data.items():
+        if isinstance(value, dict):
+            tables[key] = (RECORDS, _pack_records(value))
+        else:
+            info[key] = value
+    tables["info"] = (RECORDS, _pack_records(info))
+
+    offset = _align(HEADER.size + ENTRY.size * len(tables))
+    directory = [HEADER.pack(MAGIC, FORMAT_VERSION, len(tables))]
+    body = []
+    for name, (kind, data) in tables.items():
+        directory.append(ENTRY.pack(name.encode(), kind, offset, len(data)))
+        padding = _align(len(data)) - len(data)
+        body.append(data + bytes(padding))
+        offset += len(data) + padding
+
+    head = b"".join(directory)
+    return head + bytes(_align(len(head)) - len(head)) + b"".join(body)
+
+
+def publish_shared_tables(
+    name: str, game_data: dict, relic_stat_vals: dict, relic_roll_vals: dict
+) -> shared_memory.SharedMemory:
+    """Publish the lookup tables of the scanner artifacts to shared memory.
+
+    The caller owns the block: it must keep the returned object alive while
+    workers use it, then `close` and `unlink` it.
+
+    :param name: The name of the shared memory block.
+    :param game_data: The game data, as returned by `get_game_data`.
+    :param relic_stat_vals: The relic stat values.
+    :param relic_roll_vals: The relic roll values.
+    :raises FileExistsError: If a block with that name already exists.
+    :return: The shared memory block.
+    """
+    data = build_shared_tables(game_data, relic_stat_vals, relic_roll_vals)
+    shm = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+    shm.buf[: len(data)] = data
+    _PUBLISHED.add(name)
+    return shm
+
+
+class SharedTables:
+    """Read-only view of lookup tables published with `publish_shared_tables`.
+
+    Attaching maps the existing block without copying or parsing it, so every
+    worker shares the same memory. Arrays are returned as memoryviews into the
+    block and game data records are decoded on access.
+    """
+
+    def __init__(self, name: str):
+        """Attach to published lookup tables.
+
+        :param name: The name of the shared memory block.
+        :raises FileNotFoundError: If no block with that name exists.
+        :raises ValueError: If the block doesn't hold lookup tables of this
+            format version.
+        """
+        self._shm = _attach(name)
+        self._buf = self._shm.buf.toreadonly()
+        self._views = [self._buf]
+
+        magic, version, count = HEADER.unpack_from(self._buf)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported shared tables in {name}")
+
+        self._tables = {}
+        for i in range(count):
+            table, kind, offset, size = ENTRY.unpack_from(
+                self._buf, HEADER.size + ENTRY.size * i
+            )
+            self._tables[table.rstrip(b"\0").decode()] = (kind, offset, size)
+        self._arrays = {}
+        self._records = {}
+
+    def __enter__(self) -> "SharedTables":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Detach from the block. Views returned earlier can't be used after."""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._arrays = {}
+        self._records = {}
+        self._shm.close()
+
+    def get_array(self, table: str) -> memoryview:
+        """Get a typed array table.
+
+        :param table: The table name, e.g. `main_base`.
+        :raises KeyError: If the table doesn't exist or isn't an array.
+        :return: A read-only memoryview of the values.
+        """
+        if table not in self._arrays:
+            kind, offset, size = self._tables[table]
+            if kind == RECORDS:
+                raise KeyError(table)
+            self._arrays[table] = self._view(offset, size, kind.decode())
+
+        return self._arrays[table]
+
+    def get_score_tables(self) -> dict:
+        """Get the relic score lookup tables.
+
+        :return: A dictionary of lookup tables, as returned by
+            `get_score_tables`, that can be passed to `score_relics`.
+        """
+        return {
+            table: self.get_array(table)
+            for table in ("main_base", "main_step", "sub_high")
+        }
+
+    def get_roll_values(self, rarity: int, substat: str, value: float) -> list:
+        """Get the possible roll values behind a displayed substat value.
+
+        :param rarity: The relic rarity.
+        :param substat: The substat name, e.g. `CRIT Rate_`.
+        :param value: The displayed substat value.
+        :raises ValueError: If the substat doesn't exist.
+        :raises KeyError: If the substat value isn't possible.
+        :return: A list of roll values, where a high roll counts as 1.0.
+        """
+        group = rarity * len(SUBSTATS) + SUBSTATS.index(substat)
+        groups = self.get_array("roll_groups")
+        keys = self.get_array("roll_keys")
+        i = bisect_left(keys, value, groups[group], groups[group + 1])
+        if i == groups[group + 1] or keys[i] != value:
+            raise KeyError(value)
+
+        spans = self.get_array("roll_spans")
+        return list(self.get_array("roll_values")[spans[i] : spans[i + 1]])
+
+    def get_keys(self, table: str) -> list:
+        """Get the keys of a records table.
+
+        :param table: The table name, e.g. `characters`.
+        :raises KeyError: If the table doesn't exist or doesn't hold records.
+        :return: A list of keys, sorted by their UTF-8 encoding.
+        """
+        key_offsets, _, blob = self._get_records(table)
+        return [
+            bytes(blob[key_offsets[i] : key_offsets[i + 1]]).decode()
+            for i in range(len(key_offsets) - 1)
+        ]
+
+    def get_record(self, table: str, key: str):
+        """Get a single entry of a records table.
+
+        :param table: The table name, e.g. `characters`.
+        :param key: The entry key, e.g. a character name.
+        :raises KeyError: If the table or entry doesn't exist.
+        :return: The decoded entry.
+        """
+        key_offsets, value_offsets, blob = self._get_records(table)
+        target = key.encode()
+
+        lo, hi = 0, len(key_offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(blob[key_offsets[mid] : key_offsets[mid + 1]]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if (
+            lo == len(key_offsets) - 1
+            or bytes(blob[key_offsets[lo] : key_offsets[lo + 1]]) != target
+        ):
+            raise KeyError(key)
+
+        return json.loads(bytes(blob[value_offsets[lo] : value_offsets[lo + 1]]))
+
+    def _get_records(self, table: str) -> tuple:
+        """Get the views of a records table.
+
+        :param table: The table name.
+        :raises KeyError: If the table doesn't exist or doesn't hold records.
+        :return: A tuple of the key offsets, value offsets and data views.
+        """
+        if table not in self._records:
+            kind, offset, size = self._tables[table]
+            if kind != RECORDS:
+                raise KeyError(table)
+            (count,) = struct.unpack_from("<Q", self._buf, offset)
+            key_offsets = self._view(offset + 8, 4 * (count + 1), "I")
+            value_offsets = self._view(
+                offset + 8 + 4 * (count + 1), 4 * (count + 1), "I"
+            )
+            start = offset + 8 + 8 * (count + 1)
+            blob = self._view(start, offset + size - start)
+            self._records[table] = (key_offsets, value_offsets, blob)
+
+        return self._records[table]
+
+    def _view(self, offset: int, size: int, typecode: str = None) -> memoryview:
+        """Get a view of part of the block.
+
+        :param offset: The offset in bytes.
+        :param size: The size in bytes.
+        :param typecode: Optional array typecode to cast the view to.
+        :return: A read-only memoryview.
+        """
+        view = self._buf[offset : offset + size]
+        self._views.append(view)
+        if typecode:
+            view = view.cast(typecode)
+            self._views.append(view)
+        return view
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a shared memory block without tracking it.
+
+    :param name: The name of the shared memory block.
+    :raises FileNotFoundError: If no block with that name exists.
+    :return: The shared memory block.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    # before Python 3.13, attaching registers the block with the resource
+    # tracker on POSIX, which unlinks it when a worker with its own tracker
+    # exits, so this block is unregistered again right away. The publisher
+    # and its multiprocessing workers share one tracker, where registering is
+    # a no-op and unregistering would drop the publisher's registration
+    shm = shared_memory.SharedMemory(name=name)
+    if (
+        os.name == "posix"
+        and name not in _PUBLISHED
+        and multiprocessing.parent_process() is None
+    ):
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _get_roll_tables(relic_roll_vals: dict) -> dict:
+    """Flatten relic roll values into arrays.
+
+    `roll_groups` holds the range of `roll_keys` of each rarity and substat,
+    and `roll_spans` the range of `roll_values` of each displayed value.
+
+    :param relic_roll_vals: The relic roll values, keyed by rarity, substat and
+        displayed value.
+    :return: A dictionary mapping table names to `(typecode, values)` tuples.
+    """
+    groups = [0]
+    keys = []
+    spans = [0]
+    values = []
+    for rarity in range(MAX_RARITY + 1):
+        stats = relic_roll_vals.get(rarity, relic_roll_vals.get(str(rarity), {}))
+        for substat in SUBSTATS:
+            rolls = stats.get(substat, {})
+            for key in sorted(rolls, key=float):
+                roll = rolls[key]
+                keys.append(float(key))
+                values += roll if isinstance(roll, list) else [roll]
+                spans.append(len(values))
+            groups.append(len(keys))
+
+    return {
+        "roll_groups": ("I", groups),
+        "roll_keys": ("d", keys),
+        "roll_spans": ("I", spans),
+        "roll_values": ("d", values),
+    }
+
+
+def _pack_records(records: dict) -> bytes:
+    """Pack a dictionary into sorted keys and minified JSON values.
+
+    :param records: A dictionary with string keys.
+    :return: The entry count, the key and value offsets, then the data.
+    """
+    items = sorted((key.encode(), value) for key, value in records.items())
+    key_offsets = [0]
+    value_offsets = []
+    data = []
+    for key, _ in items:
+        data.append(key)
+        key_offsets.append(key_offsets[-1] + len(key))
+    value_offsets.append(key_offsets[-1])
+    for _, value in items:
+        value = json.dumps(value, separators=(",", ":")).encode()
+        data.append(value)
+        value_offsets.append(value_offsets[-1] + len(value))
+
+    return (
+        struct.pack("<Q", len(items))
+        + array("I", key_offsets).tobytes()
+        + array("I", value_offsets).tobytes()
+        + b"".join(data)
+    )
+
+
+def _align(size: int) -> int:
+    """Round a size up to the table alignment.
+
+    :param size: The size in bytes.
+    :return: The aligned size.
+    """
+    return -(-size // ALIGNMENT) * ALIGNMENT
@@ -0,0 +1,117 @@
+import json
+from array import array
+
+
+# skill types of the HSR-Scanner export
+SKILLS = ["basic", "skill", "ult", "talent"]
+
+
+class SkillLevels:
+    """Batch resolver of the base skill levels behind displayed skill levels.
+
+    Built from the `skill_levels.json` artifact.
+    """
+
+    def __init__(self, skill_levels: dict):
+        """Load the eidolon bonuses into one flat array, with one row of skill
+        bonuses per character and eidolon.
+
+        :param skill_levels: The skill levels, as returned by `get_skill_levels`.
+        """
+        self.version = skill_levels["version"]
+        self.skills = skill_levels["skills"]
+        self.max_levels = skill_levels["max_levels"]
+        self._bonuses = array("b")
+        self._offsets = {}
+        for name, rows in skill_levels["characters"].items():
+            self._offsets[name] = len(self._bonuses)
+            for row in rows:
+                self._bonuses.extend(row)
+        self._eidolons = len(next(iter(skill_levels["characters"].values()), []))
+
+    @classmethod
+    def load(cls, path: str) -> "SkillLevels":
+        """Load the skill levels from a `skill_levels.json` file.
+
+        :param path: The file path.
+        :return: The skill levels.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def get_bonuses(self, name: str, eidolon: int) -> dict:
+        """Get the skill level bonuses of a character at an eidolon.
+
+        :param name: The character name.
+        :param eidolon: The eidolon, from 0 to 6.
+        :raises KeyError: If the character doesn't exist.
+        :raises ValueError: If the eidolon is invalid.
+        :return: A dictionary mapping skill types to level bonuses.
+        """
+        row = self._get_rows([name], [eidolon])[0]
+        return {
+            skill: self._bonuses[row + i] for i, skill in enumerate(self.skills)
+        }
+
+    def get_base_levels(self, columns: dict) -> dict:
+        """Convert the displayed skill levels of a roster to base levels.
+
+        :param columns: A dictionary mapping `name` and `eidolon` to lists, and
+            each skill type to a list of displayed levels, as returned by
+            `get_roster_columns`.
+        :raises KeyError: If a character doesn't exist.
+        :raises ValueError: If an eidolon is invalid, or a displayed level is
+            impossible at its character's eidolon.
+        :return: A dictionary mapping `name` and each skill type to lists, with
+            base levels in the same order as the roster.
+        """
+        rows = self._get_rows(columns["name"], columns["eidolon"])
+        bonuses = self._bonuses
+        res = {"name": columns["name"]}
+        for i, (skill, max_level) in enumerate(zip(self.skills, self.max_levels)):
+            levels = [
+                level - bonuses[row + i] for row, level in zip(rows, columns[skill])
+            ]
+            if levels and not 1 <= min(levels) <= max(levels) <= max_level:
+                j = next(
+                    j for j, level in enumerate(levels) if not 1 <= level <= max_level
+                )
+                raise ValueError(
+                    f"Invalid {skill} level {columns[skill][j]} for "
+                    f"{columns['name'][j]} at E{columns['eidolon'][j]}"
+                )
+            res[skill] = levels
+
+        return res
+
+    def _get_rows(self, names: list, eidolons: list) -> list:
+        """Get the offsets of the bonus rows of characters at eidolons.
+
+        :param names: A list of character names.
+        :param eidolons: A list of eidolons, in the same order.
+        :raises KeyError: If a character doesn't exist.
+        :raises ValueError: If an eidolon is invalid.
+        :return: A list of offsets into the flat bonus array.
+        """
+        for eidolon in eidolons:
+            if not 0 <= eidolon < self._eidolons:
+                raise ValueError(f"Invalid eidolon: {eidolon}")
+
+        n = len(self.skills)
+        return [self._offsets[name] + e * n for name, e in zip(names, eidolons)]
+
+
+def get_roster_columns(characters: list) -> dict:
+    """Convert a list of HSR-Scanner characters into columns.
+
+    :param characters: A list of characters in the HSR-Scanner export format.
+    :return: A dictionary mapping `name`, `eidolon` and each skill type to lists.
+    """
+    columns = {column: [] for column in ["name", "eidolon"] + SKILLS}
+    for character in characters:
+        columns["name"].append(character["key"])
+        columns["eidolon"].append(character["eidolon"])
+        for skill in SKILLS:
+            columns[skill].append(character["skills"][skill])
+
+    return columns
@@ -0,0 +1,217 @@
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from json.decoder import WHITESPACE
+from utils.json_backend import BACKEND, loads
+
+
+# parsed source files keyed by path, along with the signature and row fields they
+# were parsed with
+_CACHE = {}
+
+_DECODER = json.JSONDecoder()
+
+# whether projected files are parsed one row at a time, which lowers peak memory
+# but is slower than parsing them whole
+_LOW_MEMORY = False
+
+
+def get_signature(path: str) -> tuple:
+    """Get a cheap change signature for a file.
+
+    :param path: The file path.
+    :return: A tuple of the modification time in nanoseconds and the file size,
+        or None if the file doesn't exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def get_snapshot(paths: list) -> dict:
+    """Get the signatures of every file under the given paths.
+
+    Directories are scanned one level deep.
+
+    :param paths: A list of file or directory paths.
+    :return: A dictionary mapping file paths to signatures.
+    """
+    res = {}
+    for path in paths:
+        if os.path.isdir(path):
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        res[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        else:
+            res[path] = get_signature(path)
+
+    return res
+
+
+def load_json(path: str, fields: set = None):
+    """Load a JSON source file, reusing the parsed result while the file is unchanged.
+
+    Callers must not mutate the returned object, since it is shared between calls.
+
+    :param path: The file path.
+    :param fields: Optional fields to keep in each row of a file mapping ids to
+        rows. With orjson, other fields are dropped once the file is parsed. In
+        low memory mode, they are dropped as soon as their row is parsed and
+        the strings that are kept are interned. Otherwise rows are kept whole.
+    :return: The parsed JSON.
+    """
+    if not _LOW_MEMORY and BACKEND != "orjson":
+        # projecting after a stdlib parse costs more time than it saves memory
+        fields = None
+    signature = get_signature(path)
+    fields = None if fields is None else frozenset(fields)
+    cached = _CACHE.get(path)
+    if cached is not None and cached[0] == signature and cached[1] == fields:
+        return cached[2]
+
+    if fields is None:
+        with open(path, "rb") as f:
+            data = loads(f.read())
+    elif _LOW_MEMORY:
+        with open(path, "r", encoding="utf-8") as f:
+            data = _load_rows(f.read(), fields)
+    else:
+        with open(path, "rb") as f:
+            data = _project_rows(loads(f.read()), fields)
+    _CACHE[path] = (signature, fields, data)
+
+    return data
+
+
+def load_bytes(path: str) -> bytes:
+    """Load a binary source file, reusing the result while the file is unchanged.
+
+    :param path: The file path.
+    :return: The file contents.
+    """
+    signature = get_signature(path)
+    cached = _CACHE.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[2]
+
+    with open(path, "rb") as f:
+        data = f.read()
+    _CACHE[path] = (signature, None, data)
+
+    return data
+
+
+def set_low_memory(enabled: bool):
+    """Set whether projected files are parsed one row at a time.
+
+    Row by row parsing uses the stdlib decoder, so it is slower than parsing
+    whole files, especially with orjson, but never holds the unused fields of
+    more than one row.
+
+    :param enabled: Whether to parse projected files one row at a time.
+    """
+    global _LOW_MEMORY
+    _LOW_MEMORY = enabled
+
+
+def prefetch(paths: list, max_workers: int = None, fields: dict = None):
+    """Load JSON source files concurrently so later `load_json` calls hit the cache.
+
+    Reading overlaps with parsing on a thread pool. Paths that don't point to an
+    existing JSON file are skipped.
+
+    :param paths: A list of source file paths.
+    :param max_workers: The maximum number of threads, defaults to the
+        `ThreadPoolExecutor` default.
+    :param fields: Optional dictionary mapping paths to the row fields their
+        extractor loads them with, so the cached results can be reused.
+    """
+    fields = fields or {}
+    paths = [
+        path for path in set(paths) if path.endswith(".json") and os.path.isfile(path)
+    ]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(lambda path: load_json(path, fields.get(path)), paths))
+
+
+def _project_rows(data: dict, fields: frozenset) -> dict:
+    """Keep only the given fields of each row of a parsed JSON object mapping ids
+    to rows.
+
+    :param data: The parsed JSON.
+    :param fields: The fields to keep.
+    :return: A dictionary mapping ids to projected rows.
+    """
+    return {
+        key: (
+            {k: v for k, v in row.items() if k in fields}
+            if isinstance(row, dict)
+            else row
+        )
+        for key, row in data.items()
+    }
+
+
+def _load_rows(text: str, fields: frozenset) -> dict:
+    """Parse a JSON object mapping ids to rows one row at a time, keeping only
+    the given fields of each row.
+
+    :param text: The JSON text.
+    :param fields: The fields to keep.
+    :raises json.JSONDecodeError: If the text isn't a JSON object.
+    :return: A dictionary mapping ids to projected rows.
+    """
+    pos = WHITESPACE.match(text, 0).end()
+    if text[pos : pos + 1] != "{":
+        raise json.JSONDecodeError("Expecting '{'", text, pos)
+    pos = WHITESPACE.match(text, pos + 1).end()
+
+    res = {}
+    if text[pos : pos + 1] == "}":
+        return res
+    while True:
+        key, pos = _DECODER.raw_decode(text, pos)
+        pos = WHITESPACE.match(text, pos).end()
+        if text[pos : pos + 1] != ":":
+            raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+        pos = WHITESPACE.match(text, pos + 1).end()
+        row, pos = _DECODER.raw_decode(text, pos)
+        if isinstance(row, dict):
+            row = {sys.intern(k): _intern(v) for k, v in row.items() if k in fields}
+        res[sys.intern(key)] = row
+
+        pos = WHITESPACE.match(text, pos).end()
+        match text[pos : pos + 1]:
+            case ",":
+                pos = WHITESPACE.match(text, pos + 1).end()
+            case "}":
+                return res
+            case _:
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+
+
+def _intern(value):
+    """Intern every string in a parsed JSON value.
+
+    :param value: The parsed value.
+    :return: The value, with interned strings and keys.
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        # lists in the game files hold a single type, so (nested) lists of
+        # numbers are returned as is
+        first = value
+        while isinstance(first, list):
+            first = first[0] if first else None
+        if not isinstance(first, (str, dict)):
+            return value
+        return [_intern(v) for v in value]
+    if isinstance(value, dict):
+        return {sys.intern(k): _intern(v) for k, v in value.items()}
+    return value
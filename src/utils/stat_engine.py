@@ -0,0 +1,295 @@
+from utils.helpers import (
+    get_modifier_type_from_main_stat,
+    get_modifier_type_from_substat,
+)
+
+
+# layout of compiled stat vectors. `base_*` stats come from character and light
+# cone levels, every other stat uses the modifier types of `_format_modifier`,
+# plus flat `hp`, `atk` and `def` from relics.
+STATS = [
+    "base_hp",
+    "base_atk",
+    "base_def",
+    "base_spd",
+    "hp",
+    "atk",
+    "def",
+    "spd",
+    "hp_",
+    "atk_",
+    "def_",
+    "spd_",
+    "crit_rate",
+    "crit_dmg",
+    "break",
+    "heal",
+    "energy",
+    "effect_hit",
+    "effect_res",
+    "all_dmg",
+    "physical",
+    "fire",
+    "ice",
+    "lightning",
+    "wind",
+    "quantum",
+    "imaginary",
+]
+STAT_INDEX = {stat: i for i, stat in enumerate(STATS)}
+
+# stats that are simply summed into the final stats
+ADDITIVE_STATS = STATS[STAT_INDEX["crit_rate"] :]
+
+# final stats computed from `base * (1 + percent) + flat`
+SCALED_STATS = [
+    ("hp", "base_hp", "hp_", "hp"),
+    ("atk", "base_atk", "atk_", "atk"),
+    ("def", "base_def", "def_", "def"),
+    ("spd", "base_spd", "spd_", "spd"),
+]
+
+# number of relic pieces needed for each set bonus
+SET_BONUS_PIECES = [2, 4]
+
+
+class StatEngine:
+    """Compile characters, light cones and relics into dense stat vectors and
+    evaluate final stats in batches.
+    """
+
+    def __init__(self, game_data_verbose: dict, stat_curves):
+        """Create a stat engine.
+
+        :param game_data_verbose: The verbose game data, as returned by
+            `get_game_data_verbose`.
+        :param stat_curves: A `StatCurves` lookup built from the same data.
+        """
+        self.game_data = game_data_verbose
+        self.stat_curves = stat_curves
+        self._characters = {}
+        self._light_cones = {}
+        self._set_bonuses = {
+            name: [
+                get_modifier_vector(modifiers)
+                for modifiers in relic_set.get("modifiers", [])
+            ]
+            for name, relic_set in game_data_verbose["relic_sets"].items()
+        }
+
+    def compile_character(
+        self, name: str, level: int, promotion: int = None, traces: bool = True
+    ) -> list:
+        """Compile the stats a character has on its own.
+
+        :param name: The character name.
+        :param level: The character level.
+        :param promotion: The promotion, defaults to the lowest one for the level.
+        :param traces: Whether every stat trace is unlocked, defaults to True.
+        :return: A stat vector.
+        """
+        key = (name, level, promotion, traces)
+        if key in self._characters:
+            return self._characters[key]
+
+        character = self.game_data["characters"][name]
+        base = self.stat_curves.get_character_stats(name, level, promotion)
+        modifiers = [
+            {"type": stat, "value": character["ascension"][0][stat]["base"]}
+            for stat in ("crit_rate", "crit_dmg")
+        ]
+        if traces:
+            for trace in character["traces"].values():
+                modifiers += trace.get("modifiers", [])
+
+        vector = get_modifier_vector(modifiers)
+        for stat, value in base.items():
+            vector[STAT_INDEX[f"base_{stat}"]] = value
+        self._characters[key] = vector
+
+        return vector
+
+    def compile_light_cone(
+        self, name: str, level: int, promotion: int = None, superimposition: int = 1
+    ) -> list:
+        """Compile the stats a light cone grants.
+
+        :param name: The light cone name.
+        :param level: The light cone level.
+        :param promotion: The promotion, defaults to the lowest one for the level.
+        :param superimposition: The superimposition, from 1 to 5.
+        :return: A stat vector.
+        """
+        key = (name, level, promotion, superimposition)
+        if key in self._light_cones:
+            return self._light_cones[key]
+
+        light_cone = self.game_data["light_cones"][name]
+        base = self.stat_curves.get_light_cone_stats(name, level, promotion)
+        modifiers = []
+        if "modifiers" in light_cone["ability"]:
+            modifiers = light_cone["ability"]["modifiers"][superimposition - 1]
+
+        vector = get_modifier_vector(modifiers)
+        for stat, value in base.items():
+            vector[STAT_INDEX[f"base_{stat}"]] = value
+        self._light_cones[key] = vector
+
+        return vector
+
+    def compile_loadout(self, sets: dict, stats: dict = None) -> list:
+        """Compile relic stats and set bonuses.
+
+        :param sets: A dictionary mapping relic set names to equipped piece counts.
+        :param stats: A dictionary mapping modifier types to the summed main and
+            substat values of the relics.
+        :return: A stat vector.
+        """
+        vector = get_modifier_vector(
+            [{"type": stat, "value": value} for stat, value in (stats or {}).items()]
+        )
+        for name, count in sets.items():
+            for pieces, bonus in zip(SET_BONUS_PIECES, self._set_bonuses[name]):
+                if count >= pieces:
+                    vector = [a + b for a, b in zip(vector, bonus)]
+
+        return vector
+
+    def compile_set_bonuses(self, name: str) -> list:
+        """Get the stat vectors of a relic set's bonuses.
+
+        :param name: The relic set name.
+        :return: A list of stat vectors, one per bonus in `SET_BONUS_PIECES` order.
+        """
+        return self._set_bonuses[name]
+
+    def compile_relics(self, relics: list, relic_stat_vals: dict) -> list:
+        """Compile HSR-Scanner relics into a loadout stat vector.
+
+        :param relics: A list of relics in the HSR-Scanner export format.
+        :param relic_stat_vals: The relic stat values.
+        :return: A stat vector.
+        """
+        sets = {}
+        vector = [0.0] * len(STATS)
+        for relic in relics:
+            sets[relic["set"]] = sets.get(relic["set"], 0) + 1
+            relic_vector = get_relic_vector(relic, relic_stat_vals)
+            vector = [a + b for a, b in zip(vector, relic_vector)]
+
+        bonuses = self.compile_loadout(sets)
+        return [a + b for a, b in zip(vector, bonuses)]
+
+    def evaluate(
+        self,
+        characters: list,
+        levels: list,
+        light_cones: list,
+        superimpositions: list,
+        loadouts: list,
+        promotions: list = None,
+    ) -> dict:
+        """Evaluate the final stats of a batch of combinations.
+
+        All arguments are columns of the same length. Light cones use the same
+        level and promotion as their character and may be None.
+
+        :param characters: The character names.
+        :param levels: The character levels.
+        :param light_cones: The light cone names, or None for no light cone.
+        :param superimpositions: The light cone superimpositions.
+        :param loadouts: The loadout stat vectors, as returned by
+            `compile_loadout` or `compile_relics`.
+        :param promotions: The promotions, defaults to the lowest one for each level.
+        :return: A dictionary mapping final stat names to columns of values.
+        """
+        promotions = promotions or [None] * len(characters)
+        empty = [0.0] * len(STATS)
+        bases = {}
+        rows = []
+        for key in zip(characters, levels, promotions, light_cones, superimpositions):
+            if key not in bases:
+                name, level, promotion, lc, si = key
+                character = self.compile_character(name, level, promotion)
+                light_cone = (
+                    self.compile_light_cone(lc, level, promotion, si) if lc else empty
+                )
+                bases[key] = [a + b for a, b in zip(character, light_cone)]
+            rows.append(bases[key])
+
+        # sum stat by stat so each pass is a single comprehension over the batch
+        columns = [
+            [base[i] + loadout[i] for base, loadout in zip(rows, loadouts)]
+            for i in range(len(STATS))
+        ]
+        return finalize(columns)
+
+
+def finalize(columns: list) -> dict:
+    """Turn stat columns into final stats.
+
+    :param columns: A list with one column of values per stat in `STATS`.
+    :return: A dictionary mapping final stat names to columns of values.
+    """
+    res = {}
+    for stat, base, percent, flat in SCALED_STATS:
+        res[stat] = [
+            b * (1 + p) + f
+            for b, p, f in zip(
+                columns[STAT_INDEX[base]],
+                columns[STAT_INDEX[percent]],
+                columns[STAT_INDEX[flat]],
+            )
+        ]
+    for stat in ADDITIVE_STATS:
+        res[stat] = columns[STAT_INDEX[stat]]
+
+    return res
+
+
+def get_modifier_vector(modifiers: list) -> list:
+    """Sum formatted modifiers into a stat vector.
+
+    :param modifiers: A list of `{type, value}` modifiers.
+    :return: A stat vector.
+    """
+    vector = [0.0] * len(STATS)
+    for modifier in modifiers:
+        vector[STAT_INDEX[modifier["type"]]] += modifier["value"]
+    return vector
+
+
+def get_relic_vector(relic: dict, relic_stat_vals: dict) -> list:
+    """Get the stat vector of a single HSR-Scanner relic, without set bonuses.
+
+    :param relic: A relic in the HSR-Scanner export format.
+    :param relic_stat_vals: The relic stat values.
+    :return: A stat vector.
+    """
+    main_vals = _get_by_rarity(relic_stat_vals["main"], relic["rarity"])
+    main = main_vals[relic["slot"]][relic["mainstat"]]
+    modifiers = [
+        {
+            "type": get_modifier_type_from_main_stat(relic["mainstat"], relic["slot"]),
+            "value": main["base"] + main["step"] * relic["level"],
+        }
+    ]
+    for substat in relic["substats"]:
+        value = substat["value"]
+        if substat["key"].endswith("_"):
+            value /= 100
+        modifiers.append(
+            {"type": get_modifier_type_from_substat(substat["key"]), "value": value}
+        )
+
+    return get_modifier_vector(modifiers)
+
+
+def _get_by_rarity(values: dict, rarity: int):
+    """Get relic stat values of a rarity, whether keys are ints or loaded from JSON.
+
+    :param values: A dictionary keyed by rarity.
+    :param rarity: The rarity.
+    :return: The values of the rarity.
+    """
+    return values[rarity] if rarity in values else values[str(rarity)]
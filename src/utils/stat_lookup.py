@@ -0,0 +1,113 @@
+import json
+from array import array
+
+
+class StatCurves:
+    """Array-backed lookup of the base stats of characters and light cones.
+
+    Built from the `stat_curves.json` artifact.
+    """
+
+    def __init__(self, stat_curves: dict):
+        """Load the stat curves into flat arrays.
+
+        :param stat_curves: The stat curves, as returned by `get_stat_curves`.
+        """
+        self.version = stat_curves["version"]
+        self.breakpoints = [tuple(bp) for bp in stat_curves["breakpoints"]]
+        self._rows = {bp: i for i, bp in enumerate(self.breakpoints)}
+        self._min_promotions = {}
+        for level, promotion in self.breakpoints:
+            self._min_promotions.setdefault(level, promotion)
+        self._tables = {}
+        for kind in ("characters", "light_cones"):
+            stats = stat_curves[kind]["stats"]
+            values = array("d")
+            offsets = {}
+            for name, curve in stat_curves[kind]["values"].items():
+                offsets[name] = len(values)
+                values.extend(curve)
+            self._tables[kind] = (stats, offsets, values)
+
+    @classmethod
+    def load(cls, path: str) -> "StatCurves":
+        """Load the stat curves from a `stat_curves.json` file.
+
+        :param path: The file path.
+        :return: The stat curves.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def get_character_stats(self, name: str, level: int, promotion: int = None) -> dict:
+        """Get the base stats of a character.
+
+        :param name: The character name.
+        :param level: The character level.
+        :param promotion: The promotion, defaults to the lowest promotion that
+            reaches the level (i.e. not yet ascended at max levels).
+        :raises KeyError: If the character or breakpoint doesn't exist.
+        :return: A dictionary mapping stat names to values.
+        """
+        return self._get_stats("characters", name, level, promotion)
+
+    def get_light_cone_stats(
+        self, name: str, level: int, promotion: int = None
+    ) -> dict:
+        """Get the base stats of a light cone.
+
+        :param name: The light cone name.
+        :param level: The light cone level.
+        :param promotion: The promotion, defaults to the lowest promotion that
+            reaches the level (i.e. not yet ascended at max levels).
+        :raises KeyError: If the light cone or breakpoint doesn't exist.
+        :return: A dictionary mapping stat names to values.
+        """
+        return self._get_stats("light_cones", name, level, promotion)
+
+    def get_stat(
+        self, kind: str, name: str, stat: str, level: int, promotion: int = None
+    ) -> float:
+        """Get a single base stat without building a dictionary.
+
+        :param kind: Either `characters` or `light_cones`.
+        :param name: The entity name.
+        :param stat: The stat name.
+        :param level: The entity level.
+        :param promotion: The promotion, defaults to the lowest promotion that
+            reaches the level.
+        :raises KeyError: If the entity, stat or breakpoint doesn't exist.
+        :return: The stat value.
+        """
+        stats, offsets, values = self._tables[kind]
+        try:
+            col = stats.index(stat)
+        except ValueError:
+            raise KeyError(stat)
+        row = self._get_row(level, promotion)
+        return values[offsets[name] + row * len(stats) + col]
+
+    def _get_stats(self, kind: str, name: str, level: int, promotion: int) -> dict:
+        """Get every base stat of an entity at a breakpoint.
+
+        :param kind: Either `characters` or `light_cones`.
+        :param name: The entity name.
+        :param level: The entity level.
+        :param promotion: The promotion, or None for the lowest one.
+        :return: A dictionary mapping stat names to values.
+        """
+        stats, offsets, values = self._tables[kind]
+        start = offsets[name] + self._get_row(level, promotion) * len(stats)
+        return dict(zip(stats, values[start : start + len(stats)]))
+
+    def _get_row(self, level: int, promotion: int) -> int:
+        """Get the row of a breakpoint.
+
+        :param level: The level.
+        :param promotion: The promotion, or None for the lowest one.
+        :raises KeyError: If the breakpoint doesn't exist.
+        :return: The row index.
+        """
+        if promotion is None:
+            promotion = self._min_promotions[level]
+        return self._rows[(level, promotion)]
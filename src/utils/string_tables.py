@@ -0,0 +1,107 @@
+import re
+
+
+# fields holding URLs, stored as `{base_url_index}relative_path`
+URL_FIELDS = {"icon", "image", "mini_icon", "splash"}
+URL_BASE = re.compile(r"\{(\d+)\}")
+
+# fields holding descriptions. Repeated descriptions are stored as indices into
+# the string table, in place or inside lists of descriptions
+TEXT_FIELDS = {"desc"}
+
+# shorter descriptions are kept inline even when repeated
+MIN_TEXT_LENGTH = 16
+
+
+def encode_string_tables(data: dict, base_urls: list) -> dict:
+    """Dictionary-encode the URLs and descriptions of the verbose game data.
+
+    Each base URL is stored once and URL fields keep only the relative path,
+    prefixed with the index of their base URL in braces. Descriptions that
+    appear more than once are moved to a shared string table, in order of first
+    appearance, and referenced by index.
+
+    :param data: The verbose game data, as returned by `get_game_data_verbose`.
+    :param base_urls: The URL prefixes to store once. URLs that don't start with
+        any of them are kept as is.
+    :return: The encoded game data, with the `base_urls` and the `strings`
+        table added as top-level keys.
+    """
+    base_urls = sorted(base_urls, key=len, reverse=True)
+    counts = {}
+    _count_texts(data, None, counts)
+    strings = {}
+
+    def encode_url(url: str) -> str:
+        for i, base_url in enumerate(base_urls):
+            if url.startswith(base_url):
+                return f"{{{i}}}{url[len(base_url) :]}"
+        return url
+
+    def encode_text(text: str) -> int | str:
+        if counts[text] < 2 or len(text) < MIN_TEXT_LENGTH:
+            return text
+        return strings.setdefault(text, len(strings))
+
+    def encode(value, key: str = None):
+        if isinstance(value, dict):
+            return {k: encode(v, k) for k, v in value.items()}
+        if key in URL_FIELDS and isinstance(value, str):
+            return encode_url(value)
+        if key in TEXT_FIELDS and isinstance(value, str):
+            return encode_text(value)
+        if key in TEXT_FIELDS and isinstance(value, list):
+            return [encode_text(text) for text in value]
+        if isinstance(value, list):
+            return [encode(v) for v in value]
+        return value
+
+    res = encode(data)
+    return {"base_urls": base_urls, "strings": list(strings), **res}
+
+
+def decode_string_tables(encoded: dict) -> dict:
+    """Rehydrate verbose game data encoded with `encode_string_tables`.
+
+    :param encoded: The encoded game data.
+    :return: The verbose game data in its original shape.
+    """
+    base_urls = encoded["base_urls"]
+    strings = encoded["strings"]
+
+    def decode(value, key: str = None):
+        if isinstance(value, dict):
+            return {k: decode(v, k) for k, v in value.items()}
+        if key in URL_FIELDS and isinstance(value, str):
+            match = URL_BASE.match(value)
+            if match:
+                return base_urls[int(match.group(1))] + value[match.end() :]
+            return value
+        if key in TEXT_FIELDS and isinstance(value, int):
+            return strings[value]
+        if key in TEXT_FIELDS and isinstance(value, list):
+            return [strings[v] if isinstance(v, int) else v for v in value]
+        if isinstance(value, list):
+            return [decode(v) for v in value]
+        return value
+
+    return decode(
+        {k: v for k, v in encoded.items() if k not in ("base_urls", "strings")}
+    )
+
+
+def _count_texts(value, key: str, counts: dict):
+    """Count the occurrences of every description.
+
+    :param value: The value to search.
+    :param key: The key of the value in its parent dictionary.
+    :param counts: A dictionary mapping descriptions to counts, updated in place.
+    """
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _count_texts(v, k, counts)
+    elif key in TEXT_FIELDS and isinstance(value, str):
+        counts[value] = counts.get(value, 0) + 1
+    elif isinstance(value, list):
+        for v in value:
+            _count_texts(v, key, counts)
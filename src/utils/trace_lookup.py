@@ -0,0 +1,95 @@
+import json
+
+
+class TraceTrees:
+    """Lookup of character trace trees and their cumulative stat bonuses.
+
+    Built from the `trace_trees.json` artifact.
+    """
+
+    def __init__(self, trace_trees: dict):
+        """Index the trace trees.
+
+        :param trace_trees: The trace trees, as returned by `get_trace_trees`.
+        """
+        self.version = trace_trees["version"]
+        self._trees = trace_trees["characters"]
+        self._bits = {
+            name: {anchor: 1 << i for i, anchor in enumerate(tree["bonus_nodes"])}
+            for name, tree in self._trees.items()
+        }
+
+    @classmethod
+    def load(cls, path: str) -> "TraceTrees":
+        """Load the trace trees from a `trace_trees.json` file.
+
+        :param path: The file path.
+        :return: The trace trees.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def get_nodes(self, name: str) -> dict:
+        """Get the trace tree of a character.
+
+        :param name: The character name.
+        :raises KeyError: If the character doesn't exist.
+        :return: A dictionary mapping node anchors to nodes.
+        """
+        return self._trees[name]["nodes"]
+
+    def get_available_nodes(self, name: str, unlocked: list) -> list:
+        """Get the nodes whose prerequisites are all unlocked.
+
+        :param name: The character name.
+        :param unlocked: The anchors of the unlocked nodes.
+        :raises KeyError: If the character doesn't exist.
+        :return: A list of anchors of the locked nodes that can be unlocked next.
+        """
+        unlocked = set(unlocked)
+        return [
+            anchor
+            for anchor, node in self.get_nodes(name).items()
+            if anchor not in unlocked
+            and all(point in unlocked for point in node["pre_points"])
+        ]
+
+    def get_mask(self, name: str, unlocked: list) -> int:
+        """Get the bonus bitmask of an unlock state.
+
+        :param name: The character name.
+        :param unlocked: The anchors of the unlocked nodes.
+        :raises KeyError: If the character or a node doesn't exist.
+        :raises ValueError: If a node is unlocked without its prerequisites.
+        :return: The bitmask of the unlocked bonus nodes.
+        """
+        nodes = self.get_nodes(name)
+        bits = self._bits[name]
+        unlocked = set(unlocked)
+
+        mask = 0
+        for anchor in unlocked:
+            missing = [p for p in nodes[anchor]["pre_points"] if p not in unlocked]
+            if missing:
+                raise ValueError(
+                    f"{anchor} requires {', '.join(missing)} to be unlocked"
+                )
+            mask |= bits.get(anchor, 0)
+
+        return mask
+
+    def get_bonuses(self, name: str, mask: int) -> dict:
+        """Get the cumulative stat bonuses of an unlock state.
+
+        :param name: The character name.
+        :param mask: The bitmask of the unlocked bonus nodes, as returned by
+            `get_mask`.
+        :raises KeyError: If the character doesn't exist or the bonus nodes in
+            the mask can't be unlocked together.
+        :return: A dictionary mapping stat types to values.
+        """
+        tree = self._trees[name]
+        row = tree["bonuses"][mask] if 0 <= mask < len(tree["bonuses"]) else None
+        if row is None:
+            raise KeyError(mask)
+        return dict(zip(tree["stats"], row))
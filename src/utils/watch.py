@@ -0,0 +1,67 @@
+import time
+from utils.sources import get_snapshot
+
+
+def watch(inputs: dict, rebuild, interval: float = 0.5, debounce: float = 1.0):
+    """Poll input files and rebuild the targets whose inputs changed.
+
+    Changes are collected until the inputs have been stable for `debounce`
+    seconds, so a burst of changes (e.g. a submodule update) triggers a
+    single rebuild.
+
+    :param inputs: A dictionary mapping target names to lists of input paths.
+        Directory inputs cover every file directly inside them.
+    :param rebuild: A callable taking the list of target names to rebuild.
+    :param interval: The polling interval in seconds, defaults to 0.5.
+    :param debounce: The quiet period in seconds, defaults to 1.0.
+    """
+    paths = sorted({path for target_paths in inputs.values() for path in target_paths})
+    snapshot = get_snapshot(paths)
+    print(f"Watching {len(snapshot)} files for changes...")
+
+    changed = set()
+    last_change = None
+    while True:
+        time.sleep(interval)
+        curr = get_snapshot(paths)
+        diff = {
+            path
+            for path in snapshot.keys() | curr.keys()
+            if snapshot.get(path) != curr.get(path)
+        }
+        snapshot = curr
+        if diff:
+            changed |= diff
+            last_change = time.monotonic()
+            continue
+        if not changed or time.monotonic() - last_change < debounce:
+            continue
+
+        targets = [
+            target
+            for target, target_inputs in inputs.items()
+            if any(_is_under(path, target_inputs) for path in changed)
+        ]
+        changed = set()
+        if targets:
+            start = time.perf_counter()
+            try:
+                rebuild(targets)
+            except Exception as e:
+                print(f"ERROR: Rebuild failed: {e!r}")
+                continue
+            elapsed = time.perf_counter() - start
+            print(f"Rebuilt {', '.join(targets)} in {elapsed:.2f}s")
+
+
+def _is_under(path: str, inputs: list) -> bool:
+    """Check whether a path is one of the inputs or directly inside an input directory.
+
+    :param path: The changed file path.
+    :param inputs: A list of input paths.
+    :return: Whether the path belongs to the inputs.
+    """
+    return any(
+        path == input_path or path.startswith(input_path.rstrip("/") + "/")
+        for input_path in inputs
+    )
@@ -0,0 +1,46 @@
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+
+
+TESTS_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# tests import the modules of `src` the same way `python src/main.py` does
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_PATH), "src"))
+
+# a small slice of the game resources (Kafka, the Destruction Trailblazer, two
+# light cones and two relic sets) laid out like the repository root
+FIXTURE_PATH = os.path.join(TESTS_PATH, "fixture")
+
+
+@contextmanager
+def fixture_root():
+    """Work from a temporary copy of the fixture, as if it were the repository
+    root, so tests can build into it and change its sources.
+
+    :return: A context manager yielding the path of the copy.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "root")
+        shutil.copytree(FIXTURE_PATH, root)
+        os.chdir(root)
+        try:
+            yield root
+        finally:
+            os.chdir(cwd)
+
+
+def touch_source(path: str, data: bytes):
+    """Rewrite a source file, moving its modification time forward so that
+    the change is detected even on filesystems with coarse timestamps.
+
+    :param path: The file path.
+    :param data: The new content.
+    """
+    stat = os.stat(path)
+    with open(path, "wb") as f:
+        f.write(data)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
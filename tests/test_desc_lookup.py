@@ -0,0 +1,46 @@
+import unittest
+from tests import fixture_root
+from extractors.game_data_verbose import get_game_data_verbose
+from extractors.rendered_descs import get_rendered_descs
+from utils.desc_lookup import DescRenderer, RenderedDescs, iter_desc_templates
+from utils.helpers import render_desc
+
+
+class DescLookupTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with fixture_root():
+            cls.game_data_verbose = get_game_data_verbose(include_icons=False)
+        cls.rendered = RenderedDescs(get_rendered_descs(cls.game_data_verbose))
+        cls.renderer = DescRenderer(cls.game_data_verbose)
+
+    def test_every_level_matches_render_desc(self):
+        count = 0
+        for kind, name, skill, desc, params in iter_desc_templates(
+            self.game_data_verbose
+        ):
+            for level, row in enumerate(params, 1):
+                expected = render_desc(desc, row)
+                self.assertEqual(
+                    self.rendered.get_desc(kind, name, skill, level), expected
+                )
+                self.assertEqual(
+                    self.renderer.get_desc(kind, name, skill, level), expected
+                )
+                count += 1
+
+        # skills, eidolons and light cone abilities at every level
+        self.assertGreater(count, 100)
+
+    def test_invalid_level(self):
+        for lookup in (self.rendered, self.renderer):
+            with self.assertRaises(ValueError):
+                lookup.get_desc("characters", "Kafka", "ult", 0)
+            with self.assertRaises(ValueError):
+                lookup.get_desc("light_cones", "Patience Is All You Need", "ability", 6)
+            with self.assertRaises(KeyError):
+                lookup.get_desc("characters", "Kafka", "e7", 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
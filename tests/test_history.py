@@ -0,0 +1,92 @@
+import copy
+import os
+import tempfile
+import unittest
+from tests import fixture_root
+import main
+from extractors.game_data_verbose import get_game_data_verbose
+from utils.history import VersionHistory
+
+
+class VersionHistoryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with fixture_root():
+            cls.current = get_game_data_verbose(include_icons=False)
+
+        # an older version without the Trailblazer and with another Kafka
+        cls.older = copy.deepcopy(cls.current)
+        cls.older["version"] = "2.6.0"
+        del cls.older["characters"]["TrailblazerDestruction#F"]
+        cls.older["characters"]["Kafka"]["rarity"] = 4
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.history = VersionHistory(os.path.join(tmp.name, "history.sqlite"))
+        self.addCleanup(self.history.close)
+
+    def test_time_travel(self):
+        self.history.record(self.current)
+        self.history.record(self.older)
+        self.assertEqual(self.history.get_versions(), ["2.6.0", "2.7.0"])
+
+        kafka = self.current["characters"]["Kafka"]
+        self.assertEqual(self.history.get_entity("characters", "Kafka", "2.7.0"), kafka)
+        self.assertEqual(
+            self.history.get_entity("characters", "Kafka", "2.6.5")["rarity"], 4
+        )
+        self.assertIsNone(self.history.get_entity("characters", "Kafka", "2.5"))
+        self.assertIsNone(
+            self.history.get_entity("characters", "TrailblazerDestruction#F", "2.6.0")
+        )
+        self.assertEqual(
+            [v for v, _ in self.history.get_entity_history("characters", "Kafka")],
+            ["2.6.0", "2.7.0"],
+        )
+        self.assertEqual(
+            sorted(
+                (change["name"], change["change"])
+                for change in self.history.get_changed_entities("2.6.0", "2.7.0")
+            ),
+            [("Kafka", "modified"), ("TrailblazerDestruction#F", "added")],
+        )
+
+    def test_unchanged_records_are_shared(self):
+        new_records = self.history.record(self.current)
+        # only the changed Kafka record is new in the older version
+        self.assertEqual(self.history.record(self.older), 1)
+        count = self.history.con.execute("SELECT COUNT(*) FROM records").fetchone()
+        self.assertEqual(count[0], new_records + 1)
+
+    def test_append_only(self):
+        self.history.record(self.current)
+        self.assertEqual(self.history.record(self.current), 0)
+
+        changed = copy.deepcopy(self.current)
+        changed["characters"]["Kafka"]["rarity"] = 4
+        with self.assertRaises(ValueError):
+            self.history.record(changed)
+        self.assertEqual(
+            self.history.get_entity("characters", "Kafka", "2.7.0"),
+            self.current["characters"]["Kafka"],
+        )
+        self.assertEqual(self.history.get_versions(), ["2.7.0"])
+
+
+class BuildHistoryTest(unittest.TestCase):
+    def test_build_records_history(self):
+        with fixture_root():
+            # recorded from the built model, or built for the store alone
+            for names in (["game_data_verbose"], ["game_data"]):
+                path = f"history_{names[0]}.sqlite"
+                main.build(names, "output", history_path=path)
+                with VersionHistory(path) as history:
+                    self.assertEqual(history.get_versions(), ["2.7.0"])
+                    self.assertIsNotNone(
+                        history.get_entity("characters", "Kafka", "2.7.0")
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
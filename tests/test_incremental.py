@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from tests import fixture_root, touch_source
+import main
+from extractors import game_data_verbose
+from utils.incremental import (
+    CACHE_FORMAT_VERSION,
+    load_cache,
+    save_cache,
+    update_records,
+)
+
+
+SKILLS_PATH = game_data_verbose.CHARACTER_SKILLS
+
+# Kafka, and the basic ATK skill that only Kafka's records are built from
+KAFKA_ID = "1005"
+SKILL_ID = "100501"
+
+
+class UpdateRecordsTest(unittest.TestCase):
+    def test_reuses_unchanged_records(self):
+        cache = {}
+        formatted = []
+
+        def format_entity(entity):
+            formatted.append(entity)
+            return entity.upper(), {"value": entity}
+
+        update_records(cache, "s", [("1", "a", "x"), ("2", "b", "y")], format_entity)
+        entities = [("2", "b", "y"), ("1", "c", "z"), ("3", "d", "w")]
+        res = update_records(cache, "s", entities, format_entity)
+
+        # only the changed and the new entity are formatted again, in source order
+        self.assertEqual(formatted, ["x", "y", "z", "w"])
+        self.assertEqual(list(res), ["Y", "Z", "W"])
+        self.assertEqual(res["Z"], {"value": "z"})
+        self.assertEqual(set(cache["s"]), {"1", "2", "3"})
+
+    def test_drops_removed_entities(self):
+        cache = {}
+        update_records(cache, "s", [("1", "a", "x"), ("2", "b", "y")], lambda e: (e, e))
+        res = update_records(cache, "s", [("2", "b", "y")], lambda e: (e, e))
+        self.assertEqual(res, {"y": "y"})
+        self.assertEqual(list(cache["s"]), ["2"])
+
+
+class IncrementalBuildTest(unittest.TestCase):
+    def test_source_change(self):
+        with fixture_root():
+            main.build(["game_data_verbose"], "output", cache={})
+            cache = load_cache(main.get_cache_path("output"), "output")
+            self.assertIn("game_data_verbose", cache)
+
+            with open(SKILLS_PATH, "r", encoding="utf-8") as f:
+                skills = json.load(f)
+            skills[SKILL_ID]["name"] = "Midnight Tumult Revised"
+            touch_source(SKILLS_PATH, json.dumps(skills, indent=1).encode("utf-8"))
+
+            with mock.patch.object(
+                game_data_verbose,
+                "_format_character",
+                wraps=game_data_verbose._format_character,
+            ) as format_character:
+                main.build(["game_data_verbose"], "output", cache=cache)
+            formatted = [call.args[0]["id"] for call in format_character.mock_calls]
+            self.assertEqual(formatted, [KAFKA_ID])
+
+            with open("output/game_data_verbose.json", "r", encoding="utf-8") as f:
+                data = json.load(f)
+            kafka = data["characters"]["Kafka"]
+            self.assertEqual(
+                kafka["skills"]["basic"]["name"], "Midnight Tumult Revised"
+            )
+            # the records match a build that formats every entity again
+            self.assertEqual(
+                data["characters"],
+                json.loads(json.dumps(game_data_verbose.get_characters(False))),
+            )
+            self.assertEqual(
+                data["light_cones"],
+                json.loads(json.dumps(game_data_verbose.get_light_cones(False))),
+            )
+
+
+class CacheFileTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "cache", "records.json")
+
+    def test_round_trip(self):
+        save_cache(self.path, "output", {"game_data": {"characters": {}}})
+        self.assertEqual(
+            load_cache(self.path, "output"), {"game_data": {"characters": {}}}
+        )
+
+    def test_other_output_folder(self):
+        save_cache(self.path, "output", {"game_data": {}})
+        with mock.patch("builtins.print"):
+            self.assertEqual(load_cache(self.path, "other"), {})
+
+    def test_outdated_format(self):
+        save_cache(self.path, "output", {"game_data": {}})
+        with open(self.path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        cache["format_version"] = CACHE_FORMAT_VERSION - 1
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        with mock.patch("builtins.print"):
+            self.assertEqual(load_cache(self.path, "output"), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
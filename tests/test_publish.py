@@ -0,0 +1,97 @@
+import json
+import os
+import unittest
+from unittest import mock
+from tests import fixture_root
+import main
+from utils.publish import BUILDS_DIR, CURRENT_LINK, MANIFEST, validate_build
+
+
+# cheap artifacts to build atomically
+NAMES = ["game_data", "relic_stat_vals"]
+
+
+def _corrupt_entry(publish):
+    """Wrap a publish function so its manifest entries have the wrong size.
+
+    :param publish: The publish function.
+    :return: The wrapped function.
+    """
+
+    def wrapper(*args, **kwargs):
+        entry = publish(*args, **kwargs)
+        return {**entry, "size": entry["size"] + 1}
+
+    return wrapper
+
+
+class AtomicBuildTest(unittest.TestCase):
+    def setUp(self):
+        context = fixture_root()
+        context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+
+    def test_activate(self):
+        main.build(NAMES, "output", atomic=True)
+        current = os.readlink(os.path.join("output", CURRENT_LINK))
+        validate_build(os.path.join("output", current))
+        with open(os.path.join("output", CURRENT_LINK, MANIFEST)) as f:
+            self.assertEqual(sorted(json.load(f)["files"]), NAMES)
+
+        # a partial build carries the other artifacts over from the active one
+        main.build(NAMES[:1], "output", atomic=True)
+        self.assertNotEqual(os.readlink(os.path.join("output", CURRENT_LINK)), current)
+        with open(os.path.join("output", CURRENT_LINK, MANIFEST)) as f:
+            self.assertEqual(sorted(json.load(f)["files"]), NAMES)
+        self.assertTrue(
+            os.path.exists(os.path.join("output", CURRENT_LINK, "relic_stat_vals.json"))
+        )
+
+    def test_rollback(self):
+        main.build(NAMES, "output", atomic=True)
+        current = os.readlink(os.path.join("output", CURRENT_LINK))
+        with open(os.path.join("output", CURRENT_LINK, MANIFEST), "rb") as f:
+            manifest = f.read()
+
+        with mock.patch.object(
+            main, "publish_hashed", _corrupt_entry(main.publish_hashed)
+        ):
+            with self.assertRaises(ValueError):
+                main.build(NAMES, "output", atomic=True)
+
+        # the active build is untouched and the failed one is kept for inspection
+        self.assertEqual(os.readlink(os.path.join("output", CURRENT_LINK)), current)
+        with open(os.path.join("output", CURRENT_LINK, MANIFEST), "rb") as f:
+            self.assertEqual(f.read(), manifest)
+        builds = os.listdir(os.path.join("output", BUILDS_DIR))
+        staged = [name for name in builds if name.startswith(".")]
+        self.assertEqual(len(staged), 1)
+        self.assertGreater(staged[0].lstrip("."), current.split("/")[-1])
+
+        # the next successful build replaces it and cleans up the leftover
+        main.build(NAMES, "output", atomic=True)
+        builds = os.listdir(os.path.join("output", BUILDS_DIR))
+        self.assertFalse(any(name.startswith(".") for name in builds))
+        self.assertNotEqual(os.readlink(os.path.join("output", CURRENT_LINK)), current)
+
+    def test_prune(self):
+        for _ in range(4):
+            main.build(NAMES[:1], "output", atomic=True, keep=2)
+        builds = sorted(os.listdir(os.path.join("output", BUILDS_DIR)))
+        self.assertEqual(len(builds), 2)
+        self.assertEqual(
+            os.readlink(os.path.join("output", CURRENT_LINK)),
+            os.path.join(BUILDS_DIR, builds[-1]),
+        )
+
+    def test_invalid_build(self):
+        main.build(NAMES, "output", atomic=True)
+        build_path = os.path.join("output", CURRENT_LINK)
+        with open(os.path.join(build_path, "min", "game_data.json"), "a") as f:
+            f.write("}")
+        with self.assertRaises(ValueError):
+            validate_build(build_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import random
+import unittest
+from itertools import product
+from tests import fixture_root
+from extractors.game_data_verbose import get_game_data_verbose
+from extractors.relic_stat_vals import get_relic_stat_vals
+from extractors.stat_curves import get_stat_curves
+from utils.relic_optimizer import PLANAR_SLOTS, SLOTS, optimize_loadout
+from utils.stat_engine import StatEngine, finalize
+from utils.stat_lookup import StatCurves
+
+
+SUBSTATS = {
+    "HP": (30, 45),
+    "ATK": (15, 25),
+    "ATK_": (3.0, 12.0),
+    "SPD": (2, 8),
+    "CRIT Rate_": (2.5, 10.0),
+    "CRIT DMG_": (5.0, 20.0),
+    "Effect Hit Rate_": (3.0, 12.0),
+}
+
+# relics per slot, small enough to enumerate every loadout
+RELICS_PER_SLOT = 3
+
+
+class RelicOptimizerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with fixture_root():
+            game_data_verbose = get_game_data_verbose(include_icons=False)
+            cls.relic_stat_vals = get_relic_stat_vals()
+        stat_curves = StatCurves(get_stat_curves(game_data_verbose))
+        cls.engine = StatEngine(game_data_verbose, stat_curves)
+        cls.relics = _get_inventory(
+            game_data_verbose, cls.relic_stat_vals, random.Random(34)
+        )
+
+    def test_matches_brute_force(self):
+        cases = [
+            {},
+            {"weights": {"crit_rate": 2.0, "crit_dmg": 1.0}},
+            {"weights": {"atk": 1.0, "spd": 20.0}, "min_stats": {"crit_rate": 0.3}},
+            {"weights": {"hp": 1.0}, "required_sets": {"Hunter of Glacial Forest": 4}},
+            {
+                "weights": {"atk": 1.0, "ice": 1000.0},
+                "min_stats": {"spd": 126, "effect_hit": 0.4},
+                "required_sets": {"Space Sealing Station": 2},
+            },
+        ]
+        for case in cases:
+            with self.subTest(**case):
+                res = optimize_loadout(
+                    self.engine, self.relics, self.relic_stat_vals, "Kafka", **case
+                )
+                best = self._brute_force(**case)
+                self.assertTrue(res["complete"])
+                if best is None:
+                    self.assertIsNone(res["uids"])
+                    continue
+                self.assertAlmostEqual(res["score"], best)
+                chosen = [
+                    relic
+                    for relic in self.relics
+                    if res["uids"][relic["slot"]] == relic["_uid"]
+                ]
+                self.assertAlmostEqual(self._score(chosen, **case)[0], best)
+
+    def test_infeasible(self):
+        res = optimize_loadout(
+            self.engine,
+            self.relics,
+            self.relic_stat_vals,
+            "Kafka",
+            min_stats={"crit_rate": 10.0},
+        )
+        self.assertIsNone(res["uids"])
+        self.assertTrue(res["complete"])
+
+    def test_negative_weight(self):
+        with self.assertRaises(ValueError):
+            optimize_loadout(
+                self.engine,
+                self.relics,
+                self.relic_stat_vals,
+                "Kafka",
+                weights={"atk": -1.0},
+            )
+
+    def _brute_force(self, **case) -> float:
+        """Score every loadout of the inventory.
+
+        :return: The best score of a loadout that meets the constraints, or None.
+        """
+        by_slot = [[r for r in self.relics if r["slot"] == slot] for slot in SLOTS]
+        scores = [self._score(list(loadout), **case) for loadout in product(*by_slot)]
+        feasible = [score for score, ok in scores if ok]
+        return max(feasible) if feasible else None
+
+    def _score(
+        self,
+        loadout: list,
+        weights: dict = None,
+        min_stats: dict = None,
+        required_sets: dict = None,
+    ) -> tuple:
+        """Score a loadout the way `optimize_loadout` defines it.
+
+        :return: A tuple of the score and whether the loadout meets the
+            constraints.
+        """
+        weights = weights or {"atk": 1.0}
+        base = self.engine.compile_character("Kafka", 80)
+        vector = self.engine.compile_relics(loadout, self.relic_stat_vals)
+        stats = finalize([[a + b] for a, b in zip(base, vector)])
+        score = sum(weight * stats[stat][0] for stat, weight in weights.items())
+        sets = [relic["set"] for relic in loadout]
+        ok = all(
+            stats[stat][0] >= minimum for stat, minimum in (min_stats or {}).items()
+        ) and all(
+            sets.count(name) >= count for name, count in (required_sets or {}).items()
+        )
+        return score, ok
+
+
+def _get_inventory(
+    game_data_verbose: dict, relic_stat_vals: dict, rng: random.Random
+) -> list:
+    """Generate a random inventory of 5-star relics in the HSR-Scanner format.
+
+    :param game_data_verbose: The verbose game data, for the sets of each slot.
+    :param relic_stat_vals: The relic stat values.
+    :param rng: The random number generator.
+    :return: A list of relics.
+    """
+    main_stats = relic_stat_vals["main"][5]
+    relics = []
+    for slot in SLOTS:
+        # cavern and planar sets only ever drop for their own group of slots
+        sets = [
+            name
+            for name, relic_set in game_data_verbose["relic_sets"].items()
+            if any(
+                (piece in PLANAR_SLOTS) == (slot in PLANAR_SLOTS)
+                for piece in relic_set["pieces"]
+            )
+        ]
+        for i in range(RELICS_PER_SLOT):
+            keys = rng.sample(sorted(SUBSTATS), 4)
+            relics.append(
+                {
+                    "set": rng.choice(sets),
+                    "slot": slot,
+                    "rarity": 5,
+                    "level": rng.choice([0, 9, 15]),
+                    "mainstat": rng.choice(sorted(main_stats[slot])),
+                    "substats": [
+                        {"key": key, "value": round(rng.uniform(*SUBSTATS[key]), 1)}
+                        for key in keys
+                    ],
+                    "_uid": f"{slot}_{i}",
+                }
+            )
+
+    return relics
+
+
+if __name__ == "__main__":
+    unittest.main()
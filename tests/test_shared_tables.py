@@ -0,0 +1,118 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import unittest
+from tests import TESTS_PATH, fixture_root
+from extractors.game_data import get_game_data
+from extractors.relic_roll_vals import generate_rarity_data
+from extractors.relic_stat_vals import get_relic_stat_vals
+from utils.relic_scorer import get_score_tables
+from utils.shared_tables import SharedTables, publish_shared_tables
+
+
+# read by processes that attach to the block on their own
+ATTACH_SCRIPT = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from utils.shared_tables import SharedTables
+with SharedTables(sys.argv[2]) as tables:
+    print(len(tables.get_keys("characters")))
+"""
+
+
+def _count_characters(name: str) -> int:
+    """Attach to the tables from a pool worker.
+
+    :param name: The name of the shared memory block.
+    :return: The number of characters.
+    """
+    with SharedTables(name) as tables:
+        return len(tables.get_keys("characters"))
+
+
+class SharedTablesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with fixture_root():
+            # published artifacts are read back from JSON, with string keys
+            cls.game_data = json.loads(json.dumps(get_game_data(include_icons=False)))
+            cls.relic_stat_vals = get_relic_stat_vals()
+            cls.relic_roll_vals = generate_rarity_data()
+
+    def setUp(self):
+        self.name = f"hsr_data_test_{os.getpid()}"
+        self.shm = publish_shared_tables(
+            self.name, self.game_data, self.relic_stat_vals, self.relic_roll_vals
+        )
+
+    def tearDown(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def test_records(self):
+        with SharedTables(self.name) as tables:
+            for table, records in self.game_data.items():
+                if not isinstance(records, dict):
+                    continue
+                self.assertEqual(
+                    tables.get_keys(table), sorted(records, key=str.encode)
+                )
+                for key, value in records.items():
+                    self.assertEqual(tables.get_record(table, key), value)
+            self.assertEqual(
+                tables.get_record("info", "version"), self.game_data["version"]
+            )
+            with self.assertRaises(KeyError):
+                tables.get_record("characters", "Nobody")
+
+    def test_arrays(self):
+        with SharedTables(self.name) as tables:
+            shared = tables.get_score_tables()
+            for table, values in get_score_tables(self.relic_stat_vals).items():
+                self.assertEqual(list(shared[table]), list(values))
+            for rarity, stats in self.relic_roll_vals.items():
+                for substat, rolls in stats.items():
+                    for value, roll in rolls.items():
+                        self.assertEqual(
+                            tables.get_roll_values(rarity, substat, value),
+                            roll if isinstance(roll, list) else [roll],
+                        )
+            with self.assertRaises(KeyError):
+                tables.get_roll_values(5, "SPD", 0.5)
+
+    def test_invalid_block(self):
+        with self.assertRaises(FileNotFoundError):
+            SharedTables(f"{self.name}_missing")
+
+    def test_pool_workers(self):
+        for method in multiprocessing.get_all_start_methods():
+            with self.subTest(method=method):
+                context = multiprocessing.get_context(method)
+                with context.Pool(2) as pool:
+                    counts = pool.map(_count_characters, [self.name] * 4)
+                self.assertEqual(counts, [len(self.game_data["characters"])] * 4)
+
+    def test_separate_processes(self):
+        # a process with its own resource tracker must not unlink the block
+        # when it exits
+        src_path = os.path.join(os.path.dirname(TESTS_PATH), "src")
+        for _ in range(2):
+            res = subprocess.run(
+                [sys.executable, "-c", ATTACH_SCRIPT, src_path, self.name],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            self.assertEqual(int(res.stdout), len(self.game_data["characters"]))
+            self.assertEqual(res.stderr, "")
+
+        with SharedTables(self.name) as tables:
+            self.assertEqual(
+                len(tables.get_keys("characters")), len(self.game_data["characters"])
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
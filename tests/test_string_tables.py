@@ -0,0 +1,39 @@
+import copy
+import json
+import unittest
+from tests import fixture_root
+from extractors.game_data_verbose import (
+    IMG_BASE_URL,
+    MINI_ICON_BASE_URL,
+    get_game_data_verbose,
+)
+from utils.string_tables import decode_string_tables, encode_string_tables
+
+
+class StringTablesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with fixture_root():
+            cls.data = get_game_data_verbose(include_icons=True)
+        cls.original = copy.deepcopy(cls.data)
+        cls.encoded = encode_string_tables(cls.data, [IMG_BASE_URL, MINI_ICON_BASE_URL])
+
+    def test_round_trip(self):
+        # the artifact is read back from JSON
+        encoded = json.loads(json.dumps(self.encoded))
+        self.assertEqual(decode_string_tables(encoded), self.data)
+
+    def test_base_urls_stored_once(self):
+        self.assertEqual(self.encoded["base_urls"], [IMG_BASE_URL, MINI_ICON_BASE_URL])
+        text = json.dumps({k: v for k, v in self.encoded.items() if k != "base_urls"})
+        self.assertNotIn(IMG_BASE_URL, text)
+        self.assertIn(IMG_BASE_URL, json.dumps(self.data))
+        self.assertLess(len(json.dumps(self.encoded)), len(json.dumps(self.data)))
+
+    def test_input_unchanged(self):
+        # the verbose data is shared between artifacts, so encoding must copy it
+        self.assertEqual(self.data, self.original)
+
+
+if __name__ == "__main__":
+    unittest.main()
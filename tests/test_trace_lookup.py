@@ -0,0 +1,99 @@
+import random
+import unittest
+from tests import fixture_root
+from extractors.game_data_verbose import get_trace_trees
+from utils.trace_lookup import TraceTrees
+
+
+class TraceTreesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with fixture_root():
+            cls.trees = get_trace_trees()["characters"]
+        cls.trace_trees = TraceTrees({"version": "", "characters": cls.trees})
+        cls.names = list(cls.trees)
+
+    def test_masks_match_unlock_closures(self):
+        for name in self.names:
+            nodes = self.trace_trees.get_nodes(name)
+            bonus_nodes = self.trees[name]["bonus_nodes"]
+            valid = 0
+            for mask in range(1 << len(bonus_nodes)):
+                chosen = [a for i, a in enumerate(bonus_nodes) if mask >> i & 1]
+                # the smallest unlock state holding the chosen bonus nodes
+                closure = _get_closure(nodes, chosen)
+                if self.trace_trees.get_mask(name, closure) != mask:
+                    with self.assertRaises(KeyError):
+                        self.trace_trees.get_bonuses(name, mask)
+                    continue
+
+                valid += 1
+                bonuses = self.trace_trees.get_bonuses(name, mask)
+                expected = _sum_modifiers(nodes, chosen)
+                self.assertEqual(set(bonuses), set(self.trees[name]["stats"]))
+                for stat, value in bonuses.items():
+                    self.assertAlmostEqual(value, expected.get(stat, 0), places=6)
+
+            # every tree has combinations that prerequisites rule out
+            self.assertGreater(valid, 1)
+            self.assertLess(valid, 1 << len(bonus_nodes))
+
+    def test_random_unlock_orders(self):
+        rng = random.Random(41)
+        for name in self.names:
+            nodes = self.trace_trees.get_nodes(name)
+            for _ in range(20):
+                unlocked = []
+                while True:
+                    available = self.trace_trees.get_available_nodes(name, unlocked)
+                    if not available:
+                        break
+                    unlocked.append(rng.choice(available))
+                    mask = self.trace_trees.get_mask(name, unlocked)
+                    bonuses = self.trace_trees.get_bonuses(name, mask)
+                    expected = _sum_modifiers(nodes, unlocked)
+                    for stat, value in bonuses.items():
+                        self.assertAlmostEqual(value, expected.get(stat, 0), places=6)
+                self.assertEqual(sorted(unlocked), sorted(nodes))
+
+    def test_missing_prerequisite(self):
+        for name in self.names:
+            nodes = self.trace_trees.get_nodes(name)
+            anchor = next(a for a, node in nodes.items() if node["pre_points"])
+            with self.assertRaises(ValueError):
+                self.trace_trees.get_mask(name, [anchor])
+
+
+def _get_closure(nodes: dict, anchors: list) -> list:
+    """Get the nodes along with every node that must be unlocked before them.
+
+    :param nodes: A dictionary mapping anchors to nodes.
+    :param anchors: The anchors of the nodes.
+    :return: A list of anchors.
+    """
+    res = set()
+    stack = list(anchors)
+    while stack:
+        anchor = stack.pop()
+        if anchor not in res:
+            res.add(anchor)
+            stack += nodes[anchor]["pre_points"]
+    return list(res)
+
+
+def _sum_modifiers(nodes: dict, anchors: list) -> dict:
+    """Sum the stat modifiers of nodes.
+
+    :param nodes: A dictionary mapping anchors to nodes.
+    :param anchors: The anchors of the nodes.
+    :return: A dictionary mapping stat types to values.
+    """
+    res = {}
+    for anchor in anchors:
+        for modifier in nodes[anchor]["modifiers"]:
+            res[modifier["type"]] = res.get(modifier["type"], 0) + modifier["value"]
+    return res
+
+
+if __name__ == "__main__":
+    unittest.main()